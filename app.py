@@ -22,6 +22,7 @@ import psutil
 import re
 import html
 import builtins
+from collections.abc import Mapping
 from urllib.parse import unquote
 
 def _load_fernet_class():
@@ -57,7 +58,7 @@ TEMP_FILE_MANUAL_MAX_AGE_HOURS = float(os.environ.get("GENESYS_TEMP_FILE_MANUAL_
 TEMP_KEEP_RECENT_SECONDS = int(os.environ.get("GENESYS_TEMP_KEEP_RECENT_SECONDS", "120"))
 LOG_FILE_MAX_AGE_HOURS = float(os.environ.get("GENESYS_LOG_FILE_MAX_AGE_HOURS", "72"))
 USER_ACTION_LOG_RETENTION_DAYS = int(os.environ.get("GENESYS_USER_ACTION_LOG_RETENTION_DAYS", "3"))
-USER_ACTION_LOG_MAX_ENTRIES = int(os.environ.get("GENESYS_USER_ACTION_LOG_MAX_ENTRIES", "100000"))
+USER_ACTION_LOG_MAX_ENTRIES = int(os.environ.get("GENESYS_USER_ACTION_LOG_MAX_ENTRIES", "2000000"))
 USER_ACTION_LOG_PRUNE_INTERVAL_SECONDS = int(os.environ.get("GENESYS_USER_ACTION_LOG_PRUNE_INTERVAL_SECONDS", "900"))
 
 
@@ -120,7 +121,11 @@ from src.lang import get_text, STRINGS, DEFAULT_METRICS, ALL_METRICS
 from src.monitor import monitor
 from src.auth import authenticate
 from src.api import GenesysAPI
-from src.processor import process_analytics_response, to_excel, to_csv, to_parquet, to_pdf, fill_interval_gaps, process_observations, process_daily_stats, process_user_aggregates, process_user_details, process_conversation_details, apply_duration_formatting
+from src.audit_store import ensure_audit_ingester
+from src.user_action_log import UserActionLog
+from src.org_maps import build_org_maps, get_org_maps_snapshot, unload_org_maps_snapshots
+from src.report_cache import clear_report_caches
+from src.processor import process_analytics_response, to_excel, to_csv, to_parquet, to_pdf, fill_interval_gaps, process_observations, process_daily_stats, process_user_aggregates, process_user_details, process_conversation_details, apply_duration_formatting, is_duration_column, ConversationDetailsBuilder
 from src.app.router import render_page
 from src.app.utils import (
     _build_active_calls,
@@ -184,7 +189,7 @@ LOGIN_LOCK_SECONDS = int(os.environ.get("GENESYS_LOGIN_LOCK_SECONDS", "900"))
 LOGIN_MAX_FAILURES = int(os.environ.get("GENESYS_LOGIN_MAX_FAILURES", "5"))
 LOGIN_ATTEMPT_MAX_ENTRIES = int(os.environ.get("GENESYS_LOGIN_ATTEMPT_MAX_ENTRIES", "5000"))
 
-DATA_MANAGER_IMPL_VERSION = 2
+DATA_MANAGER_IMPL_VERSION = 4
 
 def _iter_conversation_pages(
     api,
@@ -1214,7 +1219,7 @@ def _dashboard_interval_utc(mode, saved_creds, selected_date=None):
 def _resolve_card_queue_names(card_queues, queues_map):
     resolved = []
     missing = []
-    if not isinstance(queues_map, dict):
+    if not isinstance(queues_map, Mapping):
         return resolved, missing
     normalized_name_map = {str(name).strip().lower(): name for name in queues_map.keys()}
 
@@ -1432,20 +1437,29 @@ def _shared_memory_store():
     }
 
 
-@st.cache_resource(show_spinner=False)
-def _shared_user_action_store():
-    return {"lock": threading.Lock(), "last_prune_ts": 0.0}
-
-
-def _user_action_file_path():
+def _user_action_log_dir():
     try:
         monitor_dir = os.path.join(ORG_BASE_DIR, "_monitor")
         os.makedirs(monitor_dir, exist_ok=True)
-        return os.path.join(monitor_dir, "user_actions.jsonl")
+        return monitor_dir
     except Exception:
         return None
 
 
+@st.cache_resource(show_spinner=False)
+def _shared_user_action_store():
+    log_dir = _user_action_log_dir()
+    log = None
+    if log_dir:
+        log = UserActionLog(
+            log_dir,
+            retention_days=USER_ACTION_LOG_RETENTION_DAYS,
+            prune_interval_seconds=USER_ACTION_LOG_PRUNE_INTERVAL_SECONDS,
+            max_entries=USER_ACTION_LOG_MAX_ENTRIES,
+        )
+    return {"log": log}
+
+
 def _sanitize_action_metadata(value, depth=0):
     if depth > 3:
         return "<max-depth>"
@@ -1483,103 +1497,25 @@ def _sanitize_action_metadata(value, depth=0):
     return str(value)
 
 
-def _parse_user_action_timestamp(raw_value):
-    raw = str(raw_value or "").strip()
-    if not raw:
-        return None
-    try:
-        return datetime.strptime(raw, "%Y-%m-%d %H:%M:%S")
-    except Exception:
-        pass
-    try:
-        return datetime.fromisoformat(raw)
-    except Exception:
-        return None
-
-
-def _read_user_actions_locked():
-    path = _user_action_file_path()
-    if not path or (not os.path.exists(path)):
-        return []
-    events = []
-    try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            for line in f:
-                row = str(line or "").strip()
-                if not row:
-                    continue
-                try:
-                    item = json.loads(row)
-                except Exception:
-                    continue
-                if not isinstance(item, dict):
-                    continue
-                event = {
-                    "timestamp": str(item.get("timestamp") or "").strip(),
-                    "action": str(item.get("action") or "-").strip() or "-",
-                    "status": str(item.get("status") or "info").strip() or "info",
-                    "source": str(item.get("source") or "-").strip() or "-",
-                    "username": str(item.get("username") or "-").strip() or "-",
-                    "org_code": str(item.get("org_code") or "-").strip() or "-",
-                    "role": str(item.get("role") or "-").strip() or "-",
-                    "page": str(item.get("page") or "-").strip() or "-",
-                    "detail": str(item.get("detail") or "").strip(),
-                    "metadata": _sanitize_action_metadata(item.get("metadata")),
-                }
-                events.append(event)
-    except Exception:
-        return []
-    return events
-
-
-def _write_user_actions_locked(events):
-    path = _user_action_file_path()
-    if not path:
-        return False
-    tmp_path = f"{path}.tmp"
-    try:
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            for event in events or []:
-                f.write(json.dumps(event, ensure_ascii=False) + "\n")
-        os.replace(tmp_path, path)
-        return True
-    except Exception:
-        try:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-        except Exception:
-            pass
-        return False
-
-
-def _prune_user_actions_locked(now_ts=None):
-    store = _shared_user_action_store()
-    current_ts = float(now_ts if now_ts is not None else pytime.time())
-    last_prune_ts = float(store.get("last_prune_ts", 0) or 0)
-    if (current_ts - last_prune_ts) < max(30, int(USER_ACTION_LOG_PRUNE_INTERVAL_SECONDS or 900)):
-        return
-    events = _read_user_actions_locked()
-    if not events:
-        store["last_prune_ts"] = current_ts
-        return
-    retention_days = max(1, int(USER_ACTION_LOG_RETENTION_DAYS or 1))
-    cutoff_dt = datetime.now() - timedelta(days=retention_days)
-    kept = []
-    for event in events:
-        ts = _parse_user_action_timestamp(event.get("timestamp"))
-        if ts and ts >= cutoff_dt:
-            kept.append(event)
-    max_entries = max(1000, int(USER_ACTION_LOG_MAX_ENTRIES or 1000))
-    if len(kept) > max_entries:
-        kept = kept[-max_entries:]
-    _write_user_actions_locked(kept)
-    store["last_prune_ts"] = current_ts
+def _normalize_user_action(item):
+    return {
+        "timestamp": str(item.get("timestamp") or "").strip(),
+        "action": str(item.get("action") or "-").strip() or "-",
+        "status": str(item.get("status") or "info").strip() or "info",
+        "source": str(item.get("source") or "-").strip() or "-",
+        "username": str(item.get("username") or "-").strip() or "-",
+        "org_code": str(item.get("org_code") or "-").strip() or "-",
+        "role": str(item.get("role") or "-").strip() or "-",
+        "page": str(item.get("page") or "-").strip() or "-",
+        "detail": str(item.get("detail") or "").strip(),
+        "metadata": _sanitize_action_metadata(item.get("metadata")),
+    }
 
 
-def _append_user_action(action, username=None, org_code=None, role=None, page=None, status="info", detail=None, metadata=None, source="app"):
+def _build_user_action_event(action, username=None, org_code=None, role=None, page=None, status="info", detail=None, metadata=None, source="app", timestamp=None):
     safe_action = str(action or "").strip() or "unknown"
-    event = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    return {
+        "timestamp": (timestamp or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
         "action": safe_action,
         "status": str(status or "info").strip() or "info",
         "source": str(source or "app").strip() or "app",
@@ -1590,73 +1526,93 @@ def _append_user_action(action, username=None, org_code=None, role=None, page=No
         "detail": str(detail or "").strip(),
         "metadata": _sanitize_action_metadata(metadata),
     }
-    store = _shared_user_action_store()
-    with store["lock"]:
-        _prune_user_actions_locked(now_ts=pytime.time())
-        path = _user_action_file_path()
-        if not path:
-            return event
-        try:
-            with open(path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(event, ensure_ascii=False) + "\n")
-        except Exception:
-            pass
+
+
+def _append_user_action(action, username=None, org_code=None, role=None, page=None, status="info", detail=None, metadata=None, source="app"):
+    event = _build_user_action_event(
+        action,
+        username=username,
+        org_code=org_code,
+        role=role,
+        page=page,
+        status=status,
+        detail=detail,
+        metadata=metadata,
+        source=source,
+    )
+    log = _shared_user_action_store().get("log")
+    if log is not None:
+        log.enqueue(event)
     return event
 
 
-def _get_user_action_events(limit=500, org_code=None, username=None, action=None, status=None, source=None, since_hours=None):
-    store = _shared_user_action_store()
-    with store["lock"]:
-        _prune_user_actions_locked(now_ts=pytime.time())
-        events = _read_user_actions_locked()
-
-    org_filter = str(org_code or "").strip().lower()
-    user_filter = str(username or "").strip().lower()
-    action_filter = str(action or "").strip().lower()
-    status_filter = str(status or "").strip().lower()
-    source_filter = str(source or "").strip().lower()
-    since_cutoff = None
+USER_ACTION_HIDDEN_ACTIONS = ("page_navigation", "admin_widget_action")
+
+
+def _user_action_filters(org_code=None, username=None, action=None, status=None, source=None, since_hours=None, exclude_actions=None, search=None):
+    since = None
     if since_hours is not None:
         try:
             hours = float(since_hours)
             if hours > 0:
-                since_cutoff = datetime.now() - timedelta(hours=hours)
+                since = datetime.now() - timedelta(hours=hours)
         except Exception:
-            since_cutoff = None
+            since = None
+    return {
+        "org_code": str(org_code or "").strip() or None,
+        "username": str(username or "").strip() or None,
+        "action": str(action or "").strip() or None,
+        "status": str(status or "").strip() or None,
+        "source": str(source or "").strip() or None,
+        "since": since,
+        "exclude_actions": list(USER_ACTION_HIDDEN_ACTIONS) + list(exclude_actions or []),
+        "search": str(search or "").strip() or None,
+    }
 
-    filtered = []
-    excluded_actions = {"page_navigation", "admin_widget_action"}
-    for event in events:
-        action_value = str(event.get("action") or "").strip()
-        if action_value in excluded_actions:
-            continue
-        if org_filter and str(event.get("org_code") or "").strip().lower() != org_filter:
-            continue
-        if user_filter and user_filter not in str(event.get("username") or "").strip().lower():
-            continue
-        if action_filter and action_filter not in action_value.lower():
-            continue
-        if status_filter and status_filter != str(event.get("status") or "").strip().lower():
-            continue
-        if source_filter and source_filter not in str(event.get("source") or "").strip().lower():
-            continue
-        if since_cutoff is not None:
-            ts = _parse_user_action_timestamp(event.get("timestamp"))
-            if ts is None or ts < since_cutoff:
-                continue
-        filtered.append(event)
 
-    filtered.sort(
-        key=lambda ev: _parse_user_action_timestamp(ev.get("timestamp")) or datetime.min,
-        reverse=True,
-    )
-    if limit is None:
-        return filtered
+def _user_action_log_for_read():
+    log = _shared_user_action_store().get("log")
+    if log is not None:
+        # Show events still sitting in the writer queue.
+        log.flush(timeout=2)
+    return log
+
+
+def _get_user_action_events(limit=500, org_code=None, username=None, action=None, status=None, source=None, since_hours=None, exclude_actions=None, search=None, offset=0):
+    log = _user_action_log_for_read()
+    if log is None:
+        return []
+    if limit is not None:
+        try:
+            limit = max(1, int(limit))
+        except Exception:
+            limit = 500
+    filters = _user_action_filters(org_code, username, action, status, source, since_hours, exclude_actions, search)
     try:
-        lim = max(1, int(limit))
+        events = log.query(limit=limit, offset=offset, **filters)
     except Exception:
-        lim = 500
-    return filtered[:lim]
+        return []
+    return [_normalize_user_action(event) for event in events]
+
+
+def _count_user_action_events(org_code=None, username=None, action=None, status=None, source=None, since_hours=None, exclude_actions=None, search=None):
+    log = _user_action_log_for_read()
+    if log is None:
+        return 0
+    try:
+        return log.count(**_user_action_filters(org_code, username, action, status, source, since_hours, exclude_actions, search))
+    except Exception:
+        return 0
+
+
+def _get_user_action_sources(org_code=None, username=None, action=None, status=None, since_hours=None):
+    log = _user_action_log_for_read()
+    if log is None:
+        return []
+    try:
+        return log.distinct_values("source", **_user_action_filters(org_code, username, action, status, None, since_hours))
+    except Exception:
+        return []
 
 
 def _log_user_action(action, detail=None, metadata=None, status="info", source="app", username=None, org_code=None, role=None, page=None):
@@ -1684,9 +1640,7 @@ def _log_user_action(action, detail=None, metadata=None, status="info", source="
     )
 
 
-def _monitor_api_call_audit_observer(entry):
-    if not isinstance(entry, dict):
-        return
+def _build_api_audit_event(entry, context, timestamp):
     endpoint = str(entry.get("endpoint") or "").strip()
     method = str(entry.get("method") or "").strip().upper() or "GET"
     raw_status = entry.get("status_code")
@@ -1703,24 +1657,12 @@ def _monitor_api_call_audit_observer(entry):
     else:
         action_status = "error"
 
-    try:
-        app_user = st.session_state.get("app_user") or {}
-        username = str(app_user.get("username") or "-").strip() or "-"
-        org_code = str(app_user.get("org_code") or "-").strip() or "-"
-        role = str(app_user.get("role") or "-").strip() or "-"
-        page = str(st.session_state.get("page") or "-").strip() or "-"
-    except Exception:
-        username = "-"
-        org_code = "-"
-        role = "-"
-        page = "-"
-
-    _append_user_action(
+    return _build_user_action_event(
         action="api_request",
-        username=username,
-        org_code=org_code,
-        role=role,
-        page=page,
+        username=context.get("username"),
+        org_code=context.get("org_code"),
+        role=context.get("role"),
+        page=context.get("page"),
         status=action_status,
         detail=f"{method} {endpoint}" if endpoint else method,
         metadata={
@@ -1731,9 +1673,32 @@ def _monitor_api_call_audit_observer(entry):
             "timestamp": entry.get("timestamp"),
         },
         source="api-monitor",
+        timestamp=timestamp,
     )
 
 
+def _monitor_api_call_audit_observer(entry):
+    # Runs on every API call (including DataManager/websocket threads): capture the
+    # session context and enqueue; formatting and file IO happen on the writer thread.
+    if not isinstance(entry, dict):
+        return
+    log = _shared_user_action_store().get("log")
+    if log is None:
+        return
+    try:
+        app_user = st.session_state.get("app_user") or {}
+        context = {
+            "username": app_user.get("username"),
+            "org_code": app_user.get("org_code"),
+            "role": app_user.get("role"),
+            "page": st.session_state.get("page"),
+        }
+    except Exception:
+        context = {}
+    timestamp = datetime.now()
+    log.enqueue(lambda: _build_api_audit_event(entry, context, timestamp))
+
+
 try:
     monitor.register_api_call_observer("user-action-audit", _monitor_api_call_audit_observer)
 except Exception:
@@ -1891,6 +1856,7 @@ def _soft_memory_cleanup():
                     dm.daily_data_cache = {}
                     dm.agent_details_cache = {}
                     dm.queue_members_cache = {}
+                    dm.queue_member_refresh_ts = {}
                     dm.last_member_refresh = 0
                     dm.last_daily_refresh = 0
                     dm.last_update_time = 0
@@ -1900,9 +1866,16 @@ def _soft_memory_cleanup():
         pass
 
     try:
-        # Clear org maps cache
+        # Clear org maps cache; snapshots reload from disk on next use
         global _org_maps_cache
         _org_maps_cache = {}
+        unload_org_maps_snapshots()
+    except Exception:
+        pass
+
+    try:
+        # Shared report frames are rebuilt on the next fetch
+        clear_report_caches()
     except Exception:
         pass
     
@@ -2795,7 +2768,12 @@ def ensure_agent_notifications_manager(max_orgs=20):
                     pass
                 store["agent"].pop(oldest_key, None)
         nm = store["agent"].get(org_code)
-        if nm is None or not hasattr(nm, "seed_users_missing") or not hasattr(nm, "get_active_calls"):
+        if (
+            nm is None
+            or not hasattr(nm, "seed_users_missing")
+            or not hasattr(nm, "get_active_calls")
+            or not hasattr(nm, "add_event_listener")
+        ):
             nm = AgentNotificationManager()
             store["agent"][org_code] = nm
     return nm
@@ -2820,83 +2798,32 @@ def ensure_global_conversation_manager(max_orgs=20):
     return nm
 
 def _fetch_org_maps(api):
-    users = api.get_users()
-    queues = api.get_queues()
-    wrapup = api.get_wrapup_codes()
-    presence = api.get_presence_definitions()
-
-    def _decorate_name(raw_name, entity_id, state):
-        base = str(raw_name or entity_id or "").strip() or str(entity_id or "")
-        state_norm = str(state or "").strip().lower()
-        if state_norm and state_norm not in {"active", "enabled"}:
-            return f"{base} ({entity_id})"
-        return base
-
-    def _safe_insert_label(label_map, label, entity_id):
-        normalized_id = str(entity_id or "").strip()
-        if not normalized_id:
-            return
-        candidate = str(label or normalized_id).strip() or normalized_id
-        if label_map.get(candidate) == normalized_id:
-            return
-        if candidate not in label_map:
-            label_map[candidate] = normalized_id
-            return
-        suffix = 2
-        while True:
-            alternative = f"{candidate} ({suffix})"
-            if alternative not in label_map:
-                label_map[alternative] = normalized_id
-                return
-            if label_map.get(alternative) == normalized_id:
-                return
-            suffix += 1
-
-    users_map = {}
-    for u in users:
-        uid = u.get('id')
-        if not uid:
-            continue
-        decorated_name = _decorate_name(u.get('name', ''), uid, u.get('state', ''))
-        _safe_insert_label(users_map, decorated_name, uid)
-
-    users_info = {
-        u['id']: {
-            'name': _decorate_name(u.get('name', ''), u.get('id'), u.get('state', '')),
-            'username': u.get('username', ''),
-            'email': u.get('email', ''),
-            'state': u.get('state', ''),
-        } for u in users
-        if u.get('id')
-    }
+    # Direct fetch, used only when the org has no state dir for a snapshot.
+    return build_org_maps(
+        api.get_users(),
+        api.get_queues(),
+        api.get_wrapup_codes(),
+        api.get_presence_definitions(),
+    )
 
-    queues_map = {}
-    for q in queues:
-        qid = q.get('id')
-        if not qid:
-            continue
-        decorated_name = _decorate_name(q.get('name', ''), qid, q.get('state', ''))
-        _safe_insert_label(queues_map, decorated_name, qid)
+def get_shared_org_maps(org_code, api, ttl_seconds=300, force_refresh=False):
+    """
+    Org lookup maps served from the on-disk snapshot of the org.
 
-    return {
-        "users": users,
-        "queues": queues,
-        "wrapup": wrapup,
-        "presence": presence,
-        "users_map": users_map,
-        "users_info": users_info,
-        "queues_map": queues_map,
-        # Lightweight copies for cache storage (no raw API lists)
-        "_lite": {
-            "wrapup": wrapup,
-            "presence": presence,
-            "users_map": users_map,
-            "users_info": users_info,
-            "queues_map": queues_map,
-        }
-    }
+    A snapshot on disk is returned immediately, even after a restart; when it is
+    older than ``ttl_seconds`` it is refreshed incrementally in the background.
+    Only an org without any snapshot (or ``force_refresh``) waits for the API.
+    """
+    snapshot = get_org_maps_snapshot(org_code)
+    if snapshot is not None:
+        if force_refresh or not snapshot.has_data():
+            snapshot.refresh(api, force=force_refresh)
+        elif snapshot.age_seconds() >= ttl_seconds:
+            snapshot.refresh_async(api)
+        maps = snapshot.maps()
+        if maps is not None:
+            return maps
 
-def get_shared_org_maps(org_code, api, ttl_seconds=300, force_refresh=False):
     now = pytime.time()
     with _org_maps_lock:
         # Prune old entries to prevent memory growth - reduced from 6h to 30min
@@ -2910,14 +2837,9 @@ def get_shared_org_maps(org_code, api, ttl_seconds=300, force_refresh=False):
         entry = _org_maps_cache.get(org_code)
         if entry and not force_refresh and (now - entry.get("ts", 0)) < ttl_seconds:
             return entry
-    maps = _fetch_org_maps(api)
-    # Store lightweight version in cache (no raw user/queue lists)
-    lite = maps.pop("_lite", maps)
-    lite_entry = {"ts": now, **lite}
+    maps = {"ts": now, **_fetch_org_maps(api)}
     with _org_maps_lock:
-        _org_maps_cache[org_code] = lite_entry
-    # Return full maps (including raw lists) for immediate use
-    maps["ts"] = now
+        _org_maps_cache[org_code] = maps
     return maps
 
 def refresh_data_manager_queues():
@@ -2957,6 +2879,11 @@ def refresh_data_manager_queues():
     refresh_s = _resolve_refresh_interval_seconds(org_code, minimum=10, default=10)
     st.session_state.data_manager.update_settings(utc_offset, refresh_s)
     dm_agent_queues = {} if use_agent_notif else union_agent_queues
+    # Hybrid mode: websocket presence/routing deltas patch DataManager routing activity between REST sweeps.
+    # Agent tiles read AgentNotificationManager directly, so DataManager gets no agent queues here.
+    # The shared per-org manager is looked up (not rebuilt) on each refresh; attaching the same
+    # instance again is a no-op.
+    st.session_state.data_manager.attach_event_source(ensure_agent_notifications_manager() if use_agent_notif else None)
     st.session_state.data_manager.start(union_queues, dm_agent_queues)
 
 def recover_org_maps_if_needed(org_code, force=False):
@@ -2976,7 +2903,7 @@ def recover_org_maps_if_needed(org_code, force=False):
         st.session_state.users_map = maps.get("users_map", st.session_state.get("users_map", {}))
         st.session_state.users_info = maps.get("users_info", st.session_state.get("users_info", {}))
         if st.session_state.users_info:
-            st.session_state._users_info_last = dict(st.session_state.users_info)
+            st.session_state._users_info_last = st.session_state.users_info
         st.session_state.queues_map = maps.get("queues_map", st.session_state.get("queues_map", {}))
         st.session_state.wrapup_map = maps.get("wrapup", st.session_state.get("wrapup_map", {}))
         st.session_state.presence_map = maps.get("presence", st.session_state.get("presence_map", {}))
@@ -3389,7 +3316,7 @@ if st.session_state.app_user:
                 st.session_state.users_map = maps.get("users_map", {})
                 st.session_state.users_info = maps.get("users_info", {})
                 if st.session_state.users_info:
-                    st.session_state._users_info_last = dict(st.session_state.users_info)
+                    st.session_state._users_info_last = st.session_state.users_info
                 st.session_state.queues_map = maps.get("queues_map", {})
                 st.session_state.wrapup_map = maps.get("wrapup", {})
                 st.session_state.presence_map = maps.get("presence", {})
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: timeline actor eşleştirme (find_best_actor_for_transition).
+
+Yoğun bir agent için çok günlük sentetik audit kayıtları ve presence/routing
+segmentleri üretir; eski doğrusal tarama ile servis bazlı zaman indeksini
+karşılaştırır ve üretilen timeline satırlarının aynı olduğunu doğrular.
+
+Kullanım:
+    python benchmark_actor_matching.py [--events 5000] [--segments 3000] [--days 7]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Proje kök dizini
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.app.utils.status_helpers import build_timeline_rows_from_segments, prepare_actor_events
+
+STATUSES = ["Available", "Away", "Break", "Meal", "Meeting", "Training", "Offline"]
+ROUTING = ["OFF_QUEUE", "IDLE", "INTERACTING", "NOT_RESPONDING"]
+USER_ID = "00000000-0000-0000-0000-00000000a9e7"
+
+
+def build_audit_entities(count, start, days, rng):
+    span = days * 86400
+    entities = []
+    for i in range(count):
+        service = "Presence" if rng.random() < 0.6 else "Routing"
+        values = STATUSES if service == "Presence" else ROUTING
+        old, new = rng.sample(values, 2)
+        actor = USER_ID if rng.random() < 0.7 else f"00000000-0000-0000-0000-{i % 25:012d}"
+        entities.append({
+            "id": f"audit-{i:06d}",
+            "serviceName": service,
+            "eventDate": (start + timedelta(seconds=rng.uniform(0, span))).isoformat().replace("+00:00", "Z"),
+            "user": {"id": actor, "name": f"Kullanıcı {actor[-4:]}"},
+            "entity": {"id": USER_ID},
+            "propertyChanges": [{
+                "property": "presence" if service == "Presence" else "routingStatus",
+                "oldValues": [old],
+                "newValues": [new],
+            }],
+        })
+    return entities
+
+
+def build_segments(count, start, days, rng, key, values):
+    span = days * 86400
+    starts = sorted(rng.uniform(0, span) for _ in range(count))
+    segments = []
+    for idx, offset in enumerate(starts):
+        end = starts[idx + 1] if idx + 1 < len(starts) else span
+        segments.append({
+            "startTime": (start + timedelta(seconds=offset)).isoformat().replace("+00:00", "Z"),
+            "endTime": (start + timedelta(seconds=end)).isoformat().replace("+00:00", "Z"),
+            key: rng.choice(values),
+        })
+    return segments
+
+
+def run(actor_events, presence_segments, routing_segments, start, end):
+    rows = build_timeline_rows_from_segments(
+        presence_segments, "Presence", lambda s: s.get("systemPresence"), start, end, actor_events,
+    )
+    rows += build_timeline_rows_from_segments(
+        routing_segments, "Routing", lambda s: s.get("routingStatus"), start, end, actor_events,
+    )
+    return rows
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--segments", type=int, default=3000)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=args.days)
+    entities = build_audit_entities(args.events, start, args.days, rng)
+    presence = build_segments(args.segments, start, args.days, rng, "systemPresence", STATUSES)
+    routing = build_segments(args.segments, start, args.days, rng, "routingStatus", ROUTING)
+    print(f"Girdi: {len(entities):,} audit kaydı, {len(presence) + len(routing):,} segment, {args.days} gün")
+
+    indexed, prep_s = timed(prepare_actor_events, entities, USER_ID)
+    print(f"Hazırlık : {prep_s:8.2f} sn")
+
+    new_rows, new_s = timed(run, indexed, presence, routing, start, end)
+    print(f"İndeksli : {new_s:8.2f} sn -> {len(new_rows):,} satır")
+
+    legacy_rows, old_s = timed(run, list(indexed), presence, routing, start, end)
+    print(f"Doğrusal : {old_s:8.2f} sn -> {len(legacy_rows):,} satır")
+
+    assert legacy_rows == new_rows, "Eşleştirme sonuçları farklı"
+    matched = sum(1 for r in new_rows if r.get("Audit ID") != "-")
+    print(f"Sonuç aynı ({matched:,} eşleşme), hızlanma: {old_s / max(new_s, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fill_interval_gaps (aralık boşluklarını sıfır satırlarla doldurma).
+
+500 agent x 30 gün x 48 aralık (PT30M) sentetik rapor üretir, satırların yarısını
+siler ve eski iterrows + merge döngüsü ile yeni vektörel sürümü karşılaştırır.
+
+Kullanım:
+    python benchmark_interval_gaps.py [--agents 500] [--days 30] [--density 0.5] [--skip-legacy]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Proje kök dizini
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.processor import fill_interval_gaps
+
+
+def legacy_fill_interval_gaps(df, start_dt_local, end_dt_local, granularity):
+    """Önceki (grup başına merge) uygulama; yalnızca karşılaştırma için."""
+    if df.empty or "Interval" not in df.columns: return df
+    delta = timedelta(days=1)
+    if granularity == "PT30M": delta = timedelta(minutes=30)
+    elif granularity == "PT1H": delta = timedelta(hours=1)
+
+    expected_intervals = []
+    curr = start_dt_local
+    while curr < end_dt_local:
+        expected_intervals.append(curr.strftime("%Y-%m-%d %H:%M"))
+        curr += delta
+
+    group_cols = [c for c in df.columns if c not in df.select_dtypes(include=['number']).columns and c != "Interval"]
+    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+    zero_template = {c: 0 for c in numeric_cols}
+
+    unique_groups = df[group_cols].drop_duplicates()
+    new_rows = []
+    for _, group_row in unique_groups.iterrows():
+        existing_intervals = set(df.merge(group_row.to_frame().T)["Interval"].tolist())
+        for interval in expected_intervals:
+            if interval not in existing_intervals:
+                new_row = group_row.to_dict()
+                new_row["Interval"] = interval
+                new_row.update(zero_template)
+                new_rows.append(new_row)
+
+    if new_rows:
+        df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+        df = df.sort_values(by=["Interval"] + group_cols).reset_index(drop=True)
+    return df
+
+
+def build_report(agents, days, density, seed=42):
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    slots = days * 48
+    labels = pd.date_range(start, periods=slots, freq="30min").strftime("%Y-%m-%d %H:%M").to_numpy()
+    agent_idx = np.repeat(np.arange(agents), slots)
+    slot_idx = np.tile(np.arange(slots), agents)
+    keep = rng.random(agent_idx.size) < density
+    count = int(keep.sum())
+    df = pd.DataFrame({
+        "Interval": labels[slot_idx[keep]],
+        "AgentName": [f"Agent {i:04d}" for i in agent_idx[keep]],
+        "Id": [f"user-{i:04d}" for i in agent_idx[keep]],
+        "nAnswered": rng.integers(0, 20, count),
+        "tTalk": rng.random(count) * 1800,
+        "tHandle": rng.random(count) * 2400,
+    })
+    return df, start, start + timedelta(days=days)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", type=int, default=500)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    df, start, end = build_report(args.agents, args.days, args.density)
+    print(f"Girdi: {len(df):,} satır, {args.agents} agent, {args.days} gün, PT30M")
+
+    filled, new_s = timed(fill_interval_gaps, df, start, end, "PT30M")
+    print(f"Vektörel : {new_s:8.2f} sn -> {len(filled):,} satır")
+
+    if args.skip_legacy:
+        return
+    legacy, old_s = timed(legacy_fill_interval_gaps, df, start, end, "PT30M")
+    print(f"Eski     : {old_s:8.2f} sn -> {len(legacy):,} satır")
+    pd.testing.assert_frame_equal(legacy, filled, check_dtype=False)
+    print(f"Sonuç aynı, hızlanma: {old_s / max(new_s, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
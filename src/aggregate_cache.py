@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.monitor import monitor
+from src.org_state import _env_int, OrgRegistry
+
+
+class AggregateResultCache:
+    """
+    SQLite store for analytics aggregate query results of closed intervals.
+
+    Results of an interval that ended before the settle window never change, so
+    they are kept per org and keyed by the normalized query body (interval,
+    granularity, groupBy, filter, metrics). Open intervals are never stored.
+    """
+
+    FILENAME = "aggregate_cache.sqlite"
+    MAX_ENTRIES = _env_int("GENESYS_AGGREGATE_CACHE_MAX_ENTRIES", 20000, minimum=100)
+    PRUNE_EVERY_WRITES = 200
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS aggregate_results ("
+                " query_key TEXT PRIMARY KEY,"
+                " interval TEXT NOT NULL,"
+                " results TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_aggregate_results_used ON aggregate_results(last_used_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def query_key(query):
+        """Stable hash of a query body; list order of metrics does not matter."""
+        normalized = dict(query or {})
+        if isinstance(normalized.get("metrics"), list):
+            normalized["metrics"] = sorted(normalized["metrics"])
+        raw = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, query):
+        """Return cached ``results`` for the query, or None on miss."""
+        key = self.query_key(query)
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT results FROM aggregate_results WHERE query_key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE aggregate_results SET last_used_at = ? WHERE query_key = ?", (time.time(), key)
+                )
+                conn.commit()
+                self.hits += 1
+            return json.loads(row[0])
+        except Exception as e:
+            monitor.log_error("AGG_CACHE", f"Aggregate cache read failed: {e}")
+            return None
+
+    def put(self, query, results):
+        key = self.query_key(query)
+        try:
+            payload = json.dumps(results or [], separators=(",", ":"), default=str)
+            now = time.time()
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO aggregate_results (query_key, interval, results, created_at, last_used_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, str((query or {}).get("interval") or ""), payload, now, now),
+                )
+                conn.commit()
+                self._writes += 1
+                if self._writes % self.PRUNE_EVERY_WRITES == 0:
+                    self._prune(conn)
+        except Exception as e:
+            monitor.log_error("AGG_CACHE", f"Aggregate cache write failed: {e}")
+
+    def _prune(self, conn):
+        count = conn.execute("SELECT COUNT(*) FROM aggregate_results").fetchone()[0]
+        overflow = int(count) - int(self.MAX_ENTRIES)
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM aggregate_results WHERE query_key IN ("
+                " SELECT query_key FROM aggregate_results ORDER BY last_used_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            conn.commit()
+
+    def clear(self):
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM aggregate_results")
+                conn.commit()
+        except Exception as e:
+            monitor.log_error("AGG_CACHE", f"Aggregate cache clear failed: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+
+# Process-wide aggregate cache of an org, or None if it has no state dir.
+get_aggregate_cache = OrgRegistry(AggregateResultCache.FILENAME, AggregateResultCache)
@@ -1,12 +1,22 @@
 import copy
+import csv
+import hashlib
+import io
 import time
 import random
 import re
 import os
 import sys
+import threading
 import requests
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timezone, timedelta
+from queue import Full, Queue
+from src.aggregate_cache import get_aggregate_cache
+from src.audit_store import get_audit_store
 from src.monitor import monitor
+from src.rate_limiter import PRIORITY_BULK, PRIORITY_LIVE, PRIORITY_NORMAL, get_rate_limiter
 
 def _resolve_ca_bundle():
     """Resolve CA bundle path for frozen (PyInstaller) environments."""
@@ -33,12 +43,35 @@ if _ca_bundle is not None:
 class GenesysAPI:
     ASSIGNMENT_BATCH_SIZE = 50
     AGGREGATE_METRICS_BATCH_SIZE = 20
+    # Aggregates of intervals that ended this long ago are final and served from the org disk cache.
+    AGGREGATE_CACHE_SETTLE_SECONDS = 2 * 3600
     HTTP_429_RETRY_SECONDS = 60
     HTTP_429_MAX_RETRIES = 3
     HTTP_429_MAX_TOTAL_WAIT_SECONDS = 180
     HTTP_429_WAIT_CAP_SECONDS = 120
     QUEUE_MEMBER_429_RETRY_SECONDS = 60
     QUEUE_MEMBER_429_MAX_RETRIES = 1
+    DETAILS_CHUNK_MAX_WORKERS = 4
+    # Pages a chunk worker may hold ahead of the consumer.
+    DETAILS_CHUNK_BUFFER_PAGES = 2
+    USER_STATUS_BATCH_SIZE = 100
+    USER_STATUS_MAX_WORKERS = 4
+    USER_AGGREGATE_MAX_WORKERS = 4
+    CONTACT_BULK_GET_SIZE = 50
+    CONTACT_BULK_WRITE_SIZE = 50
+    # Async audit transactions kept in flight at once and shared poll backoff.
+    AUDIT_QUERY_MAX_IN_FLIGHT = 6
+    AUDIT_QUERY_POLL_INITIAL_SECONDS = 0.5
+    AUDIT_QUERY_POLL_MAX_SECONDS = 4.0
+    PRIORITY_LIVE = PRIORITY_LIVE
+    PRIORITY_NORMAL = PRIORITY_NORMAL
+    PRIORITY_BULK = PRIORITY_BULK
+    # Org key -> (metric profile index, payload variant index) accepted by users/aggregates.
+    _user_aggregate_variant_by_org = {}
+    _user_aggregate_variant_lock = threading.Lock()
+    # (api host, path) -> whether the endpoint honours sortBy=dateModified desc.
+    _modified_sort_by_endpoint = {}
+    _modified_sort_lock = threading.Lock()
     QUEUE_READ_ONLY_FIELDS = {
         "id",
         "selfUri",
@@ -51,13 +84,26 @@ class GenesysAPI:
         "joinedMemberCount",
     }
 
-    def __init__(self, auth_data):
+    def __init__(self, auth_data, priority=PRIORITY_NORMAL):
         self.access_token = auth_data['access_token']
         self.api_host = auth_data['api_host']
+        self.priority = priority
+        self.org_code = auth_data.get("org_code")
+        # Genesys budgets requests per OAuth client; share one limiter per org.
+        limiter_key = auth_data.get("org_code") or f"{self.api_host}|{hashlib.sha1(self.access_token.encode('utf-8')).hexdigest()[:16]}"
+        self._rate_limiter = get_rate_limiter(limiter_key)
         self.headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
         }
+        self._http_429_local = threading.local()
+
+    def _send(self, method, path, **kwargs):
+        """Issue one HTTP request through the shared org rate limiter."""
+        self._rate_limiter.acquire(self.priority)
+        response = _session.request(method, f"{self.api_host}{path}", **kwargs)
+        self._rate_limiter.observe(response)
+        return response
 
     def _get(self, path, params=None, suppress_error_statuses=None):
         start = time.monotonic()
@@ -72,7 +118,7 @@ class GenesysAPI:
             suppressed_statuses = set()
         while True:
             try:
-                response = _session.get(f"{self.api_host}{path}", headers=headers, params=params, timeout=10)
+                response = self._send("GET", path, headers=headers, params=params, timeout=10)
                 duration_ms = int((time.monotonic() - start) * 1000)
                 monitor.log_api_call(path, method="GET", status_code=response.status_code, duration_ms=duration_ms)
                 response.raise_for_status()
@@ -160,12 +206,18 @@ class GenesysAPI:
             return False
         return retry_count <= max_retries
 
+    def _http_429_seen(self):
+        """429 responses seen by the calling thread (chunk workers attribute their own)."""
+        local = getattr(self, "_http_429_local", None)
+        return getattr(local, "count", 0) if local is not None else 0
+
     def _next_429_wait(self, response, retry_count, total_wait_seconds):
+        local = getattr(self, "_http_429_local", None)
+        if local is not None:
+            local.count = getattr(local, "count", 0) + 1
         if not self._can_retry_429(retry_count):
             return None, total_wait_seconds
         wait_s = self._get_retry_after_seconds(response)
-        # Small jitter avoids synchronized bursts after Retry-After.
-        wait_s += random.uniform(0, 0.5)
         projected_wait = float(total_wait_seconds) + float(wait_s)
         try:
             max_total_wait = int(self.HTTP_429_MAX_TOTAL_WAIT_SECONDS or 0)
@@ -173,7 +225,16 @@ class GenesysAPI:
             max_total_wait = 0
         if max_total_wait > 0 and projected_wait > max_total_wait:
             return None, projected_wait
-        return wait_s, projected_wait
+        # The org limiter already holds the retry (it goes through acquire) until
+        # Retry-After; sleep only the part it does not enforce.
+        limiter = getattr(self, "_rate_limiter", None)
+        try:
+            enforced = limiter.blocked_seconds() if limiter is not None else 0.0
+        except Exception:
+            enforced = 0.0
+        # Small jitter avoids synchronized bursts after Retry-After.
+        sleep_s = max(0.0, float(wait_s) - enforced) + random.uniform(0, 0.5)
+        return sleep_s, projected_wait
 
     def _post(self, path, data, timeout=10, retries=0, retry_sleep=0.4, params=None):
         start = time.monotonic()
@@ -184,8 +245,9 @@ class GenesysAPI:
         total_wait_429 = 0.0
         while True:
             try:
-                response = _session.post(
-                    f"{self.api_host}{path}",
+                response = self._send(
+                    "POST",
+                    path,
                     headers=headers,
                     json=data,
                     params=params,
@@ -252,7 +314,7 @@ class GenesysAPI:
         total_wait_429 = 0.0
         while True:
             try:
-                response = _session.put(f"{self.api_host}{path}", headers=headers, json=data, timeout=10)
+                response = self._send("PUT", path, headers=headers, json=data, timeout=10)
                 duration_ms = int((time.monotonic() - start) * 1000)
                 monitor.log_api_call(path, method="PUT", status_code=response.status_code, duration_ms=duration_ms)
                 response.raise_for_status()
@@ -305,7 +367,7 @@ class GenesysAPI:
         total_wait_429 = 0.0
         while True:
             try:
-                response = _session.patch(f"{self.api_host}{path}", headers=headers, json=data or {}, timeout=15)
+                response = self._send("PATCH", path, headers=headers, json=data or {}, timeout=15)
                 duration_ms = int((time.monotonic() - start) * 1000)
                 monitor.log_api_call(path, method="PATCH", status_code=response.status_code, duration_ms=duration_ms)
                 response.raise_for_status()
@@ -357,8 +419,9 @@ class GenesysAPI:
         total_wait_429 = 0.0
         while True:
             try:
-                response = _session.delete(
-                    f"{self.api_host}{path}",
+                response = self._send(
+                    "DELETE",
+                    path,
                     headers=headers,
                     params=params,
                     timeout=timeout,
@@ -721,9 +784,18 @@ class GenesysAPI:
         conversation_filters=None,
         segment_filters=None,
         allow_unfiltered_fallback=True,
+        max_workers=None,
     ):
         """Yields conversation detail pages to reduce memory usage.
 
+        Interval chunks are independent, so up to ``max_workers`` of them are
+        fetched in parallel. Pages are still yielded chunk by chunk in interval
+        order, so callers keep seeing ``conversationStart`` order. Workers hand
+        pages over through a small bounded queue, so at most
+        ``DETAILS_CHUNK_BUFFER_PAGES`` pages per worker wait in memory, and they
+        stop paging as soon as the caller stops iterating. The worker window
+        shrinks whenever a chunk ran into HTTP 429.
+
         Args:
             start_date: datetime (UTC)
             end_date: datetime (UTC)
@@ -734,69 +806,185 @@ class GenesysAPI:
             conversation_filters: optional list for details query conversationFilters
             segment_filters: optional list for details query segmentFilters
             allow_unfiltered_fallback: when False, fallback never drops filters entirely
+            max_workers: parallel chunk fetches (defaults to DETAILS_CHUNK_MAX_WORKERS, 1 = sequential)
         """
+        intervals = []
         current_start = start_date
         while current_start < end_date:
             current_end = min(current_start + timedelta(days=chunk_days), end_date)
-            interval = f"{current_start.strftime('%Y-%m-%dT%H:%M:%S.000Z')}/{current_end.strftime('%Y-%m-%dT%H:%M:%S.000Z')}"
+            intervals.append(
+                f"{current_start.strftime('%Y-%m-%dT%H:%M:%S.000Z')}/{current_end.strftime('%Y-%m-%dT%H:%M:%S.000Z')}"
+            )
+            current_start = current_end
+
+        def _chunk_pages(interval, stop_event=None, stats=None):
+            return self._iter_conversation_detail_chunk(
+                interval,
+                page_size=page_size,
+                max_pages=max_pages,
+                order=order,
+                conversation_filters=conversation_filters,
+                segment_filters=segment_filters,
+                allow_unfiltered_fallback=allow_unfiltered_fallback,
+                stop_event=stop_event,
+                stats=stats,
+            )
+
+        try:
+            worker_cap = int(self.DETAILS_CHUNK_MAX_WORKERS if max_workers is None else max_workers)
+        except Exception:
+            worker_cap = 1
+        worker_cap = max(1, min(worker_cap, len(intervals)))
+        if worker_cap <= 1:
+            for interval in intervals:
+                yield from _chunk_pages(interval)
+            return
+
+        stop = threading.Event()
+        chunk_done = object()
+
+        def _offer(pages_q, item):
+            # Bounded hand-off: a worker ahead of the consumer waits here instead of buffering its chunk.
+            while not stop.is_set():
+                try:
+                    pages_q.put(item, timeout=0.5)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def _fetch_chunk(interval, pages_q, stats):
             try:
-                page_number = 1
+                for page in _chunk_pages(interval, stop_event=stop, stats=stats):
+                    if not _offer(pages_q, page):
+                        return
+            finally:
+                _offer(pages_q, chunk_done)
+
+        window = worker_cap
+        pending = deque()
+        next_idx = 0
+        executor = ThreadPoolExecutor(max_workers=worker_cap, thread_name_prefix="details-chunk")
+        try:
+            while next_idx < len(intervals) or pending:
+                while next_idx < len(intervals) and len(pending) < window:
+                    pages_q = Queue(maxsize=self.DETAILS_CHUNK_BUFFER_PAGES)
+                    stats = {"http_429": 0}
+                    fut = executor.submit(_fetch_chunk, intervals[next_idx], pages_q, stats)
+                    pending.append((fut, pages_q, stats))
+                    next_idx += 1
+                fut, pages_q, stats = pending.popleft()
                 while True:
-                    base_query = {
-                        "interval": interval,
-                        "paging": {"pageSize": page_size, "pageNumber": page_number},
-                        "order": order,
-                        "orderBy": "conversationStart"
-                    }
-                    query = dict(base_query)
-                    if conversation_filters:
-                        query["conversationFilters"] = conversation_filters
-                    if segment_filters:
-                        query["segmentFilters"] = segment_filters
+                    page = pages_q.get()
+                    if page is chunk_done:
+                        break
+                    yield page
+                fut.result()
+                if stats["http_429"] and window > 1:
+                    window = max(1, window // 2)
+                    monitor.log_error(
+                        "API_POST",
+                        f"Conversation details chunk concurrency reduced to {window} after HTTP 429",
+                    )
+        finally:
+            # Early consumer exit: running workers stop at their next page boundary.
+            stop.set()
+            for fut, _, _ in pending:
+                fut.cancel()
+            executor.shutdown(wait=False)
+
+    def _iter_conversation_detail_chunk(
+        self,
+        interval,
+        page_size=100,
+        max_pages=200,
+        order="asc",
+        conversation_filters=None,
+        segment_filters=None,
+        allow_unfiltered_fallback=True,
+        stop_event=None,
+        stats=None,
+    ):
+        """Yields detail pages of a single interval chunk; errors end the chunk.
 
-                    try:
-                        data = self._post("/api/v2/analytics/conversations/details/query", query)
-                    except Exception as primary_err:
-                        data = None
-                        recovered = False
-                        fallback_candidates = []
-
-                        # If combined filters fail (often due unsupported conversation dim),
-                        # retry with segment filters only, then unfiltered as final fallback.
-                        if conversation_filters and segment_filters:
-                            q_segment_only = dict(base_query)
-                            q_segment_only["segmentFilters"] = segment_filters
-                            fallback_candidates.append(("segment_only", q_segment_only))
-                        if (conversation_filters or segment_filters) and allow_unfiltered_fallback:
-                            fallback_candidates.append(("unfiltered", dict(base_query)))
-
-                        for mode, fallback_query in fallback_candidates:
-                            try:
-                                monitor.log_error(
-                                    "API_POST",
-                                    f"Conversation details fallback mode={mode} interval={interval} page={page_number} reason={primary_err}",
-                                )
-                                data = self._post("/api/v2/analytics/conversations/details/query", fallback_query)
-                                recovered = True
-                                break
-                            except Exception:
-                                continue
+        ``stop_event`` is checked between pages; ``stats["http_429"]`` counts the
+        429 responses this chunk ran into.
+        """
+        try:
+            page_number = 1
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    break
+                seen_429 = self._http_429_seen()
+                base_query = {
+                    "interval": interval,
+                    "paging": {"pageSize": page_size, "pageNumber": page_number},
+                    "order": order,
+                    "orderBy": "conversationStart"
+                }
+                query = dict(base_query)
+                if conversation_filters:
+                    query["conversationFilters"] = conversation_filters
+                if segment_filters:
+                    query["segmentFilters"] = segment_filters
 
-                        if not recovered:
-                            raise primary_err
+                try:
+                    data = self._post("/api/v2/analytics/conversations/details/query", query)
+                except Exception as primary_err:
+                    data = None
+                    recovered = False
+                    fallback_candidates = []
+
+                    # If combined filters fail (often due unsupported conversation dim),
+                    # retry with segment filters only, then unfiltered as final fallback.
+                    if conversation_filters and segment_filters:
+                        q_segment_only = dict(base_query)
+                        q_segment_only["segmentFilters"] = segment_filters
+                        fallback_candidates.append(("segment_only", q_segment_only))
+                    if (conversation_filters or segment_filters) and allow_unfiltered_fallback:
+                        fallback_candidates.append(("unfiltered", dict(base_query)))
+
+                    for mode, fallback_query in fallback_candidates:
+                        try:
+                            monitor.log_error(
+                                "API_POST",
+                                f"Conversation details fallback mode={mode} interval={interval} page={page_number} reason={primary_err}",
+                            )
+                            data = self._post("/api/v2/analytics/conversations/details/query", fallback_query)
+                            recovered = True
+                            break
+                        except Exception:
+                            continue
 
-                    page = data.get("conversations") or []
-                    if page:
-                        yield page
-                    if not page or len(page) < page_size or page_number >= max_pages:
-                        break
-                    page_number += 1
-            except Exception as e:
-                monitor.log_error("API_POST", f"Error streaming conversation details for chunk {interval}: {e}")
-            current_start = current_end
+                    if not recovered:
+                        raise primary_err
+
+                if stats is not None:
+                    stats["http_429"] = stats.get("http_429", 0) + (self._http_429_seen() - seen_429)
+                page = data.get("conversations") or []
+                if page:
+                    yield page
+                if not page or len(page) < page_size or page_number >= max_pages:
+                    break
+                page_number += 1
+        except Exception as e:
+            monitor.log_error("API_POST", f"Error streaming conversation details for chunk {interval}: {e}")
 
-    def get_conversation_details_recent(self, start_date, end_date, page_size=100, max_pages=5, order="desc"):
-        """Fetches recent conversation detail records for a short interval."""
+    def get_conversation_details_recent(
+        self,
+        start_date,
+        end_date,
+        page_size=100,
+        max_pages=5,
+        order="desc",
+        segment_filters=None,
+        raise_errors=False,
+    ):
+        """Fetches recent conversation detail records for a short interval.
+
+        With ``raise_errors`` a failed page raises instead of returning the pages read so far,
+        for callers that must know the result is complete.
+        """
         conversations = []
         interval = f"{start_date.strftime('%Y-%m-%dT%H:%M:%S.000Z')}/{end_date.strftime('%Y-%m-%dT%H:%M:%S.000Z')}"
         try:
@@ -808,6 +996,8 @@ class GenesysAPI:
                     "order": order,
                     "orderBy": "conversationStart"
                 }
+                if segment_filters:
+                    query["segmentFilters"] = segment_filters
                 data = self._post("/api/v2/analytics/conversations/details/query", query, timeout=20, retries=1)
                 page = data.get("conversations") or []
                 if page:
@@ -817,6 +1007,8 @@ class GenesysAPI:
                 page_number += 1
         except Exception as e:
             monitor.log_error("API_POST", f"Error fetching recent conversation details: {e}")
+            if raise_errors:
+                raise
         return conversations
 
     def get_outbound_conversations_by_queue(self, queue_id, start_date, end_date, page_size=100, max_pages=10):
@@ -899,7 +1091,8 @@ class GenesysAPI:
                     queues_by_id[qid] = {
                         'id': qid,
                         'name': queue.get('name', ''),
-                        'state': queue.get('state', '')
+                        'state': queue.get('state', ''),
+                        'dateModified': queue.get('dateModified', ''),
                     }
                 if not data.get('nextUri'):
                     break
@@ -919,6 +1112,54 @@ class GenesysAPI:
 
         return list(queues_by_id.values())
 
+    def get_entities_modified_since(self, path, since_iso, page_size=100, max_pages=50, params=None):
+        """Pages ``path`` newest-modified first and stops at entities older than ``since_iso``.
+
+        Returns (entities, complete). An early stop is trusted only once the endpoint has
+        been seen returning ``dateModified`` in descending order; that is remembered per
+        endpoint, as is an endpoint that ignores the sort. ``complete`` is False when the
+        order is unconfirmed or wrong, or the page cap was hit; callers then fall back to
+        a full scan.
+        """
+        sort_key = (self.api_host, path)
+        with self._modified_sort_lock:
+            sorted_desc = self._modified_sort_by_endpoint.get(sort_key)
+        if sorted_desc is False:
+            return [], False
+        entities_out = []
+        last_modified = None
+        for page_number in range(1, max_pages + 1):
+            query = {"pageNumber": page_number, "pageSize": page_size, "sortBy": "dateModified", "sortOrder": "desc"}
+            if isinstance(params, dict):
+                query.update(params)
+            data = self._get(path, params=query)
+            entities = data.get("entities") if isinstance(data, dict) else None
+            if not entities:
+                return entities_out, True
+            # Check the whole page before trusting any early stop on it.
+            page_modified = [str(entity.get("dateModified") or "") for entity in entities]
+            previous = last_modified
+            for modified in page_modified:
+                if not modified or (previous is not None and modified > previous):
+                    with self._modified_sort_lock:
+                        self._modified_sort_by_endpoint[sort_key] = False
+                    return entities_out, False
+                if previous is not None and modified < previous and not sorted_desc:
+                    sorted_desc = True
+                    with self._modified_sort_lock:
+                        self._modified_sort_by_endpoint[sort_key] = True
+                previous = modified
+            last_page = not data.get("nextUri")
+            for entity, modified in zip(entities, page_modified):
+                if since_iso and modified < since_iso:
+                    # Without a confirmed order, older rows further on prove nothing.
+                    return entities_out, bool(sorted_desc) or last_page
+                entities_out.append(entity)
+            last_modified = page_modified[-1]
+            if last_page:
+                return entities_out, True
+        return entities_out, False
+
     # --- OUTBOUND DIALER ---
     def get_outbound_campaigns(self, page_size=100, max_pages=20):
         """List outbound campaigns (per Genesys Cloud /api/v2/outbound/campaigns)."""
@@ -1446,6 +1687,71 @@ class GenesysAPI:
         }
         return self._post(f"/api/v2/outbound/contactlists/{contact_list_id}/contacts/search", payload)
 
+    def iter_outbound_contact_list_export(self, contact_list_id, columns=None, max_wait_seconds=120, poll_seconds=2.0):
+        """
+        Export a contact list and yield its contacts as ``{"id": ..., "data": {...}}``.
+
+        One export job plus one CSV download replaces paging the whole list. ``data`` is
+        limited to ``columns`` when given (the export adds dialer system columns). Raises
+        if the export does not finish within ``max_wait_seconds``.
+        """
+        contact_list_id = str(contact_list_id or "").strip()
+        if not contact_list_id:
+            raise ValueError("contact_list_id is required")
+        path = f"/api/v2/outbound/contactlists/{contact_list_id}/export"
+
+        def _latest_export():
+            try:
+                export = self._get(path, params={"download": "false"}, suppress_error_statuses=[404])
+            except requests.exceptions.HTTPError as e:
+                if not self._is_http_status(e, 404):
+                    raise
+                export = {}
+            stamp = str((export or {}).get("exportTimestamp") or "").strip()
+            try:
+                exported_at = datetime.fromisoformat(stamp.replace("Z", "+00:00")) if stamp else None
+            except Exception:
+                exported_at = None
+            return (export or {}).get("uri"), exported_at
+
+        # The endpoint keeps returning the previous export until ours is ready; compare
+        # against that export rather than the local clock, which may be skewed.
+        previous_uri, previous_at = _latest_export()
+        self._post(path, {}, timeout=30)
+        deadline = time.monotonic() + max(1.0, float(max_wait_seconds or 120))
+        uri = None
+        while uri is None:
+            export_uri, exported_at = _latest_export()
+            if exported_at is not None and previous_at is not None:
+                is_new = exported_at > previous_at
+            else:
+                is_new = export_uri != previous_uri
+            if export_uri and is_new:
+                uri = export_uri
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Contact list export {contact_list_id} did not finish in time")
+            time.sleep(poll_seconds)
+
+        keep = set(columns or [])
+        start = time.monotonic()
+        self._rate_limiter.acquire(self.priority)
+        response = _session.get(uri, headers={"Authorization": self.headers["Authorization"]}, timeout=120, stream=True)
+        self._rate_limiter.observe(response)
+        monitor.log_api_call(path, method="GET", status_code=response.status_code, duration_ms=int((time.monotonic() - start) * 1000))
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            reader = csv.DictReader(io.TextIOWrapper(response.raw, encoding="utf-8-sig", newline=""))
+            for row in reader:
+                cid = str(row.get("inin-outbound-id") or "").strip()
+                if not cid:
+                    continue
+                data = {k: v for k, v in row.items() if k and ((k in keep) if keep else not k.startswith("inin-"))}
+                yield {"id": cid, "data": data}
+        finally:
+            response.close()
+
     def search_outbound_contact_list_contacts(self, contact_list_id, column, value, page_number=1, page_size=25):
         """Search contacts in a contact list by a column equals value predicate."""
         contact_list_id = str(contact_list_id or "").strip()
@@ -1479,6 +1785,54 @@ class GenesysAPI:
         }
         return self._post(f"/api/v2/outbound/contactlists/{contact_list_id}/contacts/search", payload)
 
+    def get_outbound_contact_list_contacts_bulk(self, contact_list_id, contact_ids):
+        """Fetch up to CONTACT_BULK_GET_SIZE contacts of a list by id in one call."""
+        contact_list_id = str(contact_list_id or "").strip()
+        if not contact_list_id:
+            raise ValueError("contact_list_id is required")
+        ids = [str(cid or "").strip() for cid in (contact_ids or []) if str(cid or "").strip()]
+        if not ids:
+            return []
+        entities = []
+        for idx in range(0, len(ids), self.CONTACT_BULK_GET_SIZE):
+            batch = ids[idx:idx + self.CONTACT_BULK_GET_SIZE]
+            payload = self._post(f"/api/v2/outbound/contactlists/{contact_list_id}/contacts/bulk", batch, timeout=30, retries=1)
+            if isinstance(payload, list):
+                entities.extend([item for item in payload if isinstance(item, dict)])
+            elif isinstance(payload, dict):
+                entities.extend([item for item in (payload.get("entities") or []) if isinstance(item, dict)])
+        return entities
+
+    def update_outbound_contact_list_contacts_bulk(self, contact_list_id, contacts):
+        """Write full data objects of existing contacts in batches.
+
+        ``contacts`` items are ``{"id": ..., "data": {...}}``. Each POST to the bulk update
+        endpoint replaces the data of up to CONTACT_BULK_WRITE_SIZE existing contacts without
+        touching their dialing state. Returns the number of contacts written.
+        """
+        contact_list_id = str(contact_list_id or "").strip()
+        if not contact_list_id:
+            raise ValueError("contact_list_id is required")
+        rows = []
+        for item in contacts or []:
+            if not isinstance(item, dict):
+                continue
+            cid = str(item.get("id") or "").strip()
+            if not cid or not isinstance(item.get("data"), dict):
+                continue
+            rows.append({"id": cid, "contactListId": contact_list_id, "data": item.get("data")})
+        written = 0
+        for idx in range(0, len(rows), self.CONTACT_BULK_WRITE_SIZE):
+            batch = rows[idx:idx + self.CONTACT_BULK_WRITE_SIZE]
+            self._post(
+                f"/api/v2/outbound/contactlists/{contact_list_id}/contacts/bulk/update",
+                data=batch,
+                timeout=60,
+                retries=1,
+            )
+            written += len(batch)
+        return written
+
     def get_outbound_contact_list_contact(self, contact_list_id, contact_id):
         contact_list_id = str(contact_list_id or "").strip()
         contact_id = str(contact_id or "").strip()
@@ -2420,43 +2774,135 @@ class GenesysAPI:
         expand_user=True,
     ):
         """Run async audit query end-to-end and return merged entities."""
-        try:
-            start_resp = self.start_audit_query(
-                interval=interval,
-                service_name=service_name,
-                filters=filters,
-                sort_order=sort_order,
-            )
-        except Exception as e:
-            monitor.log_error("API_POST", f"Error starting async audit query: {e}")
-            return {"entities": [], "_error": self._extract_error_detail(e)}
-
-        tx_id = str((start_resp or {}).get("id") or "").strip()
-        if not tx_id:
-            return {
-                "entities": [],
-                "_error": "Async audit query transaction id alınamadı.",
-            }
+        spec = {
+            "interval": interval,
+            "service_name": service_name,
+            "filters": filters,
+            "sort_order": sort_order,
+        }
+        max_wait = max(1, int(max_polls or 1)) * max(0.2, float(poll_sleep_seconds or 1.0))
+        for _spec, resp in self.iter_audit_queries(
+            [spec],
+            page_size=page_size,
+            max_pages=max_pages,
+            max_wait_seconds=max_wait,
+            expand_user=expand_user,
+        ):
+            return resp
+        return {"entities": [], "_error": "Async audit query sonuç döndürmedi."}
 
-        state = str((start_resp or {}).get("state") or "").strip().lower()
-        polls = 0
-        while state not in {"succeeded", "failed", "cancelled"} and polls < max(1, int(max_polls or 1)):
-            polls += 1
-            time.sleep(max(0.2, float(poll_sleep_seconds or 1.0)))
+    def iter_audit_queries(
+        self,
+        specs,
+        page_size=100,
+        max_pages=20,
+        max_wait_seconds=30.0,
+        expand_user=True,
+        max_in_flight=None,
+    ):
+        """
+        Run several async audit queries together and yield ``(spec, result)`` as each finishes.
+
+        Each spec is a dict with ``interval`` and optional ``service_name``, ``filters`` and
+        ``sort_order``. Up to ``max_in_flight`` transactions are started at once, their states
+        are polled in one shared loop with growing backoff, and result pages of a finished
+        transaction are read on a worker thread while the others keep polling. ``result`` has
+        the shape returned by ``query_audits``. Closing the generator stops submitting, polling
+        and reading the remaining candidates.
+        """
+        pending = list(enumerate(specs or []))
+        if not pending:
+            return
+        in_flight_cap = max(1, int(max_in_flight or self.AUDIT_QUERY_MAX_IN_FLIGHT))
+        max_wait = max(0.2, float(max_wait_seconds or 30.0))
+        active = {}
+        ready = deque()
+        readers = {}
+        sleep_seconds = float(self.AUDIT_QUERY_POLL_INITIAL_SECONDS)
+        executor = ThreadPoolExecutor(max_workers=in_flight_cap)
+
+        def _submit(idx, spec):
             try:
-                st = self.get_audit_query_status(tx_id)
-                state = str((st or {}).get("state") or state).strip().lower()
+                start_resp = self.start_audit_query(
+                    interval=spec.get("interval"),
+                    service_name=spec.get("service_name"),
+                    filters=spec.get("filters"),
+                    sort_order=spec.get("sort_order") or "descending",
+                )
             except Exception as e:
-                monitor.log_error("API_GET", f"Error polling async audit query {tx_id}: {e}")
-                break
+                monitor.log_error("API_POST", f"Error starting async audit query: {e}")
+                ready.append((idx, spec, {"entities": [], "_error": self._extract_error_detail(e)}))
+                return
+            tx_id = str((start_resp or {}).get("id") or "").strip()
+            if not tx_id:
+                ready.append((idx, spec, {"entities": [], "_error": "Async audit query transaction id alınamadı."}))
+                return
+            state = str((start_resp or {}).get("state") or "").strip().lower()
+            active[idx] = {"spec": spec, "tx_id": tx_id, "state": state, "deadline": time.monotonic() + max_wait}
 
-        if state in {"failed", "cancelled"}:
-            return {
-                "entities": [],
-                "_error": f"Async audit query durumu: {state}",
-                "transaction_id": tx_id,
-            }
+        def _read(tx_id, state):
+            return self._read_audit_query_results(tx_id, state, page_size, max_pages, expand_user)
+
+        try:
+            while pending or active or ready or readers:
+                while pending and (len(active) + len(readers)) < in_flight_cap:
+                    idx, spec = pending.pop(0)
+                    _submit(idx, spec)
+
+                while ready:
+                    idx, spec, resp = ready.popleft()
+                    yield spec, resp
+
+                # Finished or timed out transactions move on to result reading.
+                now = time.monotonic()
+                for idx in list(active.keys()):
+                    entry = active[idx]
+                    state = entry["state"]
+                    if state not in {"succeeded", "failed", "cancelled"} and now < entry["deadline"]:
+                        continue
+                    active.pop(idx)
+                    if state in {"failed", "cancelled"}:
+                        ready.append((idx, entry["spec"], {
+                            "entities": [],
+                            "_error": f"Async audit query durumu: {state}",
+                            "transaction_id": entry["tx_id"],
+                        }))
+                    else:
+                        readers[executor.submit(_read, entry["tx_id"], state)] = (idx, entry["spec"])
+
+                for future in [f for f in readers if f.done()]:
+                    idx, spec = readers.pop(future)
+                    try:
+                        resp = future.result()
+                    except Exception as e:
+                        resp = {"entities": [], "_error": self._extract_error_detail(e)}
+                    ready.append((idx, spec, resp))
+                    sleep_seconds = float(self.AUDIT_QUERY_POLL_INITIAL_SECONDS)
+
+                if ready or (pending and (len(active) + len(readers)) < in_flight_cap):
+                    continue
+                if not active and not readers:
+                    continue
 
+                if readers:
+                    wait(list(readers), timeout=sleep_seconds, return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(sleep_seconds)
+                sleep_seconds = min(float(self.AUDIT_QUERY_POLL_MAX_SECONDS), sleep_seconds * 1.5)
+                for idx, entry in list(active.items()):
+                    try:
+                        st = self.get_audit_query_status(entry["tx_id"])
+                        entry["state"] = str((st or {}).get("state") or entry["state"]).strip().lower()
+                    except Exception as e:
+                        monitor.log_error("API_GET", f"Error polling async audit query {entry['tx_id']}: {e}")
+                        # Stop polling this one; read whatever the transaction already has.
+                        entry["deadline"] = 0
+        finally:
+            for future in readers:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _read_audit_query_results(self, tx_id, state, page_size, max_pages, expand_user):
         entities = []
         seen_ids = set()
         cursor = None
@@ -2510,6 +2956,7 @@ class GenesysAPI:
         actor_user_id=None,
         affected_user_id=None,
         include_async_query=True,
+        use_local_store=True,
     ):
         """Fetch agent status-change audits (presence/routing) with optional actor/affected filters."""
 
@@ -2836,27 +3283,33 @@ class GenesysAPI:
                 if len(page_entities) < int(scan_size or 100):
                     break
 
+            if local_store is not None and entities:
+                local_store.add_events(entities)
             return {
                 "entities": entities,
                 "page_count": page_count,
                 "_error": realtime_error,
             }
 
-        def _collect_async(interval_value, scan_service_name=None, filters=None, scan_pages=20, scan_size=100):
-            async_resp = self.query_audits(
-                interval=interval_value,
-                service_name=scan_service_name,
-                filters=filters,
-                page_size=scan_size,
-                max_pages=scan_pages,
-                sort_order="descending",
-                expand_user=True,
-            ) or {}
-            return {
-                "entities": async_resp.get("entities") or [],
-                "transaction_id": async_resp.get("transaction_id"),
-                "_error": async_resp.get("_error"),
-            }
+        def _collect_async_many(interval_value, candidates, scan_pages=20, scan_size=100):
+            # candidates: (service, filters) pairs; yields (service, filters, resp) as they finish.
+            specs = [
+                {"interval": interval_value, "service_name": svc, "filters": flt, "sort_order": "descending"}
+                for svc, flt in candidates
+            ]
+            runner = self.iter_audit_queries(specs, page_size=scan_size, max_pages=scan_pages, expand_user=True)
+            try:
+                for spec, async_resp in runner:
+                    async_resp = async_resp or {}
+                    if local_store is not None and async_resp.get("entities"):
+                        local_store.add_events(async_resp.get("entities"))
+                    yield spec.get("service_name"), spec.get("filters"), {
+                        "entities": async_resp.get("entities") or [],
+                        "transaction_id": async_resp.get("transaction_id"),
+                        "_error": async_resp.get("_error"),
+                    }
+            finally:
+                runner.close()
 
         def _append_unique_entities(target_rows, seen_keys, source_rows):
             for item in source_rows or []:
@@ -2982,6 +3435,34 @@ class GenesysAPI:
                 out.append(item)
             return out
 
+        # Answer from the locally ingested audit store when it covers the whole interval.
+        local_store = get_audit_store(self.org_code) if use_local_store else None
+        if local_store is not None and local_store.covers(start_date, end_date):
+            # Full coverage makes a complete local answer authoritative, even an empty one.
+            # The cap counts matches (one async API scan's budget); hitting it falls back
+            # to the API.
+            local_rows, local_complete = local_store.query_matching(
+                start_date,
+                end_date,
+                _apply_client_filters,
+                limit=size * async_pages,
+                ref_ids=[uid for uid in (actor_uid, affected_uid) if uid],
+                services=service_names,
+            )
+        else:
+            local_rows, local_complete = None, False
+        if local_complete:
+            local_entities = _apply_client_filters(local_rows)
+            return {
+                "entities": _sort_entities_desc(local_entities),
+                "total": len(local_entities),
+                "page_count": None,
+                "source": "local-store",
+                "service_name": "-",
+                "filter_variant": [],
+                "_attempts": [],
+            }
+
         attempts = []
 
         def _add_attempt(source, service_val, filters_val, raw_count, matched_count, error_val=None):
@@ -3094,58 +3575,60 @@ class GenesysAPI:
             if not async_variants and should_try_unfiltered_realtime:
                 async_variants = [None]
 
-            for request_filters in async_variants:
-                if _is_invalid_filter_combo(request_filters):
-                    continue
-                for scan_service_name in service_candidates:
-                    resp = _collect_async(
-                        interval_value=interval,
-                        scan_service_name=scan_service_name,
-                        filters=request_filters,
-                        scan_pages=async_pages,
-                        scan_size=size,
-                    )
-                    raw_entities = resp.get("entities") or []
-                    matched_entities = _apply_client_filters(raw_entities)
-                    _add_attempt(
-                        source="async-filtered" if request_filters else "async",
-                        service_val=scan_service_name,
-                        filters_val=request_filters,
-                        raw_count=len(raw_entities),
-                        matched_count=len(matched_entities),
-                        error_val=resp.get("_error"),
-                    )
-                    if matched_entities:
-                        _append_unique_entities(merged_entities, merged_entity_keys, matched_entities)
-                        source_label = "async" if scan_service_name else "async-unfiltered"
-                        if source_label not in merged_sources:
-                            merged_sources.append(source_label)
-                        for item in _normalize_filter_payload(request_filters):
-                            key = (item.get("property"), item.get("value"))
-                            if key in merged_filter_variant_keys:
-                                continue
-                            merged_filter_variant_keys.add(key)
-                            merged_filter_variant.append(item)
-                    if resp.get("_error"):
-                        error_text = str(resp.get("_error") or "").lower()
-                        if (
-                            ("unknown servicename" in error_text)
-                            or ("unknown entitytype" in error_text)
-                            or ("servicename is expected when passing entitytype" in error_text)
-                            or ("action" in error_text and "entitytype" in error_text)
-                        ):
+            # All service x filter candidates run together; stop once the merged
+            # result reaches what a single async scan could return.
+            enough_matches = max(1, int(async_pages or 1)) * max(1, int(size or 1))
+            async_candidates = [
+                (scan_service_name, request_filters)
+                for request_filters in async_variants
+                if not _is_invalid_filter_combo(request_filters)
+                for scan_service_name in service_candidates
+            ]
+            async_runs = _collect_async_many(interval, async_candidates, scan_pages=async_pages, scan_size=size)
+            for scan_service_name, request_filters, resp in async_runs:
+                raw_entities = resp.get("entities") or []
+                matched_entities = _apply_client_filters(raw_entities)
+                _add_attempt(
+                    source="async-filtered" if request_filters else "async",
+                    service_val=scan_service_name,
+                    filters_val=request_filters,
+                    raw_count=len(raw_entities),
+                    matched_count=len(matched_entities),
+                    error_val=resp.get("_error"),
+                )
+                if matched_entities:
+                    _append_unique_entities(merged_entities, merged_entity_keys, matched_entities)
+                    source_label = "async" if scan_service_name else "async-unfiltered"
+                    if source_label not in merged_sources:
+                        merged_sources.append(source_label)
+                    for item in _normalize_filter_payload(request_filters):
+                        key = (item.get("property"), item.get("value"))
+                        if key in merged_filter_variant_keys:
                             continue
-                        last_error = resp.get("_error")
+                        merged_filter_variant_keys.add(key)
+                        merged_filter_variant.append(item)
+                    if len(merged_entities) >= enough_matches:
+                        async_runs.close()
+                        break
+                if resp.get("_error"):
+                    error_text = str(resp.get("_error") or "").lower()
+                    if (
+                        ("unknown servicename" in error_text)
+                        or ("unknown entitytype" in error_text)
+                        or ("servicename is expected when passing entitytype" in error_text)
+                        or ("action" in error_text and "entitytype" in error_text)
+                    ):
+                        continue
+                    last_error = resp.get("_error")
 
             if (not merged_entities) and any(v is None for v in filter_variants) and async_variants != [None]:
-                for scan_service_name in service_candidates:
-                    resp = _collect_async(
-                        interval_value=interval,
-                        scan_service_name=scan_service_name,
-                        filters=None,
-                        scan_pages=async_pages,
-                        scan_size=size,
-                    )
+                fallback_runs = _collect_async_many(
+                    interval,
+                    [(scan_service_name, None) for scan_service_name in service_candidates],
+                    scan_pages=async_pages,
+                    scan_size=size,
+                )
+                for scan_service_name, _filters, resp in fallback_runs:
                     raw_entities = resp.get("entities") or []
                     matched_entities = _apply_client_filters(raw_entities)
                     _add_attempt(
@@ -3161,6 +3644,9 @@ class GenesysAPI:
                         source_label = "async" if scan_service_name else "async-unfiltered"
                         if source_label not in merged_sources:
                             merged_sources.append(source_label)
+                        if len(merged_entities) >= enough_matches:
+                            fallback_runs.close()
+                            break
                     if resp.get("_error"):
                         error_text = str(resp.get("_error") or "").lower()
                         if (
@@ -3216,6 +3702,7 @@ class GenesysAPI:
         collect_all_variants=True,
         strict_user_match=True,
         realtime_first=True,
+        use_local_store=True,
     ):
         """Fetch status-related audit logs for a target user via realtime audit query."""
         uid = str(user_id or "").strip()
@@ -3468,6 +3955,44 @@ class GenesysAPI:
                 reverse=True,
             )
 
+        def _keep_local(rows):
+            out = []
+            seen_keys = set()
+            for item in rows or []:
+                if not _audit_mentions_user(item, uid, include_actor_match=not is_queue_scope):
+                    continue
+                row_key = _entity_key(item)
+                if row_key and row_key in seen_keys:
+                    continue
+                if row_key:
+                    seen_keys.add(row_key)
+                out.append(item)
+            return out
+
+        # Answer from the locally ingested audit store when it covers the whole interval;
+        # the cap counts matches and hitting it falls back to the API variants below.
+        local_store = get_audit_store(self.org_code) if use_local_store else None
+        if local_store is not None and local_store.covers(start_date, end_date):
+            local_rows, local_complete = local_store.query_matching(
+                start_date,
+                end_date,
+                _keep_local,
+                limit=max(1, int(page_size or 100)) * min(50, max(int(max_pages or 1), 20)),
+                ref_ids=[uid],
+                services=[service_name] if str(service_name or "").strip() else None,
+            )
+        else:
+            local_rows, local_complete = None, False
+        if local_complete:
+            local_entities = _keep_local(local_rows)
+            return {
+                "entities": _sort_entities_desc(local_entities),
+                "total": len(local_entities),
+                "page_count": None,
+                "source": "local-store",
+                "filter_variant": [],
+            }
+
         last_error = None
         merged_entities = []
         merged_keys = set()
@@ -3727,6 +4252,7 @@ class GenesysAPI:
         affected_user_id=None,
         queue_ids=None,
         queue_text=None,
+        use_local_store=True,
     ):
         """Fetch queue-membership audits with realtime first, then async fallback."""
 
@@ -3857,6 +4383,8 @@ class GenesysAPI:
                 if len(page_entities) < int(scan_size or 100):
                     break
 
+            if local_store is not None and entities:
+                local_store.add_events(entities)
             return {
                 "entities": entities,
                 "total": total if total is not None else len(entities),
@@ -3864,24 +4392,36 @@ class GenesysAPI:
                 "_error": realtime_error,
             }
 
-        def _collect_async(interval_value, scan_service_name=None, filters=None, scan_pages=20, scan_size=100):
-            async_resp = self.query_audits(
-                interval=interval_value,
-                service_name=scan_service_name,
-                filters=filters,
-                page_size=scan_size,
-                max_pages=scan_pages,
-                sort_order="descending",
-                expand_user=True,
-            ) or {}
-            entities = async_resp.get("entities") or []
-            return {
-                "entities": entities,
-                "total": len(entities),
-                "page_count": None,
-                "transaction_id": async_resp.get("transaction_id"),
-                "_error": async_resp.get("_error"),
-            }
+        def _collect_async_many(interval_value, candidates, scan_pages=20, scan_size=100):
+            # candidates: (service, filters) pairs in priority order. The queries run together,
+            # but (service, filters, resp) is yielded in candidate order: a finished result is
+            # held back until every earlier candidate is done, so the first match is the best one.
+            specs = [
+                {"interval": interval_value, "service_name": svc, "filters": flt, "sort_order": "descending"}
+                for svc, flt in candidates
+            ]
+            order = {id(spec): idx for idx, spec in enumerate(specs)}
+            finished = {}
+            next_idx = 0
+            runner = self.iter_audit_queries(specs, page_size=scan_size, max_pages=scan_pages, expand_user=True)
+            try:
+                for spec, async_resp in runner:
+                    async_resp = async_resp or {}
+                    entities = async_resp.get("entities") or []
+                    if local_store is not None and entities:
+                        local_store.add_events(entities)
+                    finished[order[id(spec)]] = (spec.get("service_name"), spec.get("filters"), {
+                        "entities": entities,
+                        "total": len(entities),
+                        "page_count": None,
+                        "transaction_id": async_resp.get("transaction_id"),
+                        "_error": async_resp.get("_error"),
+                    })
+                    while next_idx in finished:
+                        yield finished.pop(next_idx)
+                        next_idx += 1
+            finally:
+                runner.close()
 
         def _audit_matches_user(audit_item, user_id, include_actor=False):
             uid = str(user_id or "").strip().lower()
@@ -4124,6 +4664,30 @@ class GenesysAPI:
         if _looks_like_uuid(queue_text_token):
             queue_ids_clean = _unique_non_empty(queue_ids_clean + [queue_text_token], limit=8)
 
+        # Answer from the locally ingested audit store when it covers the whole interval.
+        local_store = get_audit_store(self.org_code) if use_local_store else None
+        if local_store is not None and local_store.covers(start_date, end_date):
+            local_refs = [uid for uid in (actor_uid, affected_uid) if _looks_like_uuid(uid)] + list(queue_ids_clean)
+            # Full coverage makes a complete local answer authoritative, even an empty one.
+            # The cap counts matches (one async API scan's budget); hitting it falls back
+            # to the API.
+            local_rows, local_complete = local_store.query_matching(
+                start_date, end_date, _apply_client_filters, limit=size * async_pages, ref_ids=local_refs,
+            )
+        else:
+            local_rows, local_complete = None, False
+        if local_complete:
+            local_entities = _apply_client_filters(local_rows)
+            return {
+                "entities": local_entities,
+                "total": len(local_entities),
+                "page_count": None,
+                "source": "local-store",
+                "service_name": "-",
+                "filter_variant": [],
+                "_attempts": [],
+            }
+
         api_fixed_filters = []
         if actor_uid:
             api_fixed_filters.append({"property": "UserId", "value": actor_uid})
@@ -4358,6 +4922,7 @@ class GenesysAPI:
                         last_error = resp.get("_error")
 
         # Async pass 1: mapping-driven queries.
+        entity_async_candidates = []
         for candidate in mapping_candidates[:max_candidate_queries]:
             cand_service = str(candidate.get("service") or "").strip()
             cand_entity = str(candidate.get("entity") or "").strip()
@@ -4396,50 +4961,52 @@ class GenesysAPI:
                     break
             if not request_filter_variants:
                 request_filter_variants = [_merge_filters(api_fixed_filters)]
-
             for request_filters in request_filter_variants:
-                resp = _collect_async(
-                    interval_value=interval,
-                    scan_service_name=cand_service,
-                    filters=request_filters or None,
-                    scan_pages=async_pages,
-                    scan_size=size,
-                )
-                raw_entities = resp.get("entities") or []
-                matched_entities = _apply_client_filters(raw_entities)
-                _add_attempt(
-                    attempt_logs,
-                    source="async-entity",
-                    service_val=cand_service,
-                    filters_val=request_filters,
-                    raw_count=len(raw_entities),
-                    matched_count=len(matched_entities),
-                    error_val=resp.get("_error"),
-                )
-                if resp.get("_error"):
-                    err_text = str(resp.get("_error") or "").lower()
-                    if (
-                        ("unknown entitytype" in err_text)
-                        or ("unknown servicename" in err_text)
-                        or ("servicename is expected when passing entitytype" in err_text)
-                    ):
-                        continue
-                    last_error = resp.get("_error")
+                entity_async_candidates.append((cand_service, request_filters or None))
+
+        # All mapping-driven transactions run together; results arrive in candidate
+        # order, so the highest-priority match wins and the rest are abandoned.
+        entity_runs = _collect_async_many(interval, entity_async_candidates, scan_pages=async_pages, scan_size=size)
+        for cand_service, request_filters, resp in entity_runs:
+            raw_entities = resp.get("entities") or []
+            matched_entities = _apply_client_filters(raw_entities)
+            _add_attempt(
+                attempt_logs,
+                source="async-entity",
+                service_val=cand_service,
+                filters_val=request_filters,
+                raw_count=len(raw_entities),
+                matched_count=len(matched_entities),
+                error_val=resp.get("_error"),
+            )
+            if resp.get("_error"):
+                err_text = str(resp.get("_error") or "").lower()
+                if (
+                    ("unknown entitytype" in err_text)
+                    or ("unknown servicename" in err_text)
+                    or ("servicename is expected when passing entitytype" in err_text)
+                ):
                     continue
+                last_error = resp.get("_error")
+                continue
 
-                if matched_entities:
-                    return {
-                        "entities": matched_entities,
-                        "total": len(matched_entities),
-                        "page_count": None,
-                        "source": "async-entity-filter",
-                        "service_name": cand_service,
-                        "filter_variant": _normalize_filter_payload(request_filters),
-                        "transaction_id": resp.get("transaction_id"),
-                        "_attempts": attempt_logs,
-                    }
+            if matched_entities:
+                entity_runs.close()
+                return {
+                    "entities": matched_entities,
+                    "total": len(matched_entities),
+                    "page_count": None,
+                    "source": "async-entity-filter",
+                    "service_name": cand_service,
+                    "filter_variant": _normalize_filter_payload(request_filters),
+                    "transaction_id": resp.get("transaction_id"),
+                    "_attempts": attempt_logs,
+                }
 
-        # Async pass 2: broad service scans.
+        # Async pass 2: broad service scans, submitted together as well. The global
+        # (no serviceName) scan is a fallback and only starts once they all missed.
+        broad_async_candidates = []
+        global_async_candidates = []
         for scan_service_name in service_candidates:
             broad_variants = [None]
             scan_service_key = str(scan_service_name or "").strip().lower()
@@ -4469,53 +5036,55 @@ class GenesysAPI:
                 if not request_filter_variants:
                     request_filter_variants = [_merge_filters(broad_filter, api_fixed_filters)]
 
+                target = broad_async_candidates if scan_service_name is not None else global_async_candidates
                 for request_filters in request_filter_variants:
-                    resp = _collect_async(
-                        interval_value=interval,
-                        scan_service_name=scan_service_name,
-                        filters=request_filters or None,
-                        scan_pages=async_pages,
-                        scan_size=size,
-                    )
-                    raw_entities = resp.get("entities") or []
-                    matched_entities = _apply_client_filters(raw_entities)
-                    _add_attempt(
-                        attempt_logs,
-                        source="async-broad",
-                        service_val=scan_service_name,
-                        filters_val=request_filters,
-                        raw_count=len(raw_entities),
-                        matched_count=len(matched_entities),
-                        error_val=resp.get("_error"),
-                    )
+                    target.append((scan_service_name, request_filters or None))
 
-                    if matched_entities:
-                        result = {
-                            "entities": matched_entities,
-                            "total": len(matched_entities),
-                            "page_count": None,
-                            "source": "async" if scan_service_name else "async-unfiltered",
-                            "service_name": scan_service_name or "-",
-                            "filter_variant": _normalize_filter_payload(request_filters),
-                            "transaction_id": resp.get("transaction_id"),
-                            "_attempts": attempt_logs,
-                        }
-                        if scan_service_name is None:
-                            result["_warning"] = (
-                                "Realtime sorgusunda eşleşme çıkmadığı için async/global fallback kullanıldı."
-                            )
-                        return result
+        for pass_candidates in (broad_async_candidates, global_async_candidates):
+            if not pass_candidates:
+                continue
+            broad_runs = _collect_async_many(interval, pass_candidates, scan_pages=async_pages, scan_size=size)
+            for scan_service_name, request_filters, resp in broad_runs:
+                raw_entities = resp.get("entities") or []
+                matched_entities = _apply_client_filters(raw_entities)
+                _add_attempt(
+                    attempt_logs,
+                    source="async-broad",
+                    service_val=scan_service_name,
+                    filters_val=request_filters,
+                    raw_count=len(raw_entities),
+                    matched_count=len(matched_entities),
+                    error_val=resp.get("_error"),
+                )
 
-                    if resp.get("_error"):
-                        err_lower = str(resp.get("_error") or "").lower()
-                        if (
-                            ("unknown entitytype" in err_lower)
-                            or ("servicename is expected when passing entitytype" in err_lower)
-                            or ("unknown servicename" in err_lower)
-                            or _is_action_requires_entitytype_error(err_lower)
-                        ):
-                            continue
-                        last_error = resp.get("_error")
+                if matched_entities:
+                    broad_runs.close()
+                    result = {
+                        "entities": matched_entities,
+                        "total": len(matched_entities),
+                        "page_count": None,
+                        "source": "async" if scan_service_name else "async-unfiltered",
+                        "service_name": scan_service_name or "-",
+                        "filter_variant": _normalize_filter_payload(request_filters),
+                        "transaction_id": resp.get("transaction_id"),
+                        "_attempts": attempt_logs,
+                    }
+                    if scan_service_name is None:
+                        result["_warning"] = (
+                            "Realtime sorgusunda eşleşme çıkmadığı için async/global fallback kullanıldı."
+                        )
+                    return result
+
+                if resp.get("_error"):
+                    err_lower = str(resp.get("_error") or "").lower()
+                    if (
+                        ("unknown entitytype" in err_lower)
+                        or ("servicename is expected when passing entitytype" in err_lower)
+                        or ("unknown servicename" in err_lower)
+                        or _is_action_requires_entitytype_error(err_lower)
+                    ):
+                        continue
+                    last_error = resp.get("_error")
 
         return {
             "entities": [],
@@ -4568,7 +5137,17 @@ class GenesysAPI:
 
         return list(users_by_id.values())
 
-    def get_analytics_conversations_aggregate(self, start_date, end_date, granularity="P1D", group_by=None, filter_type=None, filter_ids=None, metrics=None, media_types=None):
+    @staticmethod
+    def _granularity_seconds(granularity):
+        """Seconds of an ISO-8601 day/time granularity (P1D, PT30M...); None for months/years."""
+        match = re.fullmatch(r"P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?", str(granularity or "").strip().upper())
+        if not match:
+            return None
+        weeks, days, hours, minutes, seconds = (int(v or 0) for v in match.groups())
+        total = (((weeks * 7 + days) * 24 + hours) * 60 + minutes) * 60 + seconds
+        return total or None
+
+    def get_analytics_conversations_aggregate(self, start_date, end_date, granularity="P1D", group_by=None, filter_type=None, filter_ids=None, metrics=None, media_types=None, use_cache=True):
         dimension = "userId" if filter_type == 'user' else "queueId"
         operator = "matches"
         predicates = [{"type": "dimension", "dimension": dimension, "operator": operator, "value": fid} for fid in (filter_ids or [])]
@@ -4685,6 +5264,12 @@ class GenesysAPI:
         if not metric_batches:
             metric_batches = [["nOffered", "tAnswered", "tAbandon", "tTalk", "tHandle"]]
         
+        cache = get_aggregate_cache(self.org_code) if use_cache else None
+        closed_before = datetime.now(timezone.utc) - timedelta(seconds=self.AGGREGATE_CACHE_SETTLE_SECONDS)
+        if getattr(start_date, "tzinfo", None) is None:
+            closed_before = closed_before.replace(tzinfo=None)
+        granularity_seconds = self._granularity_seconds(granularity)
+
         while curr < end_date:
             curr_end = curr + timedelta(days=chunk_days)
             if curr_end > end_date:
@@ -4693,6 +5278,17 @@ class GenesysAPI:
             # Ensure we don't query 0 duration if loop logic is weird
             if curr_end <= curr: break
 
+            # Split the chunk on a granularity boundary so its closed part can be cached
+            # and only the open tail (today) goes to the API on re-runs.
+            if cache is not None and granularity_seconds and curr < closed_before < curr_end:
+                # Prefer whole days so the cached part stays the same across re-runs of the day.
+                split_step = 86400 if 86400 % granularity_seconds == 0 else granularity_seconds
+                closed_steps = int((closed_before - curr).total_seconds() // split_step)
+                split_at = curr + timedelta(seconds=closed_steps * split_step)
+                if curr < split_at < curr_end:
+                    curr_end = split_at
+            chunk_closed = cache is not None and curr_end <= closed_before
+
             interval = f"{curr.strftime('%Y-%m-%dT%H:%M:%S.000Z')}/{curr_end.strftime('%Y-%m-%dT%H:%M:%S.000Z')}"
             
             for metrics_batch in metric_batches:
@@ -4710,8 +5306,16 @@ class GenesysAPI:
                 if filter_clause:
                     query["filter"] = filter_clause
 
+                if chunk_closed:
+                    cached_results = cache.get(query)
+                    if cached_results is not None:
+                        combined_results.extend(cached_results)
+                        continue
+
                 try:
                     data = self._post("/api/v2/analytics/conversations/aggregates/query", query)
+                    if chunk_closed and isinstance(data, dict):
+                        cache.put(query, data.get("results") or [])
                 except Exception as e:
                     # If a metric batch causes 400, retry metric-by-metric and keep successful ones.
                     if self._is_http_status(e, 400) and len(metrics_batch) > 1:
@@ -4984,9 +5588,23 @@ class GenesysAPI:
             monitor.log_error("API_GET", "Error: Presence definitions fetch failed.")
         return definitions
 
-    def get_user_aggregates(self, start_date, end_date, user_ids):
+    def get_user_aggregates(self, start_date, end_date, user_ids, max_workers=None):
         """Fetches user status aggregates (durations) for a list of users, batching requests if needed."""
-        if not user_ids: return {"results": []}
+        combined_results = []
+        _warnings = []
+        for part in self.iter_user_aggregates(start_date, end_date, user_ids, max_workers=max_workers):
+            combined_results.extend(part.get("results") or [])
+            _warnings.extend(part.get("_warnings") or [])
+        return {"results": combined_results, "_warnings": _warnings}
+
+    def iter_user_aggregates(self, start_date, end_date, user_ids, max_workers=None):
+        """
+        Yields ``{"results", "_warnings"}`` parts of the user aggregates query as batches finish.
+
+        Interval chunks x user batches run concurrently. The metric profile / payload
+        variant that the org accepted is remembered so later batches and runs try it first.
+        """
+        if not user_ids: return
 
         def _is_uuid_like(value):
             txt = str(value or "").strip()
@@ -5023,13 +5641,12 @@ class GenesysAPI:
             warnings = []
             if invalid_count > 0:
                 warnings.append(f"User aggregates skipped: {invalid_count} invalid userId")
-            return {"results": [], "_warnings": warnings}
+            yield {"results": [], "_warnings": warnings}
+            return
 
         BATCH_SIZE = 25
-        combined_results = []
-        _warnings = []
         if invalid_count > 0:
-            _warnings.append(f"User aggregates skipped: {invalid_count} invalid userId")
+            yield {"results": [], "_warnings": [f"User aggregates skipped: {invalid_count} invalid userId"]}
 
         # Only 3 metrics are valid for UserAggregateMetric (per Genesys API spec):
         # tAgentRoutingStatus, tOrganizationPresence, tSystemPresence
@@ -5045,64 +5662,96 @@ class GenesysAPI:
                 for uid in (batch_ids or [])
             ]
 
-        def _try_query_variants(interval_value, batch_ids, metrics_to_use):
-            predicates = _build_predicates(batch_ids)
-            if not predicates:
-                return {"results": []}, None
-
+        def _build_payload(variant_index, interval_value, predicates, metrics_to_use):
             # Correct structure: filter.type = "or"|"and", predicates[].type = "dimension"|"property"|"metric"
             # "or"/"and" are NOT valid for individual predicate type (QueryPredicateType).
-            payload_variants = [
-                {
-                    "interval": interval_value,
-                    "groupBy": ["userId"],
-                    "filter": {"type": "or", "predicates": predicates},
-                    "metrics": metrics_to_use,
-                },
-                {
-                    "interval": interval_value,
-                    "groupBy": ["userId"],
-                    "filter": {
-                        "type": "and",
-                        "clauses": [{"type": "or", "predicates": predicates}],
-                    },
-                    "metrics": metrics_to_use,
-                },
-            ]
+            if variant_index == 0:
+                query_filter = {"type": "or", "predicates": predicates}
+            else:
+                query_filter = {
+                    "type": "and",
+                    "clauses": [{"type": "or", "predicates": predicates}],
+                }
+            return {
+                "interval": interval_value,
+                "groupBy": ["userId"],
+                "filter": query_filter,
+                "metrics": metrics_to_use,
+            }
 
+        all_attempts = [
+            (profile_index, variant_index)
+            for profile_index in range(len(metric_profiles))
+            for variant_index in range(2)
+        ]
+        org_key = self._rate_limiter.key
+
+        def _preferred_attempt():
+            with GenesysAPI._user_aggregate_variant_lock:
+                preferred = GenesysAPI._user_aggregate_variant_by_org.get(org_key)
+            return preferred if preferred in all_attempts else None
+
+        def _remember(attempt):
+            with GenesysAPI._user_aggregate_variant_lock:
+                GenesysAPI._user_aggregate_variant_by_org[org_key] = attempt
+
+        def _query_batch(interval_value, batch_ids):
+            predicates = _build_predicates(batch_ids)
+            if not predicates:
+                return {"results": []}, None
+            preferred = _preferred_attempt()
+            attempts = list(all_attempts)
+            if preferred is not None:
+                attempts = [preferred] + [a for a in attempts if a != preferred]
+            # Profiles below a remembered one were already rejected by the org.
+            profile_floor = preferred[0] if preferred is not None else 0
             last_err = None
-            for payload in payload_variants:
+            skip_profiles = set()
+            bad_requests = {}
+            for profile_index, variant_index in attempts:
+                if profile_index in skip_profiles:
+                    continue
+                payload = _build_payload(variant_index, interval_value, predicates, metric_profiles[profile_index])
                 try:
                     data = self._post("/api/v2/analytics/users/aggregates/query", payload, timeout=30, retries=1, retry_sleep=2)
+                    # Only a profile the org rejected with 400 on both payload variants is
+                    # dropped for good; after timeouts/5xx keep the richest unconfirmed profile
+                    # and remember just the payload variant.
+                    kept_profile = profile_index
+                    for richer_index in range(profile_floor, profile_index):
+                        if bad_requests.get(richer_index, 0) < 2:
+                            kept_profile = richer_index
+                            break
+                    _remember((kept_profile, variant_index))
                     return data, None
                 except Exception as ex:
                     last_err = ex
-                    if not self._is_http_status(ex, 400):
-                        break
+                    if self._is_http_status(ex, 400):
+                        bad_requests[profile_index] = bad_requests.get(profile_index, 0) + 1
+                    else:
+                        # Non-400 errors are not payload related; try the next metric profile only.
+                        skip_profiles.add(profile_index)
             return None, last_err
 
-        def _fetch_batch(interval_value, batch_ids, depth=0):
+        def _fetch_batch(interval_value, batch_ids, results, warnings, depth=0):
             if not batch_ids:
                 return
 
-            last_error = None
-            for metrics in metric_profiles:
-                data, err = _try_query_variants(interval_value, batch_ids, metrics)
-                if data is not None:
-                    if isinstance(data, dict) and 'results' in data:
-                        combined_results.extend(data.get('results') or [])
-                    return
-                last_error = err
+            data, last_error = _query_batch(interval_value, batch_ids)
+            if data is not None:
+                if isinstance(data, dict) and 'results' in data:
+                    results.extend(data.get('results') or [])
+                return
 
             # If batch-level request fails with 400, split recursively to isolate problematic payload/user sizes.
             if len(batch_ids) > 1 and last_error is not None and self._is_http_status(last_error, 400) and depth < 8:
                 mid = len(batch_ids) // 2
-                _fetch_batch(interval_value, batch_ids[:mid], depth + 1)
-                _fetch_batch(interval_value, batch_ids[mid:], depth + 1)
+                _fetch_batch(interval_value, batch_ids[:mid], results, warnings, depth + 1)
+                _fetch_batch(interval_value, batch_ids[mid:], results, warnings, depth + 1)
                 return
 
             # Final fallback: warn and continue.
-            _warnings.append(
+            warnings.append(
                 f"User aggregates batch failed ({len(batch_ids)} users): {last_error}"
             )
             monitor.log_error(
@@ -5110,21 +5759,49 @@ class GenesysAPI:
                 f"User aggregates failed for batch size={len(batch_ids)} interval={interval_value}",
                 str(last_error),
             )
-        
+
+        def _run_task(task):
+            interval_value, batch_ids = task
+            results = []
+            warnings = []
+            _fetch_batch(interval_value, batch_ids, results, warnings, depth=0)
+            return {"results": results, "_warnings": warnings}
+
         # Chunk by 14 days to be safe (Aggregates can handle more but reliable is better)
         chunk_days = 14
+        tasks = []
         curr = start_date
         while curr < end_date:
             curr_end = min(curr + timedelta(days=chunk_days), end_date)
             interval = f"{curr.strftime('%Y-%m-%dT%H:%M:%S.000Z')}/{curr_end.strftime('%Y-%m-%dT%H:%M:%S.000Z')}"
-            
             for i in range(0, len(cleaned_ids), BATCH_SIZE):
-                batch = cleaned_ids[i:i + BATCH_SIZE]
-                _fetch_batch(interval, batch, depth=0)
-            
+                tasks.append((interval, cleaned_ids[i:i + BATCH_SIZE]))
             curr = curr_end
-            
-        return {"results": combined_results, "_warnings": _warnings}
+        if not tasks:
+            return
+
+        try:
+            workers = int(max_workers if max_workers is not None else self.USER_AGGREGATE_MAX_WORKERS)
+        except Exception:
+            workers = 1
+        workers = max(1, min(workers, len(tasks)))
+        if workers <= 1:
+            for task in tasks:
+                yield _run_task(task)
+            return
+
+        # The first task runs alone so the org's accepted variant is known before fan-out.
+        yield _run_task(tasks[0])
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = []
+        try:
+            futures = [executor.submit(_run_task, task) for task in tasks[1:]]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     def get_user_status_details(self, start_date, end_date, user_ids):
         """Fetches historical user status details for login/logout calculation, batching requests if needed."""
@@ -5262,8 +5939,13 @@ class GenesysAPI:
             
         return {"userDetails": combined_details, "_warnings": _warnings}
 
-    def get_queue_members(self, queue_id):
-        """Fetches members of a queue with their presence and routing status."""
+    def get_queue_members(self, queue_id, retry_429=True, raise_errors=False):
+        """Fetches members of a queue with their presence and routing status.
+
+        Args:
+            retry_429: wait QUEUE_MEMBER_429_RETRY_SECONDS and retry once on HTTP 429
+            raise_errors: raise instead of logging and returning a partial list
+        """
         members = []
         try:
             page_number = 1
@@ -5273,7 +5955,7 @@ class GenesysAPI:
                     "pageNumber": page_number, 
                     "pageSize": 100
                 }
-                retries_left = self.QUEUE_MEMBER_429_MAX_RETRIES
+                retries_left = self.QUEUE_MEMBER_429_MAX_RETRIES if retry_429 else 0
                 while True:
                     try:
                         data = self._get(f"/api/v2/routing/queues/{queue_id}/users", params=params)
@@ -5297,9 +5979,36 @@ class GenesysAPI:
                 else:
                     break
         except Exception as e:
+            if raise_errors:
+                raise
             monitor.log_error("API_GET", f"Error fetching queue members for {queue_id}: {e}")
         return members
 
+    def get_queue_member_signatures(self, queue_ids):
+        """Return {queue_id: (memberCount, userMemberCount, joinedMemberCount, dateModified)}.
+
+        Uses id-filtered GET /api/v2/routing/queues (100 ids per call) so membership
+        syncs can skip paging members of queues that did not change.
+        """
+        signatures = {}
+        ids = [qid for qid in dict.fromkeys(queue_ids or []) if qid]
+        for batch in self._chunk_list(ids, 100):
+            data = self._get(
+                "/api/v2/routing/queues",
+                params={"id": batch, "pageSize": len(batch), "pageNumber": 1},
+            )
+            for queue in (data.get("entities") or []) if isinstance(data, dict) else []:
+                qid = queue.get("id")
+                if not qid:
+                    continue
+                signatures[qid] = (
+                    queue.get("memberCount"),
+                    queue.get("userMemberCount"),
+                    queue.get("joinedMemberCount"),
+                    queue.get("dateModified"),
+                )
+        return signatures
+
     def get_user_queue_map(self, user_ids=None, queues=None):
         """Build user->queue names map by scanning queue memberships."""
         user_queue_map = {}
@@ -5334,6 +6043,10 @@ class GenesysAPI:
         """Subscribes a channel to the given list of topics."""
         return self._put(f"/api/v2/notifications/channels/{channel_id}/subscriptions", topics)
 
+    def add_notification_subscriptions(self, channel_id, topics):
+        """Adds topics to a channel, keeping its existing subscriptions."""
+        return self._post(f"/api/v2/notifications/channels/{channel_id}/subscriptions", topics)
+
     def get_queue_conversations(self, queue_id, page_size=100, max_pages=3):
         """Fetches active conversations for a queue (best-effort for waiting calls)."""
         conversations = []
@@ -5363,6 +6076,65 @@ class GenesysAPI:
         except Exception as e:
             monitor.log_error("API_GET", f"Error fetching conversation {conversation_id}: {e}")
             return {}
+    def get_users_status_bulk(self, user_ids, batch_size=None, max_workers=None):
+        """
+        Fetches presence and routing status for the given users only.
+        Uses id-filtered GET /api/v2/users?id=...&expand=presence,routingStatus in
+        batches of up to 100 ids, fetched concurrently. Falls back to the full-org
+        scan for the affected ids if the id filter is rejected (HTTP 400).
+        """
+        presence_map = {}
+        routing_map = {}
+        ids = sorted({str(uid).strip() for uid in (user_ids or []) if str(uid or "").strip()})
+        if not ids:
+            return {"presence": presence_map, "routing": routing_map}
+        size = max(1, min(100, int(batch_size or self.USER_STATUS_BATCH_SIZE)))
+        batches = list(self._chunk_list(ids, size))
+        fallback_ids = set()
+
+        def _fetch_batch(batch):
+            params = {
+                "id": batch,
+                "pageSize": len(batch),
+                "pageNumber": 1,
+                "expand": "presence,routingStatus",
+            }
+            try:
+                data = self._get("/api/v2/users", params=params, suppress_error_statuses=[400])
+            except Exception as e:
+                if self._is_http_status(e, 400):
+                    return batch, None
+                monitor.log_error("API_GET", f"API: Error in bulk user status fetch ({len(batch)} ids): {e}")
+                return batch, []
+            return batch, (data.get("entities") or []) if isinstance(data, dict) else []
+
+        workers = max(1, min(int(max_workers or self.USER_STATUS_MAX_WORKERS), len(batches)))
+        if workers <= 1:
+            results = [_fetch_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="user-status") as executor:
+                results = list(executor.map(_fetch_batch, batches))
+
+        for batch, entities in results:
+            if entities is None:
+                fallback_ids.update(batch)
+                continue
+            for user in entities:
+                uid = user.get("id")
+                if not uid:
+                    continue
+                if "presence" in user:
+                    presence_map[uid] = user["presence"]
+                if "routingStatus" in user:
+                    routing_map[uid] = user["routingStatus"]
+
+        if fallback_ids:
+            monitor.log_error("API_GET", f"API: id-filtered user status rejected; scanning org for {len(fallback_ids)} ids.")
+            scanned = self.get_users_status_scan(target_user_ids=fallback_ids)
+            presence_map.update(scanned.get("presence") or {})
+            routing_map.update(scanned.get("routing") or {})
+        return {"presence": presence_map, "routing": routing_map}
+
     def get_users_status_scan(self, target_user_ids=None, ignored_user_ids=None):
         """
         Scans for ALL users and their statuses using standard User List API.
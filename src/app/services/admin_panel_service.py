@@ -1,5 +1,6 @@
 import time as pytime
 import json
+from collections.abc import Mapping
 from typing import Any, Dict
 
 import plotly.express as px
@@ -820,7 +821,7 @@ def render_admin_panel_service(context: Dict[str, Any]) -> None:
             st.error(get_text(lang, "disconnect_genesys_required"))
         else:
             try:
-                api = GenesysAPI(st.session_state.api_client)
+                api = GenesysAPI(st.session_state.api_client, priority=GenesysAPI.PRIORITY_BULK)
                 
                 # Fetch groups
                 current_org = str(org or "").strip()
@@ -2144,6 +2145,19 @@ def render_admin_panel_service(context: Dict[str, Any]) -> None:
             today_local = datetime.now(tz_local).date()
             default_start_date = today_local - timedelta(days=3)
 
+            # Background ingester keeps a local indexed copy of recent audits for fast lookups.
+            try:
+                audit_ingester = ensure_audit_ingester(
+                    GenesysAPI(st.session_state.api_client, priority=GenesysAPI.PRIORITY_BULK)
+                )
+            except Exception:
+                audit_ingester = None
+            if audit_ingester is not None and audit_ingester.last_run_ts:
+                st.caption(
+                    "Yerel audit deposu son güncelleme: "
+                    f"{datetime.fromtimestamp(audit_ingester.last_run_ts, tz_local).strftime('%H:%M:%S')}"
+                )
+
             if not st.session_state.get("users_info") or not st.session_state.get("queues_map"):
                 try:
                     recover_org_maps_if_needed(org, force=False)
@@ -2158,14 +2172,14 @@ def render_admin_panel_service(context: Dict[str, Any]) -> None:
             def _build_user_filter_options(cached_rows):
                 options = [""]
                 labels = {"": "(Tümü)"}
-                if isinstance(users_info, dict):
+                if isinstance(users_info, Mapping):
                     for uid, info in users_info.items():
                         user_id_opt = str(uid or "").strip()
                         if not user_id_opt:
                             continue
                         if user_id_opt not in options:
                             options.append(user_id_opt)
-                        info_obj = info if isinstance(info, dict) else {}
+                        info_obj = info if isinstance(info, Mapping) else {}
                         user_name_opt = str(info_obj.get("name") or info_obj.get("username") or user_id_opt).strip()
                         labels[user_id_opt] = f"{user_name_opt} ({user_id_opt})"
 
@@ -2319,7 +2333,7 @@ def render_admin_panel_service(context: Dict[str, Any]) -> None:
                             59,
                             tzinfo=tz_local,
                         )
-                        status_api = GenesysAPI(st.session_state.api_client)
+                        status_api = GenesysAPI(st.session_state.api_client, priority=GenesysAPI.PRIORITY_BULK)
                         with st.spinner("Agent statü audit kayıtları getiriliyor..."):
                             status_payload = status_api.get_agents_status_audit_logs(
                                 start_date=status_start_local_dt,
@@ -2726,11 +2740,11 @@ def render_admin_panel_service(context: Dict[str, Any]) -> None:
                             59,
                             tzinfo=tz_local,
                         )
-                        queue_api = GenesysAPI(st.session_state.api_client)
+                        queue_api = GenesysAPI(st.session_state.api_client, priority=GenesysAPI.PRIORITY_BULK)
                         queue_filter_ids = []
                         if queue_search_token:
                             queues_map_state = st.session_state.get("queues_map", {}) or {}
-                            if isinstance(queues_map_state, dict):
+                            if isinstance(queues_map_state, Mapping):
                                 for queue_name_raw, queue_id_raw in queues_map_state.items():
                                     queue_name_s = str(queue_name_raw or "").strip().lower()
                                     queue_id_s = str(queue_id_raw or "").strip()
@@ -3072,27 +3086,21 @@ def render_admin_panel_service(context: Dict[str, Any]) -> None:
         status_filter = None if status_filter_ui == "Hepsi" else status_filter_ui
 
         events_reader = globals().get("_get_user_action_events")
+        events_counter = globals().get("_count_user_action_events")
+        sources_reader = globals().get("_get_user_action_sources")
+        org_scope = None if all_orgs else (org_filter or current_org)
         source_filter = None
         source_options = ["Hepsi"]
 
-        if callable(events_reader):
+        if callable(sources_reader):
             try:
-                source_probe = events_reader(
-                    limit=5000,
-                    org_code=None if all_orgs else (org_filter or current_org),
+                source_values = sources_reader(
+                    org_code=org_scope,
                     username=username_filter or None,
                     action=action_filter or None,
                     status=status_filter,
-                    source=None,
                     since_hours=since_hours,
                 ) or []
-                source_values = sorted(
-                    {
-                        str(item.get("source") or "").strip()
-                        for item in source_probe
-                        if isinstance(item, dict) and str(item.get("source") or "").strip()
-                    }
-                )
                 if source_values:
                     source_options.extend(source_values)
             except Exception:
@@ -3107,59 +3115,49 @@ def render_admin_panel_service(context: Dict[str, Any]) -> None:
         if selected_source != "Hepsi":
             source_filter = selected_source
 
+        force_show_api = bool(
+            (source_filter and str(source_filter).strip().lower() == "api-monitor")
+            or ("api_request" in str(action_filter or "").strip().lower())
+        )
+        hide_api = not include_api_requests and not force_show_api
+        query_filters = {
+            "org_code": org_scope,
+            "username": username_filter or None,
+            "action": action_filter or None,
+            "status": status_filter,
+            "source": source_filter or None,
+            "since_hours": since_hours,
+            "exclude_actions": ["api_request"] if hide_api else None,
+            "search": str(search_text or "").strip() or None,
+        }
+
         events = []
+        total_count = 0
+        page_offset = 0
         if callable(events_reader):
             try:
-                fetch_limit = limit
-                if (not include_api_requests) and (limit is not None):
-                    fetch_limit = max(int(limit) * 5, 1000)
-                events = events_reader(
-                    limit=fetch_limit,
-                    org_code=None if all_orgs else (org_filter or current_org),
-                    username=username_filter or None,
-                    action=action_filter or None,
-                    status=status_filter,
-                    source=source_filter or None,
-                    since_hours=since_hours,
-                ) or []
+                if callable(events_counter):
+                    total_count = int(events_counter(**query_filters) or 0)
+                if limit is not None and total_count > limit:
+                    page_count = (total_count + limit - 1) // limit
+                    page_no = st.number_input(
+                        f"Sayfa (1-{page_count})",
+                        min_value=1,
+                        max_value=page_count,
+                        value=1,
+                        step=1,
+                        key="admin_action_log_page",
+                    )
+                    page_offset = (int(page_no) - 1) * limit
+                events = events_reader(limit=limit, offset=page_offset, **query_filters) or []
             except Exception as e:
                 st.warning(f"İşlem logları okunamadı: {e}")
                 events = []
         else:
             st.warning("İşlem logu okuyucu mevcut değil.")
 
-        force_show_api = bool(
-            (source_filter and str(source_filter).strip().lower() == "api-monitor")
-            or ("api_request" in str(action_filter or "").strip().lower())
-        )
-        if not include_api_requests and not force_show_api:
-            events = [
-                item for item in events
-                if isinstance(item, dict) and str(item.get("action") or "").strip() != "api_request"
-            ]
+        if hide_api:
             st.caption("API sorguları varsayılan olarak gizleniyor. Göstermek için 'API Sorguları' seçeneğini açın.")
-            if limit is not None:
-                events = events[: int(limit)]
-
-        token = str(search_text or "").strip().lower()
-        if token:
-            filtered = []
-            for item in events:
-                if not isinstance(item, dict):
-                    continue
-                haystack = " ".join(
-                    [
-                        str(item.get("detail") or ""),
-                        str(item.get("action") or ""),
-                        str(item.get("username") or ""),
-                        str(item.get("org_code") or ""),
-                        str(item.get("source") or ""),
-                        json.dumps(item.get("metadata") or {}, ensure_ascii=False),
-                    ]
-                ).lower()
-                if token in haystack:
-                    filtered.append(item)
-            events = filtered
 
         if not events:
             st.info("Filtrelere uygun işlem logu bulunamadı.")
@@ -3183,7 +3181,10 @@ def render_admin_panel_service(context: Dict[str, Any]) -> None:
                     }
                 )
             df_actions = pd.DataFrame(rows)
-            st.success(f"{len(df_actions)} kayıt listeleniyor.")
+            if total_count > len(df_actions):
+                st.success(f"{total_count} kayıttan {page_offset + 1}-{page_offset + len(df_actions)} arası listeleniyor.")
+            else:
+                st.success(f"{len(df_actions)} kayıt listeleniyor.")
             st.dataframe(df_actions, width='stretch', hide_index=True)
 
             export_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1,6 +1,7 @@
 from typing import Any, Dict
 
 from src.app.context import bind_context
+from src.org_maps import id_to_name
 
 
 def _audit_user_action(action, detail=None, status="info", metadata=None):
@@ -375,7 +376,7 @@ def render_dashboard_service(context: Dict[str, Any]) -> None:
                                 resp = api.get_queue_daily_stats(queue_ids, interval=interval)
                                 daily_data = {}
                                 if resp and resp.get('results'):
-                                    id_map = {v: k for k, v in st.session_state.queues_map.items()}
+                                    id_map = id_to_name(st.session_state.queues_map)
                                     from src.processor import process_daily_stats
                                     daily_data = process_daily_stats(resp, id_map) or {}
                                 items_daily = [daily_data.get(q) for q in resolved_card_queues if daily_data.get(q)]
@@ -990,7 +991,7 @@ def render_dashboard_service(context: Dict[str, Any]) -> None:
             else:
                 users_info_map = st.session_state.get('users_info') or {}
                 if users_info_map:
-                    st.session_state._users_info_last = dict(users_info_map)
+                    st.session_state._users_info_last = users_info_map
                     users_info_refresh_ts = float(st.session_state.get("_users_info_full_refresh_ts", 0) or 0)
                     if (now_ts - users_info_refresh_ts) > 600:
                         users_info_api_t0 = pytime.perf_counter()
@@ -1001,7 +1002,7 @@ def render_dashboard_service(context: Dict[str, Any]) -> None:
                             if refreshed_users_info:
                                 users_info_map = refreshed_users_info
                                 st.session_state.users_info = users_info_map
-                                st.session_state._users_info_last = dict(users_info_map)
+                                st.session_state._users_info_last = users_info_map
                             st.session_state._users_info_full_refresh_ts = now_ts
                         except Exception:
                             pass
@@ -1073,8 +1074,8 @@ def render_dashboard_service(context: Dict[str, Any]) -> None:
                         reserved_seed = True
                         seed_api_t0 = pytime.perf_counter()
                         try:
-                            api = GenesysAPI(st.session_state.api_client)
-                            snap = api.get_users_status_scan(target_user_ids=all_user_ids)
+                            api = GenesysAPI(st.session_state.api_client, priority=GenesysAPI.PRIORITY_LIVE)
+                            snap = api.get_users_status_bulk(all_user_ids)
                             pres = snap.get("presence") or {}
                             rout = snap.get("routing") or {}
                             if pres or rout:
@@ -1088,12 +1089,18 @@ def render_dashboard_service(context: Dict[str, Any]) -> None:
                         _rollback_agent_seed(org, now_ts, fallback_ts=0)
 
                 # Keep WS subscriptions on the full target set so offline->active transitions are captured.
-                max_users = (agent_notif.MAX_TOPICS_PER_CHANNEL * agent_notif.MAX_CHANNELS) // 3
+                max_users = agent_notif.topic_budget() // 3
                 ws_user_ids = all_user_ids[:max_users]
                 if len(all_user_ids) > max_users:
                     st.caption(f"⚠️ WebSocket limiti: {max_users}/{len(all_user_ids)} kullanıcı anlık takipte")
                 if ws_user_ids:
                     agent_notif.start(ws_user_ids)
+                    ws_coverage = agent_notif.coverage()
+                    if ws_coverage.get("topics_uncovered"):
+                        st.caption(
+                            f"⚠️ WebSocket kapsamı: {ws_coverage.get('topics_subscribed', 0)}/"
+                            f"{ws_coverage.get('topics_requested', 0)} konu abone"
+                        )
 
                 # Only keep non-OFFLINE users for display.
                 active_user_ids = []
@@ -1386,7 +1393,7 @@ def render_dashboard_service(context: Dict[str, Any]) -> None:
             else:
                 refresh_s = _resolve_refresh_interval_seconds(org, minimum=10, default=10)
                 now_ts = pytime.time()
-                queue_id_to_name = {v: k for k, v in st.session_state.queues_map.items()}
+                queue_id_to_name = id_to_name(st.session_state.queues_map)
 
                 def _normalize_live_call_state(item):
                     state_raw = str((item or {}).get("state") or "").strip().lower()
@@ -1,6 +1,7 @@
 import copy
 import json
 import re
+from collections.abc import Mapping
 from datetime import datetime, timedelta, timezone
 from typing import Any, Callable, Dict, List, Optional
 
@@ -8,6 +9,14 @@ import pandas as pd
 
 from src.app.context import bind_context
 from src.api import GenesysAPI
+from src.dialer_sync import (
+    _extract_id_from_attributes,
+    _extract_phone_columns,
+    _extract_wrapup_code_from_conversation,
+    _find_best_target_column,
+    _looks_like_uuid,
+    ensure_dialer_sync_worker,
+)
 
 
 # Injected by bind_context at runtime.
@@ -221,20 +230,6 @@ def _build_mapped_records(df: pd.DataFrame, field_map: Dict[str, str], custom_co
     return records, skipped_missing_phone
 
 
-def _find_best_target_column(columns: List[str], aliases: List[str]) -> str:
-    lowered = {str(c).strip().lower(): str(c) for c in (columns or []) if str(c).strip()}
-    for alias in aliases:
-        hit = lowered.get(alias.lower())
-        if hit:
-            return hit
-    for col in columns or []:
-        col_text = str(col).strip().lower()
-        for alias in aliases:
-            if alias.lower() in col_text:
-                return str(col)
-    return ""
-
-
 def _has_any_phone_value(record: Dict[str, Any], phone_columns: List[str]) -> bool:
     candidates = [c for c in (phone_columns or []) if c]
     if not candidates:
@@ -391,22 +386,6 @@ def _parse_column_input(raw_text: str) -> List[str]:
     return out
 
 
-def _extract_phone_columns(detail: Dict[str, Any]) -> List[str]:
-    out: List[str] = []
-    value = (detail or {}).get("phoneColumns")
-    if isinstance(value, list):
-        for item in value:
-            if isinstance(item, str):
-                col = item.strip()
-            elif isinstance(item, dict):
-                col = str(item.get("columnName") or "").strip()
-            else:
-                col = ""
-            if col and col not in out:
-                out.append(col)
-    return out
-
-
 def _normalize_campaign_phone_columns(detail: Dict[str, Any]) -> List[Dict[str, str]]:
     """Build a campaign-compatible phoneColumns list from contact list detail."""
     raw = (detail or {}).get("phoneColumns")
@@ -541,62 +520,6 @@ def _inject_dialer_styles() -> None:
     pass  # Standard Streamlit styling used — no custom overrides needed.
 
 
-_UUID_RE = re.compile(
-    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[1-5][0-9a-fA-F]{3}-[89abAB][0-9a-fA-F]{3}-[0-9a-fA-F]{12}$"
-)
-
-
-def _looks_like_uuid(value: Any) -> bool:
-    text = str(value or "").strip()
-    return bool(_UUID_RE.match(text))
-
-
-def _extract_wrapup_code_from_conversation(conv: Dict[str, Any]) -> str:
-    participants = conv.get("participants") or []
-    latest = ""
-    for participant in participants:
-        wrapup_obj = participant.get("wrapup")
-        if isinstance(wrapup_obj, dict):
-            code = str(wrapup_obj.get("code") or "").strip()
-            if code:
-                latest = code
-        for session in participant.get("sessions") or []:
-            for segment in session.get("segments") or []:
-                code = str(segment.get("wrapUpCode") or segment.get("wrapupCode") or "").strip()
-                if code:
-                    latest = code
-    return latest
-
-
-def _extract_phone_from_conversation(conv: Dict[str, Any]) -> str:
-    participants = conv.get("participants") or []
-    preferred = []
-    fallback = []
-    for participant in participants:
-        purpose = str(participant.get("purpose") or "").lower()
-        values = [
-            participant.get("address"),
-            participant.get("ani"),
-            participant.get("dnis"),
-        ]
-        for session in participant.get("sessions") or []:
-            for segment in session.get("segments") or []:
-                values.extend([segment.get("ani"), segment.get("dnis"), segment.get("address")])
-        for raw in values:
-            text = str(raw or "").strip()
-            if not text:
-                continue
-            if purpose in {"customer", "external"}:
-                preferred.append(text)
-            else:
-                fallback.append(text)
-    if preferred:
-        return preferred[0]
-    if fallback:
-        return fallback[0]
-    return ""
-
-
 def _normalize_phone_value(raw: Any) -> str:
     text = str(raw or "").strip()
     if not text:
@@ -626,52 +549,6 @@ def _normalize_phone_value(raw: Any) -> str:
     return digits
 
 
-def _phone_match_candidates(phone: str) -> List[str]:
-    raw = str(phone or "").strip()
-    if not raw:
-        return []
-    digits = "".join(ch for ch in raw if ch.isdigit())
-    out = []
-    for item in [raw, digits, f"+{digits}", f"0{digits}"]:
-        text = str(item or "").strip()
-        if text and text not in out:
-            out.append(text)
-    return out
-
-
-def _extract_id_from_attributes(attrs: Dict[str, Any], key_hint: str) -> str:
-    if not isinstance(attrs, dict):
-        return ""
-    hint = str(key_hint or "").lower()
-    for key, value in attrs.items():
-        key_text = str(key or "").lower()
-        if hint in key_text and _looks_like_uuid(value):
-            return str(value).strip()
-    return ""
-
-
-def _resolve_contact_list_id_from_conversation(conv: Dict[str, Any], campaign_contact_map: Dict[str, str]) -> str:
-    direct = ""
-    campaign_id = ""
-
-    conv_attrs = conv.get("attributes") if isinstance(conv.get("attributes"), dict) else {}
-    direct = _extract_id_from_attributes(conv_attrs, "contactlist")
-    campaign_id = _extract_id_from_attributes(conv_attrs, "campaign")
-
-    for participant in conv.get("participants") or []:
-        attrs = participant.get("attributes") if isinstance(participant.get("attributes"), dict) else {}
-        if not direct:
-            direct = _extract_id_from_attributes(attrs, "contactlist")
-        if not campaign_id:
-            campaign_id = _extract_id_from_attributes(attrs, "campaign")
-        if direct and campaign_id:
-            break
-
-    if campaign_id and campaign_id in campaign_contact_map:
-        return str(campaign_contact_map.get(campaign_id) or "").strip()
-    return str(direct or "").strip()
-
-
 def _resolve_campaign_id_from_conversation(conv: Dict[str, Any]) -> str:
     if not isinstance(conv, dict):
         return ""
@@ -778,7 +655,7 @@ def _build_users_reverse_map() -> Dict[str, str]:
     users_info = st.session_state.get("users_info") or {}
     users_map_rev: Dict[str, str] = {}
     for uid, user_info in users_info.items():
-        if not isinstance(user_info, dict):
+        if not isinstance(user_info, Mapping):
             continue
         name = str(user_info.get("name") or user_info.get("username") or "").strip()
         if name:
@@ -1053,156 +930,13 @@ def _classify_outbound_result_bucket(raw_value: Any) -> str:
     return "tekrar_aranacak"
 
 
-def _ensure_contact_list_result_column(api: GenesysAPI, contact_list_detail: Dict[str, Any], result_column: str) -> Dict[str, Any]:
-    result_column = str(result_column or "").strip()
-    if not result_column:
-        return contact_list_detail or {}
-
-    detail = contact_list_detail if isinstance(contact_list_detail, dict) else {}
-    columns = list(detail.get("columnNames") or [])
-    if result_column in columns:
-        return detail
-
-    version = detail.get("version")
-    if version is None:
-        return detail
-
-    updated_columns = list(columns)
-    updated_columns.append(result_column)
-    payload = {
-        "id": str(detail.get("id") or ""),
-        "name": str(detail.get("name") or ""),
-        "columnNames": updated_columns,
-        "phoneColumns": list(detail.get("phoneColumns") or []),
-        "version": version,
-    }
-    api.update_outbound_contact_list(payload.get("id"), payload)
-    return api.get_outbound_contact_list(payload.get("id"))
-
-
-def _auto_sync_result_codes(api: GenesysAPI, campaigns: List[Dict[str, Any]], result_column: str, lookback_minutes: int = 20) -> Dict[str, int]:
-    stats = {
-        "scanned": 0,
-        "updated": 0,
-        "skipped_no_wrapup": 0,
-        "skipped_no_contactlist": 0,
-        "skipped_no_phone": 0,
-        "not_found": 0,
-        "errors": 0,
-    }
-
-    now_utc = datetime.now(timezone.utc)
-    start_utc = now_utc - timedelta(minutes=max(1, int(lookback_minutes or 20)))
-    conversations = api.get_conversation_details_recent(start_utc, now_utc, page_size=100, max_pages=3, order="desc")
-
-    campaign_contact_map: Dict[str, str] = {}
-    for item in campaigns or []:
-        if not isinstance(item, dict):
-            continue
-        cid = str(item.get("id") or "").strip()
-        clid = str((item.get("contactList") or {}).get("id") or item.get("contactListId") or "").strip()
-        if cid and clid:
-            campaign_contact_map[cid] = clid
-
-    processed = st.session_state.get("dialer_auto_result_processed") or {}
-    if not isinstance(processed, dict):
-        processed = {}
-
-    cl_cache: Dict[str, Dict[str, Any]] = {}
-    for conv in conversations or []:
-        if not isinstance(conv, dict):
-            continue
-        stats["scanned"] += 1
-
-        conv_id = str(conv.get("conversationId") or conv.get("id") or "").strip()
-        wrapup_code = _extract_wrapup_code_from_conversation(conv)
-        if not wrapup_code:
-            stats["skipped_no_wrapup"] += 1
-            continue
-
-        dedupe_key = f"{conv_id}:{wrapup_code}"
-        if dedupe_key in processed:
-            continue
-
-        contact_list_id = _resolve_contact_list_id_from_conversation(conv, campaign_contact_map)
-        if not contact_list_id:
-            stats["skipped_no_contactlist"] += 1
-            processed[dedupe_key] = datetime.now(timezone.utc).isoformat(timespec="seconds")
-            continue
-
-        phone = _extract_phone_from_conversation(conv)
-        phone_candidates = _phone_match_candidates(phone)
-        if not phone_candidates:
-            stats["skipped_no_phone"] += 1
-            processed[dedupe_key] = datetime.now(timezone.utc).isoformat(timespec="seconds")
-            continue
-
-        detail = cl_cache.get(contact_list_id)
-        if not detail:
-            try:
-                detail = api.get_outbound_contact_list(contact_list_id)
-            except Exception:
-                detail = {}
-            if isinstance(detail, dict):
-                detail = _ensure_contact_list_result_column(api, detail, result_column)
-            cl_cache[contact_list_id] = detail if isinstance(detail, dict) else {}
-
-        phone_columns = _extract_phone_columns(detail if isinstance(detail, dict) else {})
-        if not phone_columns:
-            col_names = list((detail or {}).get("columnNames") or []) if isinstance(detail, dict) else []
-            inferred = _find_best_target_column(col_names, ["phone", "telefon", "gsm", "mobile", "tel", "cell"])
-            phone_columns = [inferred] if inferred else []
-
-        match_contact_id = ""
-        for phone_col in phone_columns:
-            if not phone_col:
-                continue
-            for candidate in phone_candidates:
-                try:
-                    search_res = api.search_outbound_contact_list_contacts(
-                        contact_list_id,
-                        column=phone_col,
-                        value=candidate,
-                        page_number=1,
-                        page_size=5,
-                    )
-                    entities = search_res.get("entities") if isinstance(search_res, dict) else []
-                    entities = [x for x in entities if isinstance(x, dict) and x.get("id")]
-                    if entities:
-                        match_contact_id = str(entities[0].get("id") or "").strip()
-                        break
-                except Exception:
-                    continue
-            if match_contact_id:
-                break
-
-        if not match_contact_id:
-            stats["not_found"] += 1
-            continue
-
-        try:
-            api.write_result_code_to_contact_data(
-                contact_list_id,
-                match_contact_id,
-                result_column=result_column,
-                result_code=wrapup_code,
-                extra_fields={
-                    "resultConversationId": conv_id,
-                    "resultUpdatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
-                },
-            )
-            stats["updated"] += 1
-            processed[dedupe_key] = datetime.now(timezone.utc).isoformat(timespec="seconds")
-        except Exception:
-            stats["errors"] += 1
-
-    # Keep de-dup state bounded.
-    if len(processed) > 2000:
-        keep_items = list(processed.items())[-2000:]
-        processed = {k: v for k, v in keep_items}
-
-    st.session_state["dialer_auto_result_processed"] = processed
-    return stats
+def _auto_sync_result_codes(api: GenesysAPI, result_column: str, lookback_minutes: int = 20) -> Dict[str, int]:
+    """Manual run through the org's background worker so dedupe state is shared."""
+    worker = ensure_dialer_sync_worker(api)
+    if worker is None:
+        return {}
+    worker.set_result_column(result_column)
+    return worker.run_once(lookback_minutes=lookback_minutes)
 
 
 def render_dialer_service(context: Dict[str, Any]) -> None:
@@ -2889,7 +2623,12 @@ def render_dialer_service(context: Dict[str, Any]) -> None:
                         )
 
             with st.expander("🔄 Sonuç Kodu Otomatik Senkron", expanded=False):
-                st.caption("Bu bölüm manuel çalışır. Otomatik sayfa yenileme kapalıdır.")
+                sync_worker = ensure_dialer_sync_worker(api)
+                sync_status = sync_worker.status() if sync_worker is not None else {}
+                st.caption(
+                    "Arka plan senkronu oturumdan bağımsız çalışır; her görüşme yalnızca bir kez işlenir. "
+                    "Manuel çalıştırma geriye dönük pencereyi de tarar."
+                )
                 auto_col1, auto_col2, auto_col3 = st.columns([1, 2, 1])
                 auto_lookback_min = int(
                     auto_col1.number_input(
@@ -2903,23 +2642,36 @@ def render_dialer_service(context: Dict[str, Any]) -> None:
                 )
                 auto_result_column = auto_col2.text_input(
                     "Sonuç kodu data kolonu",
-                    value=str(st.session_state.get("dialer_auto_result_column", "resultCode")),
+                    value=str(sync_worker.result_column if sync_worker is not None else "resultCode"),
                     key="dialer_auto_result_column",
                 ).strip() or "resultCode"
                 run_sync = auto_col3.button("Senkronu Çalıştır", key="dialer_auto_result_manual_run_btn", width="stretch")
 
+                if sync_worker is not None:
+                    background_enabled = st.checkbox(
+                        "Arka planda otomatik senkron",
+                        value=bool(sync_status.get("enabled")),
+                        key="dialer_auto_result_background_toggle",
+                    )
+                    if background_enabled != bool(sync_status.get("enabled")):
+                        sync_worker.set_result_column(auto_result_column)
+                        sync_worker.store.set_state("enabled", bool(background_enabled))
+                        _audit_user_action(
+                            "dialer_result_sync_background",
+                            f"Background result sync {'enabled' if background_enabled else 'disabled'}",
+                            "success",
+                        )
+
                 if run_sync:
-                    with st.spinner("Sonuç kodları manuel senkronize ediliyor..."):
-                        stats = _auto_sync_result_codes(
+                    with st.spinner("Sonuç kodları senkronize ediliyor..."):
+                        _auto_sync_result_codes(
                             api,
-                            campaigns=campaigns,
                             result_column=auto_result_column,
                             lookback_minutes=auto_lookback_min,
                         )
-                    st.session_state["dialer_auto_result_last_stats"] = stats
-                    st.session_state["dialer_auto_result_last_run"] = datetime.now(timezone.utc).isoformat()
+                    sync_status = sync_worker.status() if sync_worker is not None else {}
 
-                auto_stats = st.session_state.get("dialer_auto_result_last_stats") or {}
+                auto_stats = sync_status.get("last_stats") or {}
                 if auto_stats:
                     stat1, stat2, stat3, stat4 = st.columns(4)
                     stat1.metric("Taranan", int(auto_stats.get("scanned", 0)))
@@ -2927,11 +2679,14 @@ def render_dialer_service(context: Dict[str, Any]) -> None:
                     stat3.metric("Eşleşmeyen", int(auto_stats.get("not_found", 0)))
                     stat4.metric("Hata", int(auto_stats.get("errors", 0)))
                 else:
-                    st.info("Henüz manuel senkron çalıştırılmadı.")
-
-                last_run_iso = str(st.session_state.get("dialer_auto_result_last_run") or "").strip()
-                if last_run_iso:
-                    st.caption(f"Son manuel senkron: {_format_local_timestamp(last_run_iso, utc_offset_local)}")
+                    st.info("Henüz senkron çalıştırılmadı.")
+
+                last_run_ts = float(sync_status.get("last_run_ts") or 0)
+                if last_run_ts:
+                    last_run_iso = datetime.fromtimestamp(last_run_ts, tz=timezone.utc).isoformat()
+                    st.caption(f"Son senkron: {_format_local_timestamp(last_run_iso, utc_offset_local)}")
+                if sync_status.get("last_error"):
+                    st.warning(f"Son senkron hatası: {sync_status.get('last_error')}")
 
             with st.expander("Ham Sonuç JSON", expanded=False):
                 st.code(_safe_json_dumps(st.session_state.get("dialer_last_tracking_payload") or {}), language="json")
@@ -284,7 +284,7 @@ def render_org_settings_service(context: Dict[str, Any]) -> None:
                     st.session_state.users_map = maps.get("users_map", {})
                     st.session_state.users_info = maps.get("users_info", {})
                     if st.session_state.users_info:
-                        st.session_state._users_info_last = dict(st.session_state.users_info)
+                        st.session_state._users_info_last = st.session_state.users_info
                     st.session_state.queues_map = maps.get("queues_map", {})
                     st.session_state.wrapup_map = maps.get("wrapup", {})
                     st.session_state.presence_map = maps.get("presence", {})
@@ -1,6 +1,9 @@
+from collections.abc import Mapping
 from typing import Any, Dict
 
 from src.app.context import bind_context
+from src.org_maps import id_to_name
+from src.report_cache import ReportResultCache, get_report_cache
 
 
 def _audit_user_action(action, detail=None, status="info", metadata=None):
@@ -360,6 +363,12 @@ def render_reports_service(context: Dict[str, Any]) -> None:
             step=5000,
             help="Büyük raporlarda bellek/disk baskısını azaltmak için çıktı satırını sınırlar."
         )
+        if r_type not in ["interaction_search", "chat_detail", "missed_interactions"]:
+            st.checkbox(
+                "Paylaşılan sonucu kullanma (güncel veriyi çek)",
+                key="rep_bypass_shared_cache",
+                help="Aynı rapor bu organizasyonda yakın zamanda hesaplanmış olsa bile veriyi API'den yeniden çeker.",
+            )
 
         # Metrics Selection
         user_metrics = st.session_state.app_user.get('metrics', [])
@@ -411,14 +420,24 @@ def render_reports_service(context: Dict[str, Any]) -> None:
         # Seconds mode: keep duration columns numeric and clean integer-like display
         target_cols = [
             c for c in df_out.columns
-            if (c.startswith('t') or c.startswith('Avg') or c in ['col_staffed_time', 'Duration', 'col_duration'])
-            and pd.api.types.is_numeric_dtype(df_out[c])
+            if is_duration_column(c) and pd.api.types.is_numeric_dtype(df_out[c])
         ]
         for col in target_cols:
             numeric = pd.to_numeric(df_out[col], errors="coerce").replace([float("inf"), float("-inf")], 0)
             df_out[col] = numeric.fillna(0).round(0).astype("int64")
         return df_out
 
+    def _render_queue_daily_chart(chart_df, metric_label):
+        st.subheader(get_text(lang, "daily_stat"))
+        render_24h_time_line_chart(
+            chart_df,
+            "Interval",
+            [metric_label],
+            aggregate_by_label="sum",
+            label_mode="date",
+            x_index_name="Tarih",
+        )
+
     def _sanitize_numeric_series(series_in, index=None):
         if isinstance(series_in, pd.Series):
             series = pd.to_numeric(series_in, errors="coerce")
@@ -582,7 +601,7 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                 continue
             tokens.add(str(aid).strip().lower())
             u_obj = users_info.get(aid) or {}
-            if isinstance(u_obj, dict):
+            if isinstance(u_obj, Mapping):
                 for candidate in [
                     u_obj.get("name"),
                     u_obj.get("username"),
@@ -995,8 +1014,6 @@ def render_reports_service(context: Dict[str, Any]) -> None:
 
                 api = GenesysAPI(st.session_state.api_client)
                 max_records = int(st.session_state.get("rep_max_records", 5000))
-                dfs = []
-                total_rows = 0
                 u_offset = utc_offset_hours
                 selected_queue_ids = [qid for qid in (sel_ids or []) if qid]
                 chat_media_query_types = [
@@ -1022,6 +1039,15 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                     language_lookup = st.session_state.get("languages_map", {})
 
                 include_requested_attributes = bool(requested_chat_attr_keys)
+                builder = ConversationDetailsBuilder(
+                    st.session_state.users_info,
+                    st.session_state.queues_map,
+                    st.session_state.wrapup_map,
+                    include_attributes=include_requested_attributes,
+                    utc_offset=u_offset,
+                    skill_map=skill_lookup,
+                    language_map=language_lookup,
+                )
                 for page in _iter_conversation_pages(
                     api,
                     start_date,
@@ -1032,20 +1058,9 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                     segment_filters=details_segment_filters,
                     allow_unfiltered_fallback=False,
                 ):
-                    df_chunk = process_conversation_details(
-                        {"conversations": page},
-                        st.session_state.users_info,
-                        st.session_state.queues_map,
-                        st.session_state.wrapup_map,
-                        include_attributes=include_requested_attributes,
-                        utc_offset=u_offset,
-                        skill_map=skill_lookup,
-                        language_map=language_lookup,
-                    )
-                    if not df_chunk.empty:
-                        dfs.append(df_chunk)
-                        total_rows += len(df_chunk)
-                df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+                    builder.add_page(page)
+                total_rows = len(builder)
+                df = builder.to_frame()
                 if max_records and total_rows >= max_records:
                     st.warning(
                         f"Maksimum kayıt limiti ({max_records}) uygulandı. Daha geniş aralıklar için limiti artırabilirsiniz."
@@ -1199,7 +1214,7 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                         )
                         final_df_view = render_table_with_export_view(final_df, "chat_detail")
                         _store_report_result("chat_detail", final_df, "chat_detail")
-                        render_downloads(final_df_view, "chat_detail", key_base="chat_detail")
+                        render_downloads(final_df_view, "chat_detail", key_base="chat_detail", source_df=final_df)
                         report_rendered_this_run = True
                     elif not df.empty:
                         _clear_report_result("chat_detail")
@@ -1255,8 +1270,6 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                  
                  # Get details
                  max_records = int(st.session_state.get("rep_max_records", 5000))
-                 dfs = []
-                 total_rows = 0
                  details_conversation_filters = [
                      {
                          "type": "and",
@@ -1306,6 +1319,15 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                  else:
                      language_lookup = st.session_state.get("languages_map", {})
 
+                 builder = ConversationDetailsBuilder(
+                     user_map=st.session_state.users_info,
+                     queue_map=st.session_state.queues_map,
+                     wrapup_map=st.session_state.wrapup_map,
+                     include_attributes=True,
+                     utc_offset=utc_offset_hours,
+                     skill_map=skill_lookup,
+                     language_map=language_lookup
+                 )
                  for page in _iter_conversation_pages(
                      api,
                      s_dt,
@@ -1316,20 +1338,9 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                      segment_filters=details_segment_filters,
                      allow_unfiltered_fallback=(not exclude_without_workgroup),
                  ):
-                     df_chunk = process_conversation_details(
-                         {"conversations": page},
-                         user_map=st.session_state.users_info,
-                         queue_map=st.session_state.queues_map,
-                         wrapup_map=st.session_state.wrapup_map,
-                         include_attributes=True,
-                         utc_offset=utc_offset_hours,
-                         skill_map=skill_lookup,
-                         language_map=language_lookup
-                     )
-                     if not df_chunk.empty:
-                         dfs.append(df_chunk)
-                         total_rows += len(df_chunk)
-                 df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+                     builder.add_page(page)
+                 total_rows = len(builder)
+                 df = builder.to_frame()
                  if max_records and total_rows >= max_records:
                      st.warning(f"Maksimum kayıt limiti ({max_records}) uygulandı. Daha geniş aralıklar için limiti artırabilirsiniz.")
                  
@@ -1374,6 +1385,7 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                              for col_name in final_cols
                          }
                          
+                         df_filtered = _apply_selected_duration_view(df_filtered)
                          final_df = df_filtered.rename(columns=rename_final)
                          final_df = _apply_report_row_limit(final_df, label="Kaçan etkileşim raporu")
                          
@@ -1385,7 +1397,7 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                          st.success(f"{len(final_df)} adet kaçan etkileşim bulundu.")
                          final_df_view = render_table_with_export_view(final_df, "missed_interactions")
                          _store_report_result("missed_interactions", final_df, "missed_interactions")
-                         render_downloads(final_df_view, "missed_interactions", key_base="missed_interactions")
+                         render_downloads(final_df_view, "missed_interactions", key_base="missed_interactions", source_df=final_df)
                          report_rendered_this_run = True
                      else:
                          _clear_report_result("missed_interactions")
@@ -1426,8 +1438,6 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                  # Fetch data
                  api = GenesysAPI(st.session_state.api_client)
                  max_records = int(st.session_state.get("rep_max_records", 5000))
-                 dfs = []
-                 total_rows = 0
                  selected_queue_ids = [qid for qid in (sel_ids or []) if qid]
                  details_conversation_filters, details_segment_filters = _build_detail_query_filters(
                      selected_queue_ids=selected_queue_ids,
@@ -1443,6 +1453,14 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                  else:
                      language_lookup = st.session_state.get("languages_map", {})
 
+                 builder = ConversationDetailsBuilder(
+                     st.session_state.users_info,
+                     st.session_state.queues_map,
+                     st.session_state.wrapup_map,
+                     utc_offset=utc_offset_hours,
+                     skill_map=skill_lookup,
+                     language_map=language_lookup
+                 )
                  for page in _iter_conversation_pages(
                      api,
                      start_date,
@@ -1453,19 +1471,9 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                      segment_filters=details_segment_filters,
                      allow_unfiltered_fallback=(not exclude_without_workgroup),
                  ):
-                     df_chunk = process_conversation_details(
-                         {"conversations": page},
-                         st.session_state.users_info,
-                         st.session_state.queues_map,
-                         st.session_state.wrapup_map,
-                         utc_offset=utc_offset_hours,
-                         skill_map=skill_lookup,
-                         language_map=language_lookup
-                     )
-                     if not df_chunk.empty:
-                         dfs.append(df_chunk)
-                         total_rows += len(df_chunk)
-                 df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+                     builder.add_page(page)
+                 total_rows = len(builder)
+                 df = builder.to_frame()
                  if max_records and total_rows >= max_records:
                      st.warning(f"Maksimum kayıt limiti ({max_records}) uygulandı. Daha geniş aralıklar için limiti artırabilirsiniz.")
                  
@@ -1501,7 +1509,7 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                      )
                      final_df_view = render_table_with_export_view(final_df, "interaction_search")
                      _store_report_result("interaction_search", final_df, "interactions")
-                     render_downloads(final_df_view, "interactions", key_base="interaction_search")
+                     render_downloads(final_df_view, "interactions", key_base="interaction_search", source_df=final_df)
                      report_rendered_this_run = True
                  else:
                      _clear_report_result("interaction_search")
@@ -1515,9 +1523,48 @@ def render_reports_service(context: Dict[str, Any]) -> None:
 
     # --- STANDARD REPORTS ---
     elif r_type not in ["chat_detail", "missed_interactions"] and st.button(get_text(lang, "fetch_report"), type="primary", width='stretch'):
+        report_cache = get_report_cache() if org else None
+        report_cache_key = ReportResultCache.request_key(
+            org,
+            report_type=r_type,
+            ids=sel_ids,
+            start=datetime.combine(sd, st_),
+            end=datetime.combine(ed, et),
+            utc_offset=utc_offset_hours,
+            granularity=gran_opt[sel_gran],
+            metrics=sel_mets,
+            media=sel_media_types,
+            fill_gaps=bool(do_fill),
+            lang=lang,
+            duration_mode=st.session_state.get("rep_duration_mode", "HH:MM:SS"),
+            row_limit=st.session_state.get("rep_auto_row_limit", 50000),
+        )
+        report_open_period = ed >= _local_today
+        # A fresh fetch still refreshes the shared result for the other sessions.
+        bypass_shared = bool(st.session_state.get("rep_bypass_shared_cache", False))
+        shared_report = report_cache.get(report_cache_key) if (report_cache and sel_mets and not bypass_shared) else None
         if not sel_mets:
             _audit_report_fetch(status="warning", rows=0, detail="Report fetch blocked: no metric selected.")
             st.warning("Lütfen metrik seçiniz.")
+        elif shared_report is not None:
+            df_out = shared_report["df"]
+            age_s = max(0, int(pytime.time() - shared_report["updated_at"]))
+            st.caption(
+                f"Aynı rapor {age_s} sn önce bu organizasyonda hesaplandı; paylaşılan sonuç gösteriliyor. "
+                "Güncel veri için gelişmiş filtrelerde 'Paylaşılan sonucu kullanma' seçeneğini işaretleyin."
+            )
+            _audit_report_fetch(
+                status="success",
+                rows=len(df_out),
+                detail=f"Standard report served from shared cache: {r_type}",
+            )
+            df_out_view = render_table_with_export_view(df_out, r_type)
+            _store_report_result(r_type, df_out, f"report_{r_type}")
+            report_rendered_this_run = True
+            daily_chart = shared_report["extras"].get("daily_chart")
+            if daily_chart is not None:
+                _render_queue_daily_chart(*daily_chart)
+            render_downloads(df_out_view, f"report_{r_type}", key_base=r_type, source_df=df_out)
         else:
             unsupported_aggregate_metrics = {
                 "tOrganizationResponse", "tAcdWait", "nConsultConnected", "nConsultAnswered",
@@ -1611,7 +1658,7 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                     dropped_set = set(dropped_bad_request_metrics)
                     sel_mets_effective = [m for m in sel_mets_effective if m not in dropped_set]
                 _show_aggregate_errors(agg_errors, label="Aggregate")
-                q_lookup = {v: k for k, v in st.session_state.queues_map.items()}
+                q_lookup = id_to_name(st.session_state.queues_map)
                 skill_lookup = {}
                 language_lookup = {}
                 if is_skill_detailed or is_dnis_skill_detailed or is_queue_skill:
@@ -1774,7 +1821,10 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                         "tOnQueue", "tBreak", "oEfficiency", "col_staffed_time", "nNotResponding",
                     ]
                     if any(m in sel_mets_effective for m in p_keys) and is_agent:
-                        p_map = process_user_aggregates(api.get_user_aggregates(s_dt, e_dt, sel_ids or list(st.session_state.users_info.keys())), st.session_state.get('presence_map'))
+                        p_map = {}
+                        presence_lookup = st.session_state.get('presence_map')
+                        for agg_part in api.iter_user_aggregates(s_dt, e_dt, sel_ids or list(st.session_state.users_info.keys())):
+                            process_user_aggregates(agg_part, presence_lookup, into=p_map)
                         for pk in ["tMeal", "tMeeting", "tAvailable", "tBusy", "tAway", "tTraining", "tBreak", "tOnQueue", "StaffedTime", "nNotResponding"]:
                             target_col = pk if pk != "StaffedTime" and pk != "nNotResponding" else ("col_staffed_time" if pk == "StaffedTime" else "nNotResponding")
                             fallback_series = df["Id"].apply(
@@ -1920,6 +1970,7 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                     report_rendered_this_run = True
 
                     # Queue report chart based on selected interval
+                    daily_chart = None
                     if r_kind == "Workgroup":
                         try:
                             if "Interval" in df.columns:
@@ -1934,18 +1985,19 @@ def render_reports_service(context: Dict[str, Any]) -> None:
                                         chart_df = chart_df.groupby("Interval", as_index=False)[metric_for_chart].sum()
                                         metric_label = get_text(lang, metric_for_chart)
                                         chart_df = chart_df.rename(columns={metric_for_chart: metric_label})
-                                        st.subheader(get_text(lang, "daily_stat"))
-                                        render_24h_time_line_chart(
-                                            chart_df,
-                                            "Interval",
-                                            [metric_label],
-                                            aggregate_by_label="sum",
-                                            label_mode="date",
-                                            x_index_name="Tarih",
-                                        )
+                                        daily_chart = (chart_df, metric_label)
+                                        _render_queue_daily_chart(chart_df, metric_label)
                         except Exception as e:
                             monitor.log_error("REPORT_RENDER", "Queue report chart render failed", str(e))
-                    render_downloads(df_out_view, f"report_{r_type}", key_base=r_type)
+                    if report_cache:
+                        report_cache.put(
+                            report_cache_key,
+                            df_out,
+                            base_name=f"report_{r_type}",
+                            open_period=report_open_period,
+                            extras={"daily_chart": daily_chart},
+                        )
+                    render_downloads(df_out_view, f"report_{r_type}", key_base=r_type, source_df=df_out)
                 else:
                     _clear_report_result(r_type)
                     _audit_report_fetch(status="warning", rows=0, detail=f"Standard report returned no data: {r_type}")
@@ -1958,4 +2010,4 @@ def render_reports_service(context: Dict[str, Any]) -> None:
             if isinstance(cached_df, pd.DataFrame) and not cached_df.empty:
                 cached_base_name = str(cached_report.get("base_name") or f"report_{r_type}")
                 cached_view_df = render_table_with_export_view(cached_df, r_type)
-                render_downloads(cached_view_df, cached_base_name, key_base=r_type)
+                render_downloads(cached_view_df, cached_base_name, key_base=r_type, source_df=cached_df)
@@ -1,4 +1,7 @@
 import hashlib
+import json
+import os
+import tempfile
 import time as pytime
 import warnings
 from datetime import datetime
@@ -9,8 +12,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from src.export_cache import ExportCache, frame_fingerprint, get_export_cache
 from src.monitor import monitor
-from src.processor import to_csv, to_excel, to_parquet, to_pdf
+from src.processor import PDF_MAX_ROWS, write_csv, write_excel, write_parquet, write_pdf
 
 
 def _to_datetime_safe(values):
@@ -209,10 +213,14 @@ def _report_result_state_key(report_key):
 def _store_report_result(report_key, df, base_name):
     if df is None or not isinstance(df, pd.DataFrame) or df.empty:
         return
+    # Sessions keep a reference: stored frames may be shared with other sessions
+    # through the org report cache and are never mutated after this point, so
+    # they are hashed once here for export keys.
     st.session_state[_report_result_state_key(report_key)] = {
-        "df": df.copy(),
+        "df": df,
         "base_name": str(base_name or report_key),
         "rows": int(len(df)),
+        "fingerprint": frame_fingerprint(df),
         "updated_at": pytime.time(),
     }
 
@@ -225,6 +233,22 @@ def _get_report_result(report_key):
         return None
     return payload
 
+def _report_view_fingerprint(report_key, source_df):
+    """Export fingerprint of the table view of a stored report frame, from its stored hash."""
+    payload = _get_report_result(report_key)
+    if not payload or payload.get("df") is not source_df or not payload.get("fingerprint"):
+        return None
+    # render_table_with_export_view derives the view from these settings alone.
+    state = st.session_state.get(_report_table_view_state_key(report_key)) or {}
+    view_spec = [
+        payload["fingerprint"],
+        list(state.get("visible") or []),
+        str(state.get("sort_by") or ""),
+        bool(state.get("ascending", True)),
+    ]
+    raw = json.dumps(view_spec, default=str).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
 def _clear_report_result(report_key):
     st.session_state.pop(_report_result_state_key(report_key), None)
 
@@ -521,19 +545,60 @@ def render_table_with_export_view(df, report_key, help_text=None):
     st.dataframe(view_df, width='stretch', hide_index=True)
     return view_df
 
-def render_downloads(df, base_name, key_base=None):
+def _prepare_download_file(writer, df, ext):
+    """Writes the export into the app temp dir; only the path is kept in session state."""
+    fd, path = tempfile.mkstemp(prefix="export_", suffix=f".{ext}")
+    os.close(fd)
+    try:
+        writer(df, path)
+    except Exception:
+        _remove_download_file(path)
+        raise
+    return path
+
+def _remove_download_file(path):
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except Exception:
+        pass
+
+def _read_download_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _session_export_cache():
+    app_user = st.session_state.get("app_user") or {}
+    return get_export_cache(app_user.get("org_code"))
+
+def render_downloads(df, base_name, key_base=None, source_df=None):
+    """
+    Format picker, "Hazırla" and download button for ``df``.
+
+    ``source_df`` is the stored report frame (``_store_report_result``) that ``df`` is
+    the table view of; its stored fingerprint then replaces hashing ``df`` on every rerun.
+    """
     fmt_options = {
-        "CSV": {"ext": "csv", "mime": "text/csv", "builder": to_csv},
-        "Excel": {"ext": "xlsx", "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "builder": to_excel},
-        "Parquet": {"ext": "parquet", "mime": "application/octet-stream", "builder": to_parquet},
-        "PDF": {"ext": "pdf", "mime": "application/pdf", "builder": lambda d: to_pdf(d, title=base_name)},
+        "CSV": {"ext": "csv", "mime": "text/csv", "writer": write_csv},
+        "Excel": {"ext": "xlsx", "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "writer": write_excel},
+        "Parquet": {"ext": "parquet", "mime": "application/octet-stream", "writer": write_parquet},
+        "PDF": {
+            "ext": "pdf",
+            "mime": "application/pdf",
+            "writer": lambda d, path: write_pdf(d, path, title=base_name, max_rows=PDF_MAX_ROWS),
+            "options": {"title": str(base_name), "max_rows": PDF_MAX_ROWS},
+        },
     }
     key_token = _safe_state_token(key_base or base_name)
     safe_key = key_token or "report"
     fmt_key = f"dl_fmt_{safe_key}"
     prep_key = f"dl_prepare_{safe_key}"
     payload_key = f"dl_payload_{safe_key}"
-    current_sig = _download_df_signature(df)
+    current_sig = _report_view_fingerprint(key_base or base_name, source_df) if source_df is not None else None
+    if current_sig is None:
+        current_sig = frame_fingerprint(df)
+    export_cache = _session_export_cache()
 
     st.caption("İndirme formatı")
     c1, c2, c3 = st.columns([2, 1, 2], gap="small")
@@ -546,26 +611,63 @@ def render_downloads(df, base_name, key_base=None):
         )
     with c2:
         prepare_clicked = st.button("Hazırla", key=prep_key, width='stretch')
+    selected_opt = fmt_options[selected_fmt]
+    export_key = ExportCache.entry_key(current_sig, selected_fmt, selected_opt.get("options"))
     if prepare_clicked:
-        opt = fmt_options[selected_fmt]
         with st.spinner(f"{selected_fmt} hazırlanıyor..."):
-            payload = opt["builder"](df)
+            if export_cache is not None:
+                writer = selected_opt["writer"]
+                entry = export_cache.get_or_build(export_key, selected_opt["ext"], lambda path: writer(df, path))
+                path = entry["path"]
+            else:
+                path = _prepare_download_file(selected_opt["writer"], df, selected_opt["ext"])
+        previous = st.session_state.get(payload_key) or {}
+        if not previous.get("shared"):
+            _remove_download_file(previous.get("path"))
         st.session_state[payload_key] = {
             "format": selected_fmt,
-            "ext": opt["ext"],
-            "mime": opt["mime"],
-            "data": payload,
+            "ext": selected_opt["ext"],
+            "mime": selected_opt["mime"],
+            "path": path,
+            "shared": export_cache is not None,
+            "size": os.path.getsize(path),
             "rows": len(df),
             "sig": current_sig,
             "prepared_at": datetime.now().strftime("%Y%m%d_%H%M%S"),
         }
     with c3:
         payload = st.session_state.get(payload_key) or {}
-        is_ready = bool(payload and payload.get("format") == selected_fmt and payload.get("sig") == current_sig)
+        is_ready = bool(
+            payload
+            and payload.get("format") == selected_fmt
+            and payload.get("sig") == current_sig
+            and payload.get("path")
+            and os.path.exists(payload.get("path"))
+        )
+        if not is_ready and export_cache is not None:
+            # Another session may already have built this exact export.
+            entry = export_cache.get(export_key)
+            if entry:
+                payload = {
+                    "format": selected_fmt,
+                    "ext": selected_opt["ext"],
+                    "mime": selected_opt["mime"],
+                    "path": entry["path"],
+                    "shared": True,
+                    "size": entry["size"],
+                    "rows": len(df),
+                    "sig": current_sig,
+                    "prepared_at": datetime.fromtimestamp(entry["created_at"]).strftime("%Y%m%d_%H%M%S"),
+                }
+                is_ready = True
         prepared_at = (payload.get("prepared_at") if is_ready else datetime.now().strftime("%Y%m%d_%H%M%S"))
-        ext = payload.get("ext") if is_ready else fmt_options.get(selected_fmt, {}).get("ext", "bin")
-        mime = payload.get("mime") if is_ready else fmt_options.get(selected_fmt, {}).get("mime", "application/octet-stream")
-        data = payload.get("data") if is_ready else b""
+        ext = payload.get("ext") if is_ready else selected_opt.get("ext", "bin")
+        mime = payload.get("mime") if is_ready else selected_opt.get("mime", "application/octet-stream")
+        data = b""
+        if is_ready:
+            path = payload.get("path")
+            # Streamlit reads callable data only when the button is clicked.
+            data = lambda: _read_download_file(path)
         st.download_button(
             f"{selected_fmt} indir",
             data=data,
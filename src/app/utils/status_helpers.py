@@ -1,6 +1,8 @@
+import bisect
 import html
 import json
 import re
+from collections.abc import Mapping
 from datetime import datetime, timedelta, timezone
 
 def _escape_html(value):
@@ -49,9 +51,9 @@ def _format_iso_with_utc_offset(iso_str, utc_offset_hours=3.0, out_fmt="%Y-%m-%d
 
 def _resolve_user_label(user_id=None, users_info=None, fallback_name=None):
     uid = str(user_id or "").strip()
-    if uid and isinstance(users_info, dict):
+    if uid and isinstance(users_info, Mapping):
         user_obj = users_info.get(uid) or {}
-        if isinstance(user_obj, dict):
+        if isinstance(user_obj, Mapping):
             name = str(user_obj.get("name") or "").strip()
             if name:
                 return name
@@ -1539,6 +1541,63 @@ def _timeline_actor_type_rank(changer_type):
     return 3
 
 
+ACTOR_MATCH_WINDOW_SECONDS = 20 * 60
+
+
+class ActorEventIndex(list):
+    """
+    prepare_actor_events() çıktısı: normal liste + servis bazlı zaman indeksi.
+
+    Her servis için olaylar epoch saniyesine göre sıralanır; eşleştirme
+    bisect ile yalnızca ±20 dk penceresindeki olaylara bakar. Servisi boş
+    olan olaylar her kaynakla eşleşebildiği için ayrı bir kova olarak tutulur.
+    Liste sonradan değiştirilirse indeks ilk sorguda yeniden kurulur.
+    """
+
+    def __init__(self, events=()):
+        super().__init__(events)
+        self._index = None
+        self._index_len = -1
+
+    def _build_index(self):
+        buckets = {}
+        for pos, ev in enumerate(self):
+            event_time = ev.get("time_utc") if isinstance(ev, dict) else None
+            if not isinstance(event_time, datetime):
+                continue
+            service = str(ev.get("service") or "").strip().lower()
+            ts = event_time.timestamp()
+            buckets.setdefault(service, []).append((ts, pos))
+            buckets.setdefault(None, []).append((ts, pos))
+        index = {}
+        for service, pairs in buckets.items():
+            pairs.sort()
+            index[service] = ([ts for ts, _ in pairs], [pos for _, pos in pairs])
+        self._index = index
+        self._index_len = len(self)
+
+    def candidates(self, source_key, start_utc, window_seconds=ACTOR_MATCH_WINDOW_SECONDS):
+        """Pencere içindeki ve servisi uyumlu olayları orijinal sırayla döndürür."""
+        if self._index is None or self._index_len != len(self):
+            self._build_index()
+        center = start_utc.timestamp()
+        lo_ts = center - window_seconds - 1
+        hi_ts = center + window_seconds + 1
+        keys = [source_key, ""] if source_key else [None]
+        positions = []
+        for key in keys:
+            entry = self._index.get(key)
+            if not entry:
+                continue
+            times, pos_list = entry
+            lo = bisect.bisect_left(times, lo_ts)
+            hi = bisect.bisect_right(times, hi_ts)
+            positions.extend(pos_list[lo:hi])
+        if len(keys) > 1:
+            positions.sort()
+        return [self[pos] for pos in positions]
+
+
 def prepare_actor_events(
     audit_entities, target_user_id, users_info=None,
 ):
@@ -1568,7 +1627,7 @@ def prepare_actor_events(
             "changer_type": changer_type,
             "audit_id": str(item.get("id") or "-").strip() or "-",
         })
-    return events
+    return ActorEventIndex(events)
 
 
 def find_best_actor_for_transition(
@@ -1585,14 +1644,19 @@ def find_best_actor_for_transition(
     new_token = _normalize_timeline_status_token(new_value)
     source_key = str(source_name or "").strip().lower()
 
+    if isinstance(actor_events, ActorEventIndex):
+        candidates = actor_events.candidates(source_key, start_utc)
+    else:
+        candidates = actor_events or []
+
     best = None
     best_score = None
-    for ev in actor_events or []:
+    for ev in candidates:
         event_time = ev.get("time_utc")
         if not isinstance(event_time, datetime):
             continue
         delta = abs((event_time - start_utc).total_seconds())
-        if delta > 20 * 60:
+        if delta > ACTOR_MATCH_WINDOW_SECONDS:
             continue
         ev_service = str(ev.get("service") or "").strip().lower()
         if source_key and ev_service and ev_service != source_key:
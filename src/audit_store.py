@@ -0,0 +1,463 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.monitor import monitor
+from src.org_state import _env_int, OrgRegistry
+
+
+_UUID_PATTERN = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
+
+def _to_epoch_ms(value):
+    """Epoch milliseconds of a datetime or ISO timestamp (naive values are UTC)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+        except Exception:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def _to_utc_iso(epoch_ms):
+    dt = datetime.fromtimestamp(epoch_ms / 1000.0, tz=timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class AuditEventStore:
+    """
+    Per-org SQLite store of Genesys audit events.
+
+    Events are indexed by time, service, entity, actor and every user/queue id
+    mentioned anywhere in the payload, so admin timelines can be answered with
+    local lookups. ``audit_sync_state`` records which window of each service has
+    been fully ingested.
+    """
+
+    FILENAME = "audit_events.sqlite"
+    RETENTION_DAYS = _env_int("GENESYS_AUDIT_STORE_RETENTION_DAYS", 30, minimum=1)
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS audit_events (
+                    audit_key TEXT PRIMARY KEY,
+                    event_ms INTEGER NOT NULL,
+                    service TEXT NOT NULL DEFAULT '',
+                    action TEXT NOT NULL DEFAULT '',
+                    entity_type TEXT NOT NULL DEFAULT '',
+                    entity_id TEXT NOT NULL DEFAULT '',
+                    actor_id TEXT NOT NULL DEFAULT '',
+                    payload TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_audit_events_time ON audit_events(event_ms);
+                CREATE INDEX IF NOT EXISTS idx_audit_events_service ON audit_events(service, event_ms);
+                CREATE INDEX IF NOT EXISTS idx_audit_events_entity ON audit_events(entity_id, event_ms);
+                CREATE INDEX IF NOT EXISTS idx_audit_events_actor ON audit_events(actor_id, event_ms);
+                CREATE TABLE IF NOT EXISTS audit_event_refs (
+                    ref_id TEXT NOT NULL,
+                    audit_key TEXT NOT NULL,
+                    event_ms INTEGER NOT NULL,
+                    PRIMARY KEY (ref_id, audit_key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_audit_event_refs_time ON audit_event_refs(ref_id, event_ms);
+                CREATE TABLE IF NOT EXISTS audit_sync_state (
+                    service TEXT PRIMARY KEY,
+                    covered_from_ms INTEGER,
+                    covered_to_ms INTEGER,
+                    last_error TEXT,
+                    updated_at REAL
+                );
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _audit_key(item):
+        aid = str(item.get("id") or "").strip()
+        if aid:
+            return f"id:{aid}"
+        raw = json.dumps(item, sort_keys=True, separators=(",", ":"), default=str)
+        return f"fp:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    def add_events(self, entities):
+        """Insert or refresh audit entities; returns the number of rows written."""
+        rows = []
+        refs = []
+        for item in entities or []:
+            if not isinstance(item, dict):
+                continue
+            event_ms = _to_epoch_ms(item.get("eventDate"))
+            if event_ms is None:
+                continue
+            key = self._audit_key(item)
+            payload = json.dumps(item, ensure_ascii=False, separators=(",", ":"), default=str)
+            entity = item.get("entity") or {}
+            actor = item.get("user") or {}
+            rows.append((
+                key,
+                event_ms,
+                str(item.get("serviceName") or "").strip().lower(),
+                str(item.get("action") or "").strip().lower(),
+                str(item.get("entityType") or entity.get("type") or "").strip().lower(),
+                str(entity.get("id") or "").strip().lower(),
+                str(actor.get("id") or "").strip().lower(),
+                payload,
+            ))
+            for ref_id in {m.lower() for m in _UUID_PATTERN.findall(payload)}:
+                refs.append((ref_id, key, event_ms))
+        if not rows:
+            return 0
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO audit_events"
+                    " (audit_key, event_ms, service, action, entity_type, entity_id, actor_id, payload)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO audit_event_refs (ref_id, audit_key, event_ms) VALUES (?, ?, ?)",
+                    refs,
+                )
+                conn.commit()
+            return len(rows)
+        except Exception as e:
+            monitor.log_error("AUDIT_STORE", f"Audit store write failed: {e}")
+            return 0
+
+    def query(self, start_date, end_date, ref_ids=None, services=None, limit=None, offset=0):
+        """
+        Audit payloads in [start_date, end_date], newest first.
+
+        ``ref_ids`` keeps events mentioning any of the ids (actor, entity, context);
+        ``services`` narrows by serviceName. Returns None if the store cannot be read.
+        """
+        start_ms = _to_epoch_ms(start_date)
+        end_ms = _to_epoch_ms(end_date)
+        if start_ms is None or end_ms is None:
+            return None
+        clauses = ["e.event_ms >= ?", "e.event_ms <= ?"]
+        params = [start_ms, end_ms]
+        ref_list = sorted({str(r or "").strip().lower() for r in (ref_ids or []) if str(r or "").strip()})
+        service_list = sorted({str(s or "").strip().lower() for s in (services or []) if str(s or "").strip()})
+        if service_list:
+            clauses.append(f"e.service IN ({','.join('?' for _ in service_list)})")
+            params.extend(service_list)
+        if ref_list:
+            sql = (
+                "SELECT e.payload FROM audit_events e"
+                " WHERE e.audit_key IN ("
+                f"  SELECT r.audit_key FROM audit_event_refs r WHERE r.ref_id IN ({','.join('?' for _ in ref_list)})"
+                "   AND r.event_ms >= ? AND r.event_ms <= ?)"
+                f" AND {' AND '.join(clauses)}"
+                " ORDER BY e.event_ms DESC, e.audit_key"
+            )
+            params = ref_list + [start_ms, end_ms] + params
+        else:
+            sql = f"SELECT e.payload FROM audit_events e WHERE {' AND '.join(clauses)} ORDER BY e.event_ms DESC, e.audit_key"
+        if limit:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([int(limit), max(0, int(offset or 0))])
+        try:
+            with self._lock:
+                rows = self._connect().execute(sql, params).fetchall()
+        except Exception as e:
+            monitor.log_error("AUDIT_STORE", f"Audit store query failed: {e}")
+            return None
+        out = []
+        for (payload,) in rows:
+            try:
+                out.append(json.loads(payload))
+            except Exception:
+                continue
+        return out
+
+    def query_matching(self, start_date, end_date, keep, limit, ref_ids=None, services=None, batch_size=1000):
+        """
+        Payloads accepted by ``keep(rows) -> rows``, newest first, at most ``limit`` of them.
+
+        Rows are read in batches and filtered before the cap, so ``limit`` counts matches.
+        Returns ``(matches, complete)``: ``complete`` is False when the cap was reached
+        (there may be more) or the store could not be read (``matches`` is then None).
+        """
+        limit = max(1, int(limit))
+        matches = []
+        offset = 0
+        while True:
+            rows = self.query(start_date, end_date, ref_ids=ref_ids, services=services, limit=batch_size, offset=offset)
+            if rows is None:
+                return None, False
+            matches.extend(keep(rows))
+            if len(matches) >= limit:
+                return matches[:limit], False
+            if len(rows) < batch_size:
+                return matches, True
+            offset += batch_size
+
+    def get_sync_state(self):
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT service, covered_from_ms, covered_to_ms, last_error, updated_at FROM audit_sync_state"
+                ).fetchall()
+        except Exception:
+            return {}
+        return {
+            row[0]: {
+                "covered_from_ms": row[1],
+                "covered_to_ms": row[2],
+                "last_error": row[3],
+                "updated_at": row[4],
+            }
+            for row in rows
+        }
+
+    def set_sync_state(self, service, covered_from_ms=None, covered_to_ms=None, last_error=None):
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT INTO audit_sync_state (service, covered_from_ms, covered_to_ms, last_error, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT(service) DO UPDATE SET"
+                    "  covered_from_ms = COALESCE(excluded.covered_from_ms, covered_from_ms),"
+                    "  covered_to_ms = COALESCE(excluded.covered_to_ms, covered_to_ms),"
+                    "  last_error = excluded.last_error,"
+                    "  updated_at = excluded.updated_at",
+                    (service, covered_from_ms, covered_to_ms, last_error, time.time()),
+                )
+                conn.commit()
+        except Exception as e:
+            monitor.log_error("AUDIT_STORE", f"Audit sync state write failed: {e}")
+
+    def covers(self, start_date, end_date, max_lag_seconds=0):
+        """True when every service this org accepts has [start_date, end_date] on disk."""
+        start_ms = _to_epoch_ms(start_date)
+        end_ms = _to_epoch_ms(end_date)
+        if start_ms is None or end_ms is None:
+            return False
+        now_ms = int(time.time() * 1000)
+        required_to = min(end_ms, now_ms - int(max_lag_seconds * 1000))
+        # Services that never ingested anything (rejected serviceName) have no covered_to.
+        healthy = [state for state in self.get_sync_state().values() if state.get("covered_to_ms")]
+        if not healthy:
+            return False
+        for state in healthy:
+            if (state.get("covered_from_ms") or 0) > start_ms:
+                return False
+            if (state.get("covered_to_ms") or 0) < required_to:
+                return False
+        return True
+
+    def prune(self, retention_days=None):
+        days = int(retention_days or self.RETENTION_DAYS)
+        cutoff_ms = int((time.time() - (days * 86400)) * 1000)
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM audit_events WHERE event_ms < ?", (cutoff_ms,))
+                conn.execute("DELETE FROM audit_event_refs WHERE event_ms < ?", (cutoff_ms,))
+                conn.execute(
+                    "UPDATE audit_sync_state SET covered_from_ms = ? WHERE covered_from_ms < ?",
+                    (cutoff_ms, cutoff_ms),
+                )
+                conn.commit()
+        except Exception as e:
+            monitor.log_error("AUDIT_STORE", f"Audit store prune failed: {e}")
+
+
+class AuditIngester:
+    """
+    Background thread that pulls realtime audits of one org into its AuditEventStore.
+
+    Each service is read forward from its high-water mark in ascending pages, so
+    after the initial backfill every cycle only fetches the new events.
+    """
+
+    SERVICES = ("Presence", "Routing", "Users", "ContactCenter")
+    INTERVAL_SECONDS = _env_int("GENESYS_AUDIT_INGEST_INTERVAL_SECONDS", 300, minimum=30)
+    BACKFILL_DAYS = _env_int("GENESYS_AUDIT_INGEST_BACKFILL_DAYS", 7, minimum=1)
+    # Realtime audit queries accept at most this window per request.
+    MAX_WINDOW_DAYS = 7
+    PAGE_SIZE = 500
+    MAX_PAGES_PER_WINDOW = 20
+    # Events are written with a small delay; keep this much of the recent past open.
+    SETTLE_SECONDS = 120
+
+    def __init__(self, org_code, store):
+        self.org_code = org_code
+        self.store = store
+        self._api = None
+        self._api_lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self.last_run_ts = 0
+        self.last_ingested = 0
+        self.last_error = None
+
+    def set_api(self, api):
+        with self._api_lock:
+            self._api = api
+
+    def _get_api(self):
+        with self._api_lock:
+            return self._api
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"AuditIngester-{self.org_code}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                monitor.log_error("AUDIT_INGEST", f"Audit ingest cycle failed ({self.org_code}): {e}")
+            self._stop_event.wait(self.INTERVAL_SECONDS)
+
+    def run_once(self):
+        api = self._get_api()
+        if api is None:
+            return 0
+        now_ms = int(time.time() * 1000)
+        target_to_ms = now_ms - (self.SETTLE_SECONDS * 1000)
+        backfill_from_ms = now_ms - (self.BACKFILL_DAYS * 86400 * 1000)
+        states = self.store.get_sync_state()
+        total = 0
+        for service in self.SERVICES:
+            if self._stop_event.is_set():
+                break
+            state = states.get(service) or {}
+            covered_from = state.get("covered_from_ms") or backfill_from_ms
+            cursor_ms = state.get("covered_to_ms") or covered_from
+            if state.get("last_error") and not state.get("covered_to_ms"):
+                # Service rejected by this org (unknown serviceName etc.); retry from scratch.
+                cursor_ms = covered_from
+            ingested, reached_ms, error = self._ingest_service(api, service, cursor_ms, target_to_ms)
+            total += ingested
+            self.store.set_sync_state(
+                service,
+                covered_from_ms=covered_from,
+                covered_to_ms=reached_ms if reached_ms > cursor_ms or not error else None,
+                last_error=error,
+            )
+        self.store.prune()
+        self.last_run_ts = time.time()
+        self.last_ingested = total
+        return total
+
+    def _ingest_service(self, api, service, from_ms, to_ms):
+        """Read one service forward; returns (events written, covered-to ms, error)."""
+        ingested = 0
+        window_from = from_ms
+        while window_from < to_ms:
+            window_to = min(to_ms, window_from + (self.MAX_WINDOW_DAYS * 86400 * 1000))
+            interval = f"{_to_utc_iso(window_from)}/{_to_utc_iso(window_to)}"
+            last_event_ms = None
+            exhausted = True
+            for page_number in range(1, self.MAX_PAGES_PER_WINDOW + 1):
+                try:
+                    resp = api.query_audits_realtime(
+                        interval=interval,
+                        service_name=service,
+                        page_number=page_number,
+                        page_size=self.PAGE_SIZE,
+                        sort_order="ascending",
+                        expand_user=True,
+                    ) or {}
+                except Exception as e:
+                    error = str(api._extract_error_detail(e) or e)
+                    reached = last_event_ms if last_event_ms is not None else window_from
+                    return ingested, reached, error
+                page_entities = resp.get("entities") or []
+                ingested += self.store.add_events(page_entities)
+                for item in page_entities:
+                    event_ms = _to_epoch_ms((item or {}).get("eventDate"))
+                    if event_ms is not None and (last_event_ms is None or event_ms > last_event_ms):
+                        last_event_ms = event_ms
+                page_count = resp.get("pageCount")
+                if not page_entities or len(page_entities) < self.PAGE_SIZE:
+                    break
+                if page_count and page_number >= int(page_count):
+                    break
+            else:
+                exhausted = False
+            if not exhausted and last_event_ms is not None and last_event_ms > window_from:
+                # Page cap hit: continue from the newest event seen (duplicates are ignored by key).
+                window_from = last_event_ms
+                continue
+            window_from = window_to
+        return ingested, to_ms, None
+
+    def status(self):
+        return {
+            "org_code": self.org_code,
+            "running": self.is_running(),
+            "last_run_ts": self.last_run_ts,
+            "last_ingested": self.last_ingested,
+            "last_error": self.last_error,
+            "services": self.store.get_sync_state(),
+        }
+
+
+_ingesters = {}
+_registry_lock = threading.Lock()
+
+# Process-wide audit store of an org, or None if it has no state dir.
+get_audit_store = OrgRegistry(AuditEventStore.FILENAME, AuditEventStore)
+
+
+def ensure_audit_ingester(api):
+    """Start (or refresh the credentials of) the background audit ingester for the api's org."""
+    org_code = getattr(api, "org_code", None)
+    store = get_audit_store(org_code)
+    if store is None:
+        return None
+    with _registry_lock:
+        ingester = _ingesters.get(org_code)
+        if ingester is None:
+            ingester = AuditIngester(org_code, store)
+            _ingesters[org_code] = ingester
+    ingester.set_api(api)
+    ingester.start()
+    return ingester
+
+
+def get_audit_ingester(org_code):
+    with _registry_lock:
+        return _ingesters.get(org_code)
@@ -192,7 +192,8 @@ def authenticate(client_id, client_secret, region='mypurecloud.ie', org_code=Non
         return {
             "access_token": cached["access_token"],
             "region": cached["region"],
-            "api_host": cached["api_host"]
+            "api_host": cached["api_host"],
+            "org_code": safe_org,
         }, None
 
     # Set login host based on region
@@ -220,7 +221,8 @@ def authenticate(client_id, client_secret, region='mypurecloud.ie', org_code=Non
             return {
                 "access_token": token_entry["access_token"],
                 "region": token_entry["region"],
-                "api_host": token_entry["api_host"]
+                "api_host": token_entry["api_host"],
+                "org_code": safe_org,
             }, None
         else:
             return None, f"Auth failed ({response.status_code}): {response.text}"
@@ -1,5 +1,6 @@
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from src.api import GenesysAPI
 from src.monitor import monitor
@@ -10,15 +11,20 @@ class DataManager:
     Manages background data fetching from Genesys API.
     Designed to work with Streamlit's @st.cache_resource.
     """
-    MAX_QUEUE_MEMBERS_CACHE = 50   # Max queues to cache members for (reduced from 100)
+    MAX_QUEUE_MEMBERS_CACHE = 100  # Max queues to cache members for (monitored + agent queues)
     MAX_AGENT_DETAILS_CACHE = 50   # Max queues for agent details (reduced from 100)
     MAX_OBS_DATA_CACHE = 100       # Max queues for observations cache (reduced from 200)
     MAX_DAILY_DATA_CACHE = 100     # Max queues for daily stats cache (reduced from 200)
     MAX_ROUTING_ACTIVITY_CACHE = 100  # Max queues for routing activity cache
     CACHE_CLEANUP_INTERVAL = 120   # 2 minutes (reduced from 5 minutes)
+    EVENT_RECONCILE_INTERVAL = 120  # Routing-activity REST sweep cadence while websocket deltas cover all users
+    MEMBER_REFRESH_INTERVAL = 3600  # Re-check membership of cached queues hourly
+    MEMBER_MISSING_RETRY_INTERVAL = 60  # Retry queues without cached members every minute
+    MEMBER_SYNC_MAX_WORKERS = 4    # Parallel queue-member fetches
+    MEMBER_SYNC_INITIAL_WAIT_SECONDS = 5  # Max loop wait for first-time membership
     
     def __init__(self, api_client=None, presence_map=None):
-        self.api = GenesysAPI(api_client) if api_client else None
+        self.api = GenesysAPI(api_client, priority=GenesysAPI.PRIORITY_LIVE) if api_client else None
         self.presence_map = presence_map or {}
         self.queues_map = {}
         self.agent_queues_map = {}
@@ -32,12 +38,23 @@ class DataManager:
         self.routing_activity_cache = {}
         self.agent_details_cache = {}
         self.queue_members_cache = {} 
+        self.queue_member_signatures = {}
+        self.queue_member_refresh_ts = {}
+        self._member_retry_at = {}
+        self._member_sync_thread = None
         self.last_member_refresh = 0
         self.last_daily_refresh = 0
         self.last_daily_interval_key = None
         self.last_update_time = 0
         self.last_cache_cleanup = 0
         self.error_log = [] # For console sync in app.py
+
+        # Event-driven (hybrid) mode: websocket deltas patch routing activity between REST sweeps
+        self.event_source = None
+        self.last_reconcile_time = 0
+        self.last_event_apply_time = 0
+        self._monitored_member_ids = set()
+        self._routing_resweep = False
         
         # Threading
         self.stop_event = threading.Event()
@@ -54,12 +71,11 @@ class DataManager:
             self.queues_map = queues_map
             
             if agent_queues_map is not None:
-                # Check if targets changed significantly to clear cache
-                new_keys = set(agent_queues_map.keys())
-                old_keys = set(self.agent_queues_map.keys())
-                if new_keys != old_keys:
-                    self.queue_members_cache = {}
                 self.agent_queues_map = agent_queues_map
+            # Members are synced for monitored and agent queues; forget queues that left both.
+            member_q_ids = set(self.queues_map.values()) | set(self.agent_queues_map.values())
+            for q_id in [q for q in self.queue_members_cache if q not in member_q_ids]:
+                self._forget_queue_members(q_id)
             
             # Respect disabled state
             if not self.enabled:
@@ -86,6 +102,12 @@ class DataManager:
         self.routing_activity_cache = {}
         self.agent_details_cache = {}
         self.queue_members_cache = {}
+        self.queue_member_signatures = {}
+        self.queue_member_refresh_ts = {}
+        self._member_retry_at = {}
+        self.last_reconcile_time = 0
+        self._monitored_member_ids = set()
+        self._routing_resweep = False
         self.error_log = []
 
     def resume(self):
@@ -94,6 +116,7 @@ class DataManager:
     def force_stop(self):
         """Hard stop: disable, clear maps, and drop API client."""
         self.stop()
+        self.attach_event_source(None)
         with self._lock:
             self.api = None
             self.queues_map = {}
@@ -101,7 +124,7 @@ class DataManager:
 
     def update_api_client(self, api_client, presence_map=None):
         with self._lock:
-            self.api = GenesysAPI(api_client) if api_client else None
+            self.api = GenesysAPI(api_client, priority=GenesysAPI.PRIORITY_LIVE) if api_client else None
             if presence_map:
                 self.presence_map = presence_map
 
@@ -115,6 +138,72 @@ class DataManager:
                     refresh_interval = 10
                 self.refresh_interval = max(1, refresh_interval)
 
+    def attach_event_source(self, source):
+        """Receive presence/routingStatus deltas from an AgentNotificationManager."""
+        with self._lock:
+            previous = self.event_source
+            if previous is source:
+                return
+            self.event_source = source
+            self.last_reconcile_time = 0
+        if previous is not None:
+            try:
+                previous.remove_event_listener(self._apply_user_event)
+            except Exception:
+                pass
+        if source is not None:
+            try:
+                source.add_event_listener(self._apply_user_event)
+            except Exception:
+                with self._lock:
+                    self.event_source = None
+
+    def _events_cover(self, user_ids):
+        source = self.event_source
+        if source is None or not user_ids:
+            return False
+        try:
+            return bool(source.connected) and source.covers_users(user_ids)
+        except Exception:
+            return False
+
+    def _apply_user_event(self, user_id, kind, event):
+        """Patch routing-activity rows in place from one websocket event."""
+        if not user_id or not isinstance(event, dict):
+            return
+        if kind == "presence":
+            pres_def = event.get("presenceDefinition") or {}
+            row_updates = {
+                "system_presence": pres_def.get("systemPresence") or "OFFLINE",
+                "organization_presence_id": pres_def.get("id"),
+            }
+            activity_date = event.get("modifiedDate")
+        elif kind == "routingStatus":
+            rout_obj = event.get("routingStatus") if isinstance(event.get("routingStatus"), dict) else event
+            row_updates = {"routing_status": rout_obj.get("status", "OFF_QUEUE")}
+            activity_date = rout_obj.get("startTime")
+        else:
+            return
+        if activity_date:
+            row_updates["activity_date"] = activity_date
+        now = time.time()
+        with self._lock:
+            touched = False
+            for q_users in self.routing_activity_cache.values():
+                row = q_users.get(user_id)
+                if row is None:
+                    continue
+                new_row = dict(row)
+                new_row.update(row_updates)
+                q_users[user_id] = new_row
+                touched = True
+            self.last_event_apply_time = now
+            if touched:
+                self.last_update_time = now
+            elif user_id in self._monitored_member_ids:
+                # A monitored-queue member without a routing row: let the next tick sweep REST.
+                self._routing_resweep = True
+
     def _log_error(self, message):
         with self._lock:
             self.error_log.append(message)
@@ -202,12 +291,15 @@ class DataManager:
                     for k in keys_to_remove:
                         self.routing_activity_cache.pop(k, None)
 
-            # Trim queue_members_cache to max size
+            # Trim queue_members_cache - remove queues neither monitored nor used for agent details
+            member_q_ids = set(self.queues_map.values()) | set(self.agent_queues_map.values())
+            for k in [k for k in self.queue_members_cache.keys() if k not in member_q_ids]:
+                self._forget_queue_members(k)
             if len(self.queue_members_cache) > self.MAX_QUEUE_MEMBERS_CACHE:
                 # Keep only the most recently used
                 keys_to_remove = list(self.queue_members_cache.keys())[:-self.MAX_QUEUE_MEMBERS_CACHE]
                 for k in keys_to_remove:
-                    self.queue_members_cache.pop(k, None)
+                    self._forget_queue_members(k)
 
             # Trim agent_details_cache - remove entries for queues no longer monitored
             if self.agent_details_cache:
@@ -234,8 +326,27 @@ class DataManager:
             agent_id_map = {v: k for k, v in self.agent_queues_map.items()}
             current_time = time.time()
             last_daily_refresh = self.last_daily_refresh
-            last_member_refresh = self.last_member_refresh
-            member_cache_snapshot = self.queue_members_cache.copy()
+
+        # Membership sync runs beside the loop so a slow or throttled queue never stalls live tiles.
+        # Members of monitored queues tell routing events which users may still lack a row.
+        member_q_ids = list(dict.fromkeys(q_ids + agent_q_ids))
+        if member_q_ids:
+            self._schedule_member_sync(member_q_ids, current_time)
+
+        with self._lock:
+            routing_user_ids = set()
+            for q_name in monitored_queue_names:
+                routing_user_ids.update((self.routing_activity_cache.get(q_name) or {}).keys())
+            routing_seeded = all(q_name in self.routing_activity_cache for q_name in monitored_queue_names)
+            members_known = all(q_id in self.queue_members_cache for q_id in q_ids)
+            member_user_ids = {
+                m['id'] for q_id in q_ids for m in (self.queue_members_cache.get(q_id) or []) if m.get('id')
+            }
+            self._monitored_member_ids = member_user_ids
+            resweep_requested = self._routing_resweep
+            self._routing_resweep = False
+            reconcile_due = (current_time - self.last_reconcile_time) >= self.EVENT_RECONCILE_INTERVAL
+        rest_swept = False
 
         # 1. Observations (Live Metrics) - direct overwrite, no fallback retention
         if q_ids:
@@ -262,12 +373,19 @@ class DataManager:
             with self._lock:
                 self.obs_data_cache = {}
 
-        # Small delay between API calls to reduce rate limit pressure
-        if q_ids:
-            time.sleep(0.5)
-
-        # 1.5 Routing activity - direct overwrite, no grace/fallback retention
-        if q_ids:
+        # 1.5 Routing activity - direct overwrite, no grace/fallback retention.
+        # While websocket deltas cover every listed user and every queue member, only reconcile
+        # periodically; a member set change or an event for a member without a row sweeps now.
+        routing_from_events = (
+            bool(q_ids)
+            and routing_seeded
+            and members_known
+            and not resweep_requested
+            and not reconcile_due
+            and self._events_cover(routing_user_ids | member_user_ids)
+        )
+        if q_ids and not routing_from_events:
+            rest_swept = True
             try:
                 routing_response = self.api.get_routing_activity(q_ids)
                 routing_results = routing_response.get("results") if isinstance(routing_response, dict) else []
@@ -315,14 +433,10 @@ class DataManager:
                     for q_name in monitored_queue_names:
                         merged[q_name] = {}
                     self.routing_activity_cache = merged
-        else:
+        elif not q_ids:
             with self._lock:
                 self.routing_activity_cache = {}
 
-        # Small delay before daily stats to spread API load
-        if q_ids:
-            time.sleep(0.5)
-
         # 2. Daily Stats
         # Keep daily metrics in sync with live refresh cadence (minimum 10s).
         try:
@@ -356,30 +470,6 @@ class DataManager:
                 self.daily_data_cache = {}
 
         # 3. Agent Details
-        # Refresh membership every 30 mins
-        missing_some = any(q_id not in member_cache_snapshot for q_id in agent_q_ids)
-        refresh_threshold = 60 if missing_some else 3600
-
-        if (current_time - last_member_refresh > refresh_threshold) and agent_q_ids:
-            new_cache = member_cache_snapshot.copy()
-            for q_id in agent_q_ids:
-                try:
-                    mems = self.api.get_queue_members(q_id)
-                    processed = []
-                    for m in mems:
-                        u = m.get('user', {})
-                        u_id = u.get('id') or m.get('id')
-                        u_name = u.get('name') or m.get('name', 'Unknown')
-                        if u_id:
-                            processed.append({'id': u_id, 'name': u_name})
-                    new_cache[q_id] = processed
-                except Exception as e:
-                    self._log_error(f"Error fetching members for {q_id}: {str(e)}")
-                    self._log_error(f"Error fetching members for {q_id}: {e}")
-            with self._lock:
-                self.queue_members_cache = new_cache
-                self.last_member_refresh = current_time
-
         with self._lock:
             queue_members_snapshot = {q_id: list(self.queue_members_cache.get(q_id, [])) for q_id in agent_q_ids}
 
@@ -392,7 +482,7 @@ class DataManager:
         status_map = {}
         if agent_q_ids and unique_user_ids:
             try:
-                status_data = self.api.get_users_status_scan(target_user_ids=unique_user_ids)
+                status_data = self.api.get_users_status_bulk(unique_user_ids)
                 pres_map = status_data.get('presence', {})
                 rout_map = status_data.get('routing', {})
 
@@ -435,8 +525,99 @@ class DataManager:
                 self.agent_details_cache = temp_cache
             elif not agent_q_ids:
                 self.agent_details_cache = {}
+            if rest_swept:
+                self.last_reconcile_time = current_time
             self.last_update_time = time.time()
 
+    def _forget_queue_members(self, q_id):
+        # Caller holds self._lock.
+        self.queue_members_cache.pop(q_id, None)
+        self.queue_member_signatures.pop(q_id, None)
+        self.queue_member_refresh_ts.pop(q_id, None)
+        self._member_retry_at.pop(q_id, None)
+
+    def _schedule_member_sync(self, member_q_ids, current_time):
+        """Start a membership sync for due queues unless one is already running."""
+        with self._lock:
+            if self._member_sync_thread is not None and self._member_sync_thread.is_alive():
+                return
+            missing, stale = [], []
+            for q_id in member_q_ids:
+                if current_time < self._member_retry_at.get(q_id, 0):
+                    continue
+                last_refresh = self.queue_member_refresh_ts.get(q_id, 0)
+                if q_id not in self.queue_members_cache:
+                    if current_time - last_refresh >= self.MEMBER_MISSING_RETRY_INTERVAL:
+                        missing.append(q_id)
+                elif current_time - last_refresh >= self.MEMBER_REFRESH_INTERVAL:
+                    stale.append(q_id)
+            if not missing and not stale:
+                return
+            thread = threading.Thread(target=self._sync_queue_members, args=(missing, stale), daemon=True)
+            self._member_sync_thread = thread
+        thread.start()
+        if missing:
+            # First-time queues: give the sync a short head start so tiles are not empty.
+            thread.join(timeout=self.MEMBER_SYNC_INITIAL_WAIT_SECONDS)
+
+    def _sync_queue_members(self, missing, stale):
+        """Fetch members of missing queues and of stale queues whose signature changed."""
+        api = self.api
+        if api is None:
+            return
+        try:
+            signatures = api.get_queue_member_signatures(list(missing) + list(stale))
+        except Exception as e:
+            self._log_error(f"Queue signature check error: {e}")
+            signatures = {}
+
+        to_fetch = list(missing)
+        now = time.time()
+        with self._lock:
+            for q_id in stale:
+                sig = signatures.get(q_id)
+                if sig is not None and sig == self.queue_member_signatures.get(q_id):
+                    # Unchanged since the last fetch; keep cached members.
+                    self.queue_member_refresh_ts[q_id] = now
+                else:
+                    to_fetch.append(q_id)
+
+        def _fetch(q_id):
+            try:
+                mems = api.get_queue_members(q_id, retry_429=False, raise_errors=True)
+            except Exception as e:
+                failed_at = time.time()
+                with self._lock:
+                    self.queue_member_refresh_ts[q_id] = failed_at
+                    if api._is_http_429(e):
+                        self._member_retry_at[q_id] = failed_at + api.QUEUE_MEMBER_429_RETRY_SECONDS
+                self._log_error(f"Error fetching members for {q_id}: {e}")
+                return
+            processed = []
+            for m in mems:
+                u = m.get('user', {})
+                u_id = u.get('id') or m.get('id')
+                u_name = u.get('name') or m.get('name', 'Unknown')
+                if u_id:
+                    processed.append({'id': u_id, 'name': u_name})
+            fetched_at = time.time()
+            with self._lock:
+                previous = self.queue_members_cache.get(q_id)
+                if previous is not None and {m['id'] for m in previous} != {m['id'] for m in processed}:
+                    self._routing_resweep = True
+                self.queue_members_cache[q_id] = processed
+                self.queue_member_refresh_ts[q_id] = fetched_at
+                self._member_retry_at.pop(q_id, None)
+                if q_id in signatures:
+                    self.queue_member_signatures[q_id] = signatures[q_id]
+                self.last_member_refresh = fetched_at
+
+        if not to_fetch:
+            return
+        workers = max(1, min(int(self.MEMBER_SYNC_MAX_WORKERS), len(to_fetch)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="queue-members") as executor:
+            list(executor.map(_fetch, to_fetch))
+
     def get_data(self, requested_queues):
         with self._lock:
             obs = {q: self.obs_data_cache.get(q) for q in requested_queues if q in self.obs_data_cache}
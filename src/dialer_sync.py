@@ -0,0 +1,841 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.monitor import monitor
+from src.org_state import _env_int, OrgRegistry
+
+
+class ContactListPhoneIndex:
+    """
+    In-memory phone number index of one outbound contact list.
+
+    The list is loaded once into ``(phone column, value) -> contact`` so result-code
+    sync can match conversations without a contact search per phone candidate. It is
+    built from one contact-list export (a few calls regardless of list size); paging
+    is the fallback when the export fails and stops at MAX_CONTACTS. Between builds,
+    misses fall back to one targeted search whose hits are merged into the index, so
+    contacts added later are picked up incrementally; confirmed misses are remembered
+    for MISS_TTL_SECONDS. The index is rebuilt after MAX_AGE_SECONDS or when the
+    list's column layout changes.
+    """
+
+    PAGE_SIZE = 100
+    MAX_AGE_SECONDS = _env_int("GENESYS_DIALER_INDEX_MAX_AGE_SECONDS", 1800, minimum=60)
+    MAX_CONTACTS = _env_int("GENESYS_DIALER_INDEX_MAX_CONTACTS", 100000, minimum=1000)
+    MISS_TTL_SECONDS = 300
+
+    def __init__(self, contact_list_id):
+        self.contact_list_id = str(contact_list_id or "").strip()
+        self._lock = threading.Lock()
+        self._by_phone = {}
+        self._contacts = {}
+        self._misses = {}
+        self._columns_sig = None
+        self.built_at = 0.0
+        self.complete = False
+        self.api_calls = 0
+
+    def __len__(self):
+        return len(self._contacts)
+
+    @staticmethod
+    def _columns_signature(detail, phone_columns):
+        columns = list((detail or {}).get("columnNames") or []) if isinstance(detail, dict) else []
+        return (tuple(sorted(str(c) for c in columns)), tuple(phone_columns or []))
+
+    def is_stale(self, detail, phone_columns):
+        if not self.built_at:
+            return True
+        if (time.time() - self.built_at) > self.MAX_AGE_SECONDS:
+            return True
+        return self._columns_signature(detail, phone_columns) != self._columns_sig
+
+    def _add_entity_locked(self, entity, phone_columns):
+        cid = str((entity or {}).get("id") or "").strip()
+        data = (entity or {}).get("data")
+        if not cid or not isinstance(data, dict):
+            return
+        self._contacts[cid] = data
+        for col in phone_columns:
+            value = str(data.get(col) or "").strip()
+            if value:
+                # Keep the first contact seen for a number, like the search did.
+                self._by_phone.setdefault((col, value), cid)
+
+    def _build_from_export(self, api, detail, phone_columns, staging):
+        columns = list((detail or {}).get("columnNames") or []) if isinstance(detail, dict) else []
+        try:
+            # Previous-export check, export start, ready poll and download; extra polls are not counted.
+            with self._lock:
+                self.api_calls += 4
+            for entity in api.iter_outbound_contact_list_export(self.contact_list_id, columns=columns or None):
+                staging._add_entity_locked(entity, phone_columns)
+            return True
+        except Exception as e:
+            monitor.log_error("DIALER_SYNC", f"Contact list {self.contact_list_id} export failed, paging instead: {e}")
+            staging._by_phone = {}
+            staging._contacts = {}
+            return False
+
+    def build(self, api, detail, phone_columns):
+        """Load the full contact list into a fresh index."""
+        phone_columns = [c for c in (phone_columns or []) if c]
+        staging = ContactListPhoneIndex(self.contact_list_id)
+        complete = self._build_from_export(api, detail, phone_columns, staging)
+        page_number = 1
+        while not complete and len(staging._contacts) < self.MAX_CONTACTS:
+            try:
+                payload = api.get_outbound_contact_list_contacts(
+                    self.contact_list_id, page_number=page_number, page_size=self.PAGE_SIZE,
+                )
+                with self._lock:
+                    self.api_calls += 1
+            except Exception as e:
+                monitor.log_error("DIALER_SYNC", f"Contact list {self.contact_list_id} page {page_number} failed: {e}")
+                break
+            page_entities = payload.get("entities") if isinstance(payload, dict) else None
+            if not isinstance(page_entities, list) or not page_entities:
+                complete = True
+                break
+            for entity in page_entities:
+                if isinstance(entity, dict):
+                    staging._add_entity_locked(entity, phone_columns)
+            page_count = payload.get("pageCount")
+            if len(page_entities) < self.PAGE_SIZE or (page_count and page_number >= int(page_count)):
+                complete = True
+                break
+            page_number += 1
+        with self._lock:
+            self._by_phone = staging._by_phone
+            self._contacts = staging._contacts
+            self._misses = {}
+            self._columns_sig = self._columns_signature(detail, phone_columns)
+            self.built_at = time.time()
+            self.complete = complete
+        return len(self._contacts)
+
+    def lookup(self, phone_columns, phone_candidates):
+        """Return ``(contact_id, data)`` of the first indexed match, or None."""
+        with self._lock:
+            for col in phone_columns or []:
+                for candidate in phone_candidates or []:
+                    cid = self._by_phone.get((col, candidate))
+                    if cid:
+                        return cid, self._contacts.get(cid) or {}
+        return None
+
+    def search(self, api, phone_columns, phone_candidates):
+        """Targeted contact search for numbers added after the index was built."""
+        miss_key = (tuple(phone_columns or []), tuple(phone_candidates or []))
+        now = time.time()
+        with self._lock:
+            if self.complete and (now - self.built_at) < self.MISS_TTL_SECONDS:
+                return None
+            if self._misses.get(miss_key, 0) > now:
+                return None
+        for col in phone_columns or []:
+            for candidate in phone_candidates or []:
+                try:
+                    search_res = api.search_outbound_contact_list_contacts(
+                        self.contact_list_id, column=col, value=candidate, page_number=1, page_size=5,
+                    )
+                    with self._lock:
+                        self.api_calls += 1
+                except Exception:
+                    continue
+                entities = search_res.get("entities") if isinstance(search_res, dict) else []
+                entities = [x for x in entities or [] if isinstance(x, dict) and x.get("id")]
+                if entities:
+                    with self._lock:
+                        for entity in entities:
+                            self._add_entity_locked(entity, phone_columns)
+                    cid = str(entities[0].get("id") or "").strip()
+                    return cid, self._contacts.get(cid) or dict(entities[0].get("data") or {})
+        with self._lock:
+            self._misses[miss_key] = now + self.MISS_TTL_SECONDS
+        return None
+
+    def update_data(self, contact_id, data):
+        with self._lock:
+            if contact_id in self._contacts and isinstance(data, dict):
+                self._contacts[contact_id] = data
+
+
+class DialerSyncStore:
+    """
+    Per-org SQLite state of the result-code sync: the processed conversation keys
+    and small named values such as the conversation-end high-water mark.
+    """
+
+    FILENAME = "dialer_sync.sqlite"
+    RETENTION_DAYS = _env_int("GENESYS_DIALER_SYNC_RETENTION_DAYS", 30, minimum=1)
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS processed_conversations ("
+                " dedupe_key TEXT PRIMARY KEY,"
+                " processed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_processed_conversations_at ON processed_conversations(processed_at)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value TEXT)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def __contains__(self, dedupe_key):
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT 1 FROM processed_conversations WHERE dedupe_key = ?", (str(dedupe_key),)
+                ).fetchone()
+            return row is not None
+        except Exception as e:
+            monitor.log_error("DIALER_SYNC", f"Processed-set read failed: {e}")
+            return False
+
+    def __setitem__(self, dedupe_key, _stamp):
+        # Same shape as the old session dict: processed[key] = iso timestamp.
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO processed_conversations (dedupe_key, processed_at) VALUES (?, ?)",
+                    (str(dedupe_key), time.time()),
+                )
+                conn.commit()
+        except Exception as e:
+            monitor.log_error("DIALER_SYNC", f"Processed-set write failed: {e}")
+
+    def get_state(self, name, default=None):
+        try:
+            with self._lock:
+                row = self._connect().execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+            return json.loads(row[0]) if row else default
+        except Exception:
+            return default
+
+    def set_state(self, name, value):
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)",
+                    (name, json.dumps(value, default=str)),
+                )
+                conn.commit()
+        except Exception as e:
+            monitor.log_error("DIALER_SYNC", f"Sync state write failed ({name}): {e}")
+
+    def prune(self):
+        cutoff = time.time() - (self.RETENTION_DAYS * 86400)
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM processed_conversations WHERE processed_at < ?", (cutoff,))
+                conn.commit()
+        except Exception as e:
+            monitor.log_error("DIALER_SYNC", f"Processed-set prune failed: {e}")
+
+
+class DialerResultSyncWorker:
+    """
+    Background thread that writes wrap-up codes of finished outbound conversations
+    into their contact lists, independent of any browser session.
+
+    Conversations are read forward from a persisted high-water mark on conversation
+    end time; together with the durable processed-set in DialerSyncStore every
+    conversation is handled once across sessions and restarts. The mark only moves
+    as far as the fetch provably covered, and is held below the oldest conversation
+    whose contact was not found or whose write failed, so it is retried next run
+    until it is older than RETRY_SECONDS.
+    """
+
+    INTERVAL_SECONDS = _env_int("GENESYS_DIALER_SYNC_INTERVAL_SECONDS", 120, minimum=30)
+    INITIAL_LOOKBACK_MINUTES = 30
+    # Conversations need a moment after they end before wrap-up data is queryable.
+    SETTLE_SECONDS = 60
+    # Longest conversation we expect; bounds how far before the mark we query by start time.
+    MAX_CONVERSATION_SECONDS = 4 * 3600
+    PAGE_SIZE = 100
+    MAX_PAGES = 10
+    # Start-time windows of PAGE_SIZE * MAX_PAGES conversations fetched per run at most.
+    MAX_FETCHES = _env_int("GENESYS_DIALER_SYNC_MAX_FETCHES", 10, minimum=1)
+    RETRY_SECONDS = _env_int("GENESYS_DIALER_SYNC_RETRY_SECONDS", 3600, minimum=0)
+    CAMPAIGN_REFRESH_SECONDS = 600
+    OUTBOUND_SEGMENT_FILTERS = [
+        {
+            "type": "and",
+            "predicates": [
+                {"type": "dimension", "dimension": "direction", "operator": "matches", "value": "outbound"},
+            ],
+        }
+    ]
+
+    def __init__(self, org_code, store):
+        self.org_code = org_code
+        self.store = store
+        self._api = None
+        self._api_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._campaigns = []
+        self._campaigns_ts = 0
+        self.last_run_ts = 0
+        self.last_stats = {}
+        self.last_error = None
+
+    @property
+    def result_column(self):
+        return str(self.store.get_state("result_column") or "resultCode")
+
+    def set_result_column(self, result_column):
+        result_column = str(result_column or "").strip()
+        if result_column and result_column != self.result_column:
+            self.store.set_state("result_column", result_column)
+
+    def set_api(self, api):
+        with self._api_lock:
+            self._api = api
+
+    def _get_api(self):
+        with self._api_lock:
+            return self._api
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"DialerResultSync-{self.org_code}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if self.store.get_state("enabled", False):
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.last_error = str(e)
+                    monitor.log_error("DIALER_SYNC", f"Dialer result sync failed ({self.org_code}): {e}")
+            self._stop_event.wait(self.INTERVAL_SECONDS)
+
+    def _get_campaigns(self, api):
+        if (time.time() - self._campaigns_ts) > self.CAMPAIGN_REFRESH_SECONDS or not self._campaigns:
+            try:
+                self._campaigns = api.get_outbound_campaigns(page_size=100, max_pages=20) or []
+                self._campaigns_ts = time.time()
+            except Exception as e:
+                monitor.log_error("DIALER_SYNC", f"Campaign list refresh failed ({self.org_code}): {e}")
+        return self._campaigns
+
+    def run_once(self, lookback_minutes=None):
+        """
+        Sync conversations that ended after the high-water mark.
+
+        ``lookback_minutes`` additionally re-scans that much of the recent past (manual
+        runs); already processed conversations are skipped by the processed-set.
+        """
+        api = self._get_api()
+        if api is None:
+            return {}
+        with self._run_lock:
+            now_utc = datetime.now(timezone.utc)
+            window_end = now_utc - timedelta(seconds=self.SETTLE_SECONDS)
+            high_water_ms = self.store.get_state("high_water_ms")
+            if high_water_ms:
+                window_start = datetime.fromtimestamp(int(high_water_ms) / 1000.0, tz=timezone.utc)
+            else:
+                window_start = now_utc - timedelta(minutes=self.INITIAL_LOOKBACK_MINUTES)
+            if lookback_minutes:
+                window_start = min(window_start, now_utc - timedelta(minutes=max(1, int(lookback_minutes))))
+            if window_start >= window_end:
+                return self.last_stats
+
+            # Fetch ascending by start; when a fetch hits the page cap, continue from its
+            # last start. Everything that started before scan_start has been fetched.
+            scan_start = window_start - timedelta(seconds=self.MAX_CONVERSATION_SECONDS)
+            fetch_cap = self.PAGE_SIZE * self.MAX_PAGES
+            fetched = {}
+            covered = False
+            try:
+                for _ in range(self.MAX_FETCHES):
+                    batch = api.get_conversation_details_recent(
+                        scan_start,
+                        window_end,
+                        page_size=self.PAGE_SIZE,
+                        max_pages=self.MAX_PAGES,
+                        order="asc",
+                        segment_filters=self.OUTBOUND_SEGMENT_FILTERS,
+                        raise_errors=True,
+                    ) or []
+                    for conv in batch:
+                        if isinstance(conv, dict):
+                            fetched[str(conv.get("conversationId") or id(conv))] = conv
+                    if len(batch) < fetch_cap:
+                        covered = True
+                        break
+                    last_start = _parse_utc((batch[-1] or {}).get("conversationStart"))
+                    if last_start is None or last_start <= scan_start:
+                        break
+                    scan_start = last_start
+            except Exception as e:
+                # A partial fetch proves nothing; keep the mark where it is.
+                self.last_error = str(e)
+                monitor.log_error("DIALER_SYNC", f"Conversation fetch failed ({self.org_code}): {e}")
+                return self.last_stats
+            # A conversation that ended before scan_start also started before it.
+            reached = window_end if covered else max(window_start, min(window_end, scan_start))
+            if not covered and reached <= window_start:
+                monitor.log_error(
+                    "DIALER_SYNC",
+                    f"Fetch budget exhausted before the high-water mark ({self.org_code}); "
+                    "raise GENESYS_DIALER_SYNC_MAX_FETCHES.",
+                )
+
+            ended = []
+            for conv in fetched.values():
+                end_dt = _parse_utc(conv.get("conversationEnd"))
+                if end_dt is None or end_dt <= window_start or end_dt > reached:
+                    continue
+                ended.append((end_dt, conv))
+            # Newest first, like the session-driven sync.
+            ended.sort(key=lambda item: item[0], reverse=True)
+
+            stats = _sync_conversation_result_codes(
+                api,
+                conversations=[conv for _end, conv in ended],
+                campaigns=self._get_campaigns(api),
+                result_column=self.result_column,
+                processed=self.store,
+            )
+
+            # Conversations with a wrap-up code that did not reach the processed-set were
+            # not matched or not written; keep them inside the next window.
+            retry_cutoff = now_utc - timedelta(seconds=self.RETRY_SECONDS)
+            pending_ends = []
+            for end_dt, conv in ended:
+                code = _extract_wrapup_code_from_conversation(conv)
+                conv_id = str(conv.get("conversationId") or conv.get("id") or "").strip()
+                if code and end_dt > retry_cutoff and f"{conv_id}:{code}" not in self.store:
+                    pending_ends.append(end_dt)
+            if pending_ends:
+                reached = min(reached, min(pending_ends) - timedelta(milliseconds=1))
+            stats["retry_pending"] = len(pending_ends)
+
+            reached_ms = int(reached.timestamp() * 1000)
+            if not high_water_ms or reached_ms > int(high_water_ms):
+                self.store.set_state("high_water_ms", reached_ms)
+            self.store.prune()
+            self.last_run_ts = time.time()
+            self.last_stats = stats
+            self.last_error = None
+            return stats
+
+    def status(self):
+        high_water_ms = self.store.get_state("high_water_ms")
+        return {
+            "org_code": self.org_code,
+            "running": self.is_running(),
+            "enabled": bool(self.store.get_state("enabled", False)),
+            "high_water_ms": high_water_ms,
+            "last_run_ts": self.last_run_ts,
+            "last_stats": dict(self.last_stats or {}),
+            "last_error": self.last_error,
+        }
+
+
+def _parse_utc(value):
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+# Conversation -> contact matching and result-code writes, shared by the worker and the Dialer page.
+
+_UUID_RE = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[1-5][0-9a-fA-F]{3}-[89abAB][0-9a-fA-F]{3}-[0-9a-fA-F]{12}$"
+)
+
+
+def _looks_like_uuid(value):
+    text = str(value or "").strip()
+    return bool(_UUID_RE.match(text))
+
+
+def _find_best_target_column(columns, aliases):
+    lowered = {str(c).strip().lower(): str(c) for c in (columns or []) if str(c).strip()}
+    for alias in aliases:
+        hit = lowered.get(alias.lower())
+        if hit:
+            return hit
+    for col in columns or []:
+        col_text = str(col).strip().lower()
+        for alias in aliases:
+            if alias.lower() in col_text:
+                return str(col)
+    return ""
+
+
+def _extract_phone_columns(detail):
+    out = []
+    value = (detail or {}).get("phoneColumns")
+    if isinstance(value, list):
+        for item in value:
+            if isinstance(item, str):
+                col = item.strip()
+            elif isinstance(item, dict):
+                col = str(item.get("columnName") or "").strip()
+            else:
+                col = ""
+            if col and col not in out:
+                out.append(col)
+    return out
+
+
+def _extract_wrapup_code_from_conversation(conv):
+    participants = conv.get("participants") or []
+    latest = ""
+    for participant in participants:
+        wrapup_obj = participant.get("wrapup")
+        if isinstance(wrapup_obj, dict):
+            code = str(wrapup_obj.get("code") or "").strip()
+            if code:
+                latest = code
+        for session in participant.get("sessions") or []:
+            for segment in session.get("segments") or []:
+                code = str(segment.get("wrapUpCode") or segment.get("wrapupCode") or "").strip()
+                if code:
+                    latest = code
+    return latest
+
+
+def _extract_phone_from_conversation(conv):
+    participants = conv.get("participants") or []
+    preferred = []
+    fallback = []
+    for participant in participants:
+        purpose = str(participant.get("purpose") or "").lower()
+        values = [
+            participant.get("address"),
+            participant.get("ani"),
+            participant.get("dnis"),
+        ]
+        for session in participant.get("sessions") or []:
+            for segment in session.get("segments") or []:
+                values.extend([segment.get("ani"), segment.get("dnis"), segment.get("address")])
+        for raw in values:
+            text = str(raw or "").strip()
+            if not text:
+                continue
+            if purpose in {"customer", "external"}:
+                preferred.append(text)
+            else:
+                fallback.append(text)
+    if preferred:
+        return preferred[0]
+    if fallback:
+        return fallback[0]
+    return ""
+
+
+def _phone_match_candidates(phone):
+    raw = str(phone or "").strip()
+    if not raw:
+        return []
+    digits = "".join(ch for ch in raw if ch.isdigit())
+    out = []
+    for item in [raw, digits, f"+{digits}", f"0{digits}"]:
+        text = str(item or "").strip()
+        if text and text not in out:
+            out.append(text)
+    return out
+
+
+def _extract_id_from_attributes(attrs, key_hint):
+    if not isinstance(attrs, dict):
+        return ""
+    hint = str(key_hint or "").lower()
+    for key, value in attrs.items():
+        key_text = str(key or "").lower()
+        if hint in key_text and _looks_like_uuid(value):
+            return str(value).strip()
+    return ""
+
+
+def _resolve_contact_list_id_from_conversation(conv, campaign_contact_map):
+    direct = ""
+    campaign_id = ""
+
+    conv_attrs = conv.get("attributes") if isinstance(conv.get("attributes"), dict) else {}
+    direct = _extract_id_from_attributes(conv_attrs, "contactlist")
+    campaign_id = _extract_id_from_attributes(conv_attrs, "campaign")
+
+    for participant in conv.get("participants") or []:
+        attrs = participant.get("attributes") if isinstance(participant.get("attributes"), dict) else {}
+        if not direct:
+            direct = _extract_id_from_attributes(attrs, "contactlist")
+        if not campaign_id:
+            campaign_id = _extract_id_from_attributes(attrs, "campaign")
+        if direct and campaign_id:
+            break
+
+    if campaign_id and campaign_id in campaign_contact_map:
+        return str(campaign_contact_map.get(campaign_id) or "").strip()
+    return str(direct or "").strip()
+
+
+def _ensure_contact_list_result_column(api, contact_list_detail, result_column):
+    result_column = str(result_column or "").strip()
+    if not result_column:
+        return contact_list_detail or {}
+
+    detail = contact_list_detail if isinstance(contact_list_detail, dict) else {}
+    columns = list(detail.get("columnNames") or [])
+    if result_column in columns:
+        return detail
+
+    version = detail.get("version")
+    if version is None:
+        return detail
+
+    updated_columns = list(columns)
+    updated_columns.append(result_column)
+    payload = {
+        "id": str(detail.get("id") or ""),
+        "name": str(detail.get("name") or ""),
+        "columnNames": updated_columns,
+        "phoneColumns": list(detail.get("phoneColumns") or []),
+        "version": version,
+    }
+    api.update_outbound_contact_list(payload.get("id"), payload)
+    return api.get_outbound_contact_list(payload.get("id"))
+
+
+def _write_result_codes_bulk(api, contact_list_id, list_writes, result_column, stats, processed):
+    """Merge result codes into fresh contact data and write them back in bulk batches."""
+    contact_ids = list(list_writes.keys())
+    current_data = {}
+    try:
+        for entity in api.get_outbound_contact_list_contacts_bulk(contact_list_id, contact_ids):
+            cid = str(entity.get("id") or "").strip()
+            if cid and isinstance(entity.get("data"), dict):
+                current_data[cid] = dict(entity.get("data"))
+    except Exception:
+        current_data = {}
+
+    index = get_contact_list_index(api.org_code, contact_list_id)
+    updated_at = datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+    bulk_rows = []
+    single_ids = []
+    for cid in contact_ids:
+        item = list_writes[cid]
+        if cid not in current_data:
+            # Without the current data a bulk write would drop other columns.
+            single_ids.append(cid)
+            continue
+        merged = current_data[cid]
+        merged[result_column] = item["wrapup_code"]
+        merged["resultConversationId"] = item["conv_id"]
+        merged["resultUpdatedAt"] = updated_at
+        bulk_rows.append({"id": cid, "data": merged})
+
+    if bulk_rows:
+        try:
+            api.update_outbound_contact_list_contacts_bulk(contact_list_id, bulk_rows)
+            for row in bulk_rows:
+                index.update_data(row["id"], row["data"])
+                _mark_result_written(list_writes[row["id"]], stats, processed)
+        except Exception:
+            single_ids.extend(row["id"] for row in bulk_rows)
+
+    for cid in single_ids:
+        item = list_writes[cid]
+        try:
+            api.write_result_code_to_contact_data(
+                contact_list_id,
+                cid,
+                result_column=result_column,
+                result_code=item["wrapup_code"],
+                extra_fields={
+                    "resultConversationId": item["conv_id"],
+                    "resultUpdatedAt": updated_at,
+                },
+            )
+            _mark_result_written(item, stats, processed)
+        except Exception:
+            stats["errors"] += 1
+
+
+def _mark_result_written(item, stats, processed):
+    stats["updated"] += 1
+    stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    for dedupe_key in item.get("dedupe_keys") or []:
+        processed[dedupe_key] = stamp
+
+
+def _sync_conversation_result_codes(api, conversations, campaigns, result_column, processed):
+    """Write wrap-up codes of the given conversations to their contacts.
+
+    ``processed`` is the dedupe set (``key in processed`` / ``processed[key] = ts``);
+    the background worker passes its durable DialerSyncStore.
+    """
+    stats = {
+        "scanned": 0,
+        "updated": 0,
+        "skipped_no_wrapup": 0,
+        "skipped_no_contactlist": 0,
+        "skipped_no_phone": 0,
+        "not_found": 0,
+        "errors": 0,
+    }
+
+    campaign_contact_map = {}
+    for item in campaigns or []:
+        if not isinstance(item, dict):
+            continue
+        cid = str(item.get("id") or "").strip()
+        clid = str((item.get("contactList") or {}).get("id") or item.get("contactListId") or "").strip()
+        if cid and clid:
+            campaign_contact_map[cid] = clid
+
+    cl_cache = {}
+    # contact list id -> contact id -> pending result write
+    pending_writes = {}
+    for conv in conversations or []:
+        if not isinstance(conv, dict):
+            continue
+        stats["scanned"] += 1
+
+        conv_id = str(conv.get("conversationId") or conv.get("id") or "").strip()
+        wrapup_code = _extract_wrapup_code_from_conversation(conv)
+        if not wrapup_code:
+            stats["skipped_no_wrapup"] += 1
+            continue
+
+        dedupe_key = f"{conv_id}:{wrapup_code}"
+        if dedupe_key in processed:
+            continue
+
+        contact_list_id = _resolve_contact_list_id_from_conversation(conv, campaign_contact_map)
+        if not contact_list_id:
+            stats["skipped_no_contactlist"] += 1
+            processed[dedupe_key] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            continue
+
+        phone = _extract_phone_from_conversation(conv)
+        phone_candidates = _phone_match_candidates(phone)
+        if not phone_candidates:
+            stats["skipped_no_phone"] += 1
+            processed[dedupe_key] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            continue
+
+        detail = cl_cache.get(contact_list_id)
+        if not detail:
+            try:
+                detail = api.get_outbound_contact_list(contact_list_id)
+            except Exception:
+                detail = {}
+            if isinstance(detail, dict):
+                detail = _ensure_contact_list_result_column(api, detail, result_column)
+            cl_cache[contact_list_id] = detail if isinstance(detail, dict) else {}
+
+        phone_columns = _extract_phone_columns(detail if isinstance(detail, dict) else {})
+        if not phone_columns:
+            col_names = list((detail or {}).get("columnNames") or []) if isinstance(detail, dict) else []
+            inferred = _find_best_target_column(col_names, ["phone", "telefon", "gsm", "mobile", "tel", "cell"])
+            phone_columns = [inferred] if inferred else []
+        phone_columns = [col for col in phone_columns if col]
+
+        index = get_contact_list_index(api.org_code, contact_list_id)
+        if phone_columns and index.is_stale(detail, phone_columns):
+            index.build(api, detail, phone_columns)
+        match = index.lookup(phone_columns, phone_candidates) or index.search(api, phone_columns, phone_candidates)
+        if not match:
+            stats["not_found"] += 1
+            continue
+
+        match_contact_id, _data = match
+        list_writes = pending_writes.setdefault(contact_list_id, {})
+        if match_contact_id in list_writes:
+            # Conversations arrive newest first; an older result for the same contact is superseded.
+            list_writes[match_contact_id]["dedupe_keys"].append(dedupe_key)
+            continue
+        list_writes[match_contact_id] = {
+            "wrapup_code": wrapup_code,
+            "conv_id": conv_id,
+            "dedupe_keys": [dedupe_key],
+        }
+
+    for contact_list_id, list_writes in pending_writes.items():
+        _write_result_codes_bulk(api, contact_list_id, list_writes, result_column, stats, processed)
+
+    return stats
+
+
+_indexes = {}
+_registry_lock = threading.Lock()
+_workers = {}
+
+# Process-wide dialer sync store of an org, or None if it has no state dir.
+get_dialer_sync_store = OrgRegistry(DialerSyncStore.FILENAME, DialerSyncStore)
+
+
+def get_contact_list_index(org_code, contact_list_id):
+    """Return the process-wide phone index of a contact list (built lazily)."""
+    key = (str(org_code or ""), str(contact_list_id or "").strip())
+    with _registry_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ContactListPhoneIndex(contact_list_id)
+            _indexes[key] = index
+        return index
+
+
+def ensure_dialer_sync_worker(api):
+    """Start (or refresh the credentials of) the background result-code sync of the api's org."""
+    org_code = getattr(api, "org_code", None)
+    store = get_dialer_sync_store(org_code)
+    if store is None:
+        return None
+    with _registry_lock:
+        worker = _workers.get(org_code)
+        if worker is None:
+            worker = DialerResultSyncWorker(org_code, store)
+            _workers[org_code] = worker
+    worker.set_api(api)
+    worker.start()
+    return worker
+
+
+def get_dialer_sync_worker(org_code):
+    with _registry_lock:
+        return _workers.get(org_code)
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.org_state import _env_int, OrgRegistry
+
+
+def frame_fingerprint(df):
+    """Full-content fingerprint of a DataFrame: column names, dtypes and every row hash."""
+    if df is None or not isinstance(df, pd.DataFrame):
+        return "none"
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode("utf-8"))
+    digest.update(str(len(df)).encode("utf-8"))
+    for idx in range(df.shape[1]):
+        series = df.iloc[:, idx]
+        try:
+            hashed = pd.util.hash_pandas_object(series, index=False)
+        except TypeError:
+            # Unhashable cells (lists/dicts) are hashed by their text form.
+            hashed = pd.util.hash_pandas_object(series.astype(str), index=False)
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ExportCache:
+    """
+    Prepared report export files of one org, shared by every session.
+
+    Files live under ``orgs/<org>/exports`` and are keyed by the frame fingerprint,
+    format and render options. A key is built once: concurrent requests for the
+    same key wait for the first builder. Files older than ``MAX_AGE_SECONDS``
+    are dropped at load and on access; least recently used files are evicted
+    once the total size passes ``MAX_BYTES``. Files touched in the last
+    ``PIN_SECONDS`` are kept so a pending download is not pulled away.
+    """
+
+    DIRNAME = "exports"
+    MAX_BYTES = _env_int("GENESYS_EXPORT_CACHE_MAX_MB", 512, minimum=8) * 1024 * 1024
+    MAX_AGE_SECONDS = _env_int("GENESYS_EXPORT_CACHE_MAX_AGE_SECONDS", 24 * 3600, minimum=600)
+    PIN_SECONDS = 300
+    BUILD_WAIT_SECONDS = 600
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._building = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_existing()
+
+    @staticmethod
+    def entry_key(fingerprint, fmt, options=None):
+        raw = json.dumps([fingerprint, fmt, options or {}], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _load_existing(self):
+        # Files survive restarts; adopt them oldest first so LRU order roughly holds.
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            names = os.listdir(self.directory)
+        except Exception:
+            return
+        found = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if name.endswith(".partial"):
+                try:
+                    os.remove(path)
+                except Exception:
+                    pass
+                continue
+            key, _, ext = name.partition(".")
+            if not key or not ext:
+                continue
+            try:
+                stat = os.stat(path)
+            except Exception:
+                continue
+            found.append((stat.st_mtime, key, ext, path, stat.st_size))
+        expired_before = time.time() - self.MAX_AGE_SECONDS
+        for mtime, key, ext, path, size in sorted(found):
+            if mtime < expired_before:
+                self._remove_file(path)
+                continue
+            self._entries[key] = {"key": key, "ext": ext, "path": path, "size": size, "created_at": mtime, "last_used_at": mtime}
+            self.total_bytes += size
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except Exception:
+            pass
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry["size"]
+            self._remove_file(entry["path"])
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not os.path.exists(entry["path"]):
+            self._drop(key)
+            return None
+        if entry["created_at"] < time.time() - self.MAX_AGE_SECONDS:
+            self._drop(key)
+            return None
+        entry["last_used_at"] = time.time()
+        self._entries.move_to_end(key)
+        return dict(entry)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry:
+                self.hits += 1
+            return entry
+
+    def get_or_build(self, key, ext, writer):
+        """Return the export for ``key``, running ``writer(path)`` only if no session built it yet."""
+        while True:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry:
+                    self.hits += 1
+                    return entry
+                event = self._building.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._building[key] = event
+                    break
+            # Another session is building the same export; a failed build lets us retry.
+            event.wait(self.BUILD_WAIT_SECONDS)
+
+        path = os.path.join(self.directory, f"{key}.{ext}")
+        tmp_path = f"{path}.partial"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            writer(tmp_path)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+            now = time.time()
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = {"key": key, "ext": ext, "path": path, "size": size, "created_at": now, "last_used_at": now}
+                self.total_bytes += size
+                self._evict(keep=key)
+                return dict(self._entries[key])
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except Exception:
+                pass
+            raise
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+            event.set()
+
+    def _evict(self, keep=None):
+        now = time.time()
+        expired_before = now - self.MAX_AGE_SECONDS
+        pinned_after = now - self.PIN_SECONDS
+        for key in [k for k, e in self._entries.items() if e["created_at"] < expired_before and e["last_used_at"] < pinned_after]:
+            self._drop(key)
+        if self.total_bytes <= self.MAX_BYTES:
+            return
+        for key in list(self._entries.keys()):
+            if self.total_bytes <= self.MAX_BYTES:
+                break
+            entry = self._entries[key]
+            if key == keep or entry["last_used_at"] >= pinned_after:
+                continue
+            self._drop(key)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.MAX_BYTES,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Process-wide export cache of an org, or None if it has no state dir.
+get_export_cache = OrgRegistry(ExportCache.DIRNAME, ExportCache)
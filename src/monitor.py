@@ -1,17 +1,28 @@
+import atexit
 import json
 import os
+import re
 import sys
 import threading
 import time
+from collections import deque
 from datetime import datetime, timedelta
 
+_UUID_PATTERN = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
 class AppMonitor:
     """
     Central monitoring class for API usage statistics and error logging.
     Designed as a singleton to be accessible from both DataManager and GenesysAPI.
+
+    Request threads only push raw events into bounded ring buffers; a background
+    writer drains them into the aggregates and appends compact delta records to
+    an on-disk journal that is periodically compacted into a single snapshot.
     """
     _instance = None
     _lock = threading.Lock()
+    PERSIST_FILENAME = "api_monitor.journal"
+    LEGACY_PERSIST_FILENAME = "api_buckets.json"
 
     def __new__(cls):
         with cls._lock:
@@ -32,7 +43,6 @@ class AppMonitor:
             return max(int(minimum), value)
 
         self.api_stats = {} # endpoint -> count
-        self.api_calls_log = [] # list of dicts: {timestamp, endpoint, method, status_code, duration_ms}
         self.error_logs = [] # list of {timestamp, module, message, details}
         self.start_time = datetime.now()
         self.total_api_calls = 0
@@ -43,6 +53,7 @@ class AppMonitor:
         self.MAX_ENDPOINT_STATS = 200  # Max unique endpoints to track
         self.STATS_PRUNE_INTERVAL = 3600  # Prune every hour
         self.MAX_API_CALL_LOG_ENTRIES = 20000  # Keep enough data for admin traffic charts.
+        self.api_calls_log = deque(maxlen=self.MAX_API_CALL_LOG_ENTRIES) # dicts: {timestamp, endpoint, method, status_code, duration_ms}
         self.MAX_ERROR_LOG_ENTRIES = _env_int("GENESYS_MAX_ERROR_LOG_ENTRIES", 500, minimum=50)
         self.API_CALL_LOG_RETENTION_HOURS = _env_int("GENESYS_API_CALL_LOG_RETENTION_HOURS", 72, minimum=1)
         self.ERROR_LOG_RETENTION_HOURS = _env_int("GENESYS_ERROR_LOG_RETENTION_HOURS", 72, minimum=1)
@@ -55,12 +66,30 @@ class AppMonitor:
         self.minute_buckets = {}  # minute datetime -> count
         self.hour_buckets = {}    # hour datetime -> count
         self._api_call_observers = {}
-        self.PERSIST_INTERVAL_SECONDS = _env_int("GENESYS_MONITOR_PERSIST_INTERVAL_SECONDS", 30, minimum=5)
+        self.PERSIST_INTERVAL_SECONDS = _env_int("GENESYS_MONITOR_PERSIST_INTERVAL_SECONDS", 5, minimum=1)
         self.REFRESH_FROM_DISK_INTERVAL_SECONDS = _env_int("GENESYS_MONITOR_REFRESH_FROM_DISK_INTERVAL_SECONDS", 15, minimum=1)
-        self._last_persist_ts = 0
+        self.MAX_PENDING_EVENTS = _env_int("GENESYS_MONITOR_MAX_PENDING_EVENTS", 50000, minimum=1000)
+        self.JOURNAL_COMPACT_BYTES = _env_int("GENESYS_MONITOR_JOURNAL_COMPACT_BYTES", 2 * 1024 * 1024, minimum=64 * 1024)
+        self.JOURNAL_COMPACT_INTERVAL_SECONDS = 3600
+        # Ring buffers filled by request threads (deque append/popleft are thread-safe).
+        self._pending_api_calls = deque(maxlen=self.MAX_PENDING_EVENTS)
+        self._pending_errors = deque(maxlen=self.MAX_ERROR_LOG_ENTRIES)
+        self.dropped_api_calls = 0
+        # Deltas drained since the last journal append.
+        self._journal_calls = 0
+        self._journal_minutes = {}
+        self._journal_endpoints = {}
+        self._journal_errors = []
+        self._last_compact_ts = 0
+        self._io_lock = threading.Lock()
+        self._writer_lock = threading.Lock()
+        self._writer_thread = None
+        self._writer_wake = threading.Event()
         self._last_disk_refresh_ts = 0
         self._persist_path = self._resolve_persist_path()
+        self._legacy_persist_path = self._resolve_persist_path(self.LEGACY_PERSIST_FILENAME)
         self._load_persisted_state()
+        atexit.register(self.flush)
         self._initialized = True
 
     def _resolve_state_base_dir(self):
@@ -74,12 +103,12 @@ class AppMonitor:
             return os.path.join(os.path.expanduser("~"), ".genesys_cloud_reporting", "orgs")
         return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "orgs")
 
-    def _resolve_persist_path(self):
+    def _resolve_persist_path(self, filename=None):
         try:
             base = self._resolve_state_base_dir()
             monitor_dir = os.path.join(base, "_monitor")
             os.makedirs(monitor_dir, exist_ok=True)
-            return os.path.join(monitor_dir, "api_buckets.json")
+            return os.path.join(monitor_dir, filename or self.PERSIST_FILENAME)
         except Exception:
             return None
 
@@ -163,19 +192,78 @@ class AppMonitor:
             kept = kept[-self.MAX_ERROR_LOG_ENTRIES:]
         self.error_logs = kept
 
-    def _load_persisted_state(self):
+    def _replay_journal(self, path):
+        """Rebuild the persisted payload from the last snapshot plus the delta records after it."""
+        data = {}
+        minutes = {}
+        hours = {}
+        endpoints = {}
+        errors = []
+        total_calls = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except Exception:
+                    continue  # Torn tail line from an interrupted append.
+                if not isinstance(record, dict):
+                    continue
+                snapshot = record.get("snapshot")
+                if isinstance(snapshot, dict):
+                    data = dict(snapshot)
+                    minutes = self._payload_to_bucket_dict(snapshot.get("minute_buckets"))
+                    hours = self._payload_to_bucket_dict(snapshot.get("hour_buckets"))
+                    endpoints = dict(snapshot.get("endpoint_stats") or {})
+                    errors = list(snapshot.get("error_logs") or [])
+                    total_calls = int(snapshot.get("total_api_calls", 0) or 0)
+                    continue
+                try:
+                    total_calls += int(record.get("calls", 0) or 0)
+                except Exception:
+                    pass
+                for minute_key, count in self._payload_to_bucket_dict(record.get("minutes")).items():
+                    hour_key = minute_key.replace(minute=0)
+                    minutes[minute_key] = minutes.get(minute_key, 0) + count
+                    hours[hour_key] = hours.get(hour_key, 0) + count
+                for endpoint, count in (record.get("endpoints") or {}).items():
+                    try:
+                        endpoints[endpoint] = int(endpoints.get(endpoint, 0) or 0) + int(count or 0)
+                    except Exception:
+                        continue
+                errors.extend(record.get("errors") or [])
+        if not data and not minutes and not errors:
+            return {}
+        data["total_api_calls"] = total_calls
+        data["endpoint_stats"] = endpoints
+        data["error_logs"] = errors
+        data["minute_buckets"] = self._bucket_dict_to_payload(minutes)
+        data["hour_buckets"] = self._bucket_dict_to_payload(hours)
+        return data
+
+    def _read_persisted_payload(self):
         path = self._persist_path
-        if not path or not os.path.exists(path):
-            return
+        if path and os.path.exists(path):
+            return self._replay_journal(path)
+        legacy_path = self._legacy_persist_path
+        if legacy_path and os.path.exists(legacy_path):
+            # One-time migration from the old whole-file JSON snapshot.
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _load_persisted_state(self):
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            persisted_minutes = self._payload_to_bucket_dict(data.get("minute_buckets"))
-            persisted_hours = self._payload_to_bucket_dict(data.get("hour_buckets"))
-            if persisted_minutes:
-                self.minute_buckets.update(persisted_minutes)
-            if persisted_hours:
-                self.hour_buckets.update(persisted_hours)
+            data = self._read_persisted_payload()
+            if not isinstance(data, dict) or not data:
+                return
+            # In-memory counts may include events not yet written; never lower them.
+            for bucket_dict, payload_key in ((self.minute_buckets, "minute_buckets"), (self.hour_buckets, "hour_buckets")):
+                for bucket_key, count in self._payload_to_bucket_dict(data.get(payload_key)).items():
+                    if count > bucket_dict.get(bucket_key, 0):
+                        bucket_dict[bucket_key] = count
             self.total_api_calls = max(
                 int(data.get("total_api_calls", 0) or 0),
                 int(self.total_api_calls or 0),
@@ -237,34 +325,113 @@ class AppMonitor:
         except Exception:
             return
 
-    def _persist_state(self, force=False):
-        path = self._persist_path
-        if not path:
-            return
-        now_ts = time.time()
-        if (not force) and ((now_ts - self._last_persist_ts) < self.PERSIST_INTERVAL_SECONDS):
-            return
-        payload = {
+    def _snapshot_payload(self):
+        return {
             "saved_at": datetime.now().isoformat(timespec="seconds"),
             "start_time": self.start_time.isoformat(timespec="seconds"),
             "total_api_calls": int(self.total_api_calls or 0),
-            "endpoint_stats": self.api_stats,
+            "endpoint_stats": dict(self.api_stats),
             "error_logs": self._serialize_error_logs(self.error_logs),
             "minute_buckets": self._bucket_dict_to_payload(self.minute_buckets),
             "hour_buckets": self._bucket_dict_to_payload(self.hour_buckets),
         }
+
+    def _take_journal_record(self):
+        if not (self._journal_calls or self._journal_errors):
+            return None
+        record = {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "calls": self._journal_calls,
+            "minutes": self._bucket_dict_to_payload(self._journal_minutes),
+            "endpoints": self._journal_endpoints,
+            "errors": self._serialize_error_logs(self._journal_errors),
+        }
+        self._journal_calls = 0
+        self._journal_minutes = {}
+        self._journal_endpoints = {}
+        self._journal_errors = []
+        return record
+
+    def _write_snapshot(self, path, payload):
         tmp_path = f"{path}.tmp"
         try:
             with open(tmp_path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False)
+                f.write(json.dumps({"snapshot": payload}, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
             os.replace(tmp_path, path)
-            self._last_persist_ts = now_ts
+            return True
         except Exception:
             try:
                 if os.path.exists(tmp_path):
                     os.remove(tmp_path)
             except Exception:
                 pass
+            return False
+
+    def flush(self):
+        """Drain pending events and persist them (append a delta record or compact the journal)."""
+        path = self._persist_path
+        with self._io_lock:
+            now_ts = time.time()
+            try:
+                journal_size = os.path.getsize(path) if path and os.path.exists(path) else 0
+            except Exception:
+                journal_size = 0
+            with self._lock:
+                self._drain_pending()
+                compact = bool(path) and (
+                    not journal_size
+                    or journal_size > self.JOURNAL_COMPACT_BYTES
+                    or (now_ts - self._last_compact_ts) > self.JOURNAL_COMPACT_INTERVAL_SECONDS
+                )
+                if compact:
+                    # The snapshot already contains every drained delta.
+                    self._take_journal_record()
+                    payload = self._snapshot_payload()
+                    record = None
+                else:
+                    payload = None
+                    record = self._take_journal_record()
+            if not path:
+                return
+            if payload is not None:
+                if self._write_snapshot(path, payload):
+                    self._last_compact_ts = now_ts
+                    legacy_path = self._legacy_persist_path
+                    if legacy_path and os.path.exists(legacy_path):
+                        try:
+                            os.remove(legacy_path)
+                        except Exception:
+                            pass
+                return
+            if record is None:
+                return
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                    f.write("\n")
+            except Exception:
+                pass
+
+    def _ensure_writer(self):
+        thread = self._writer_thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._writer_lock:
+            thread = self._writer_thread
+            if thread is not None and thread.is_alive():
+                return
+            self._writer_thread = threading.Thread(target=self._writer_loop, name="AppMonitorWriter", daemon=True)
+            self._writer_thread.start()
+
+    def _writer_loop(self):
+        while True:
+            self._writer_wake.wait(self.PERSIST_INTERVAL_SECONDS)
+            self._writer_wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass
 
     def refresh_from_persisted_state(self, force=False):
         """Refresh in-memory monitor state from local persisted file with debounce."""
@@ -333,7 +500,10 @@ class AppMonitor:
         if not key:
             return False
         with self._lock:
-            self._api_call_observers[key] = callback
+            # Copy-on-write so log_api_call can read the mapping without the lock.
+            observers = dict(self._api_call_observers)
+            observers[key] = callback
+            self._api_call_observers = observers
         return True
 
     def unregister_api_call_observer(self, name):
@@ -342,17 +512,16 @@ class AppMonitor:
             return False
         with self._lock:
             if key in self._api_call_observers:
-                self._api_call_observers.pop(key, None)
+                observers = dict(self._api_call_observers)
+                observers.pop(key, None)
+                self._api_call_observers = observers
                 return True
         return False
 
     def _notify_api_call_observers(self, entry):
         if not isinstance(entry, dict):
             return
-        observers = {}
-        with self._lock:
-            observers = dict(self._api_call_observers)
-        for observer_fn in observers.values():
+        for observer_fn in tuple(self._api_call_observers.values()):
             if not callable(observer_fn):
                 continue
             try:
@@ -360,89 +529,110 @@ class AppMonitor:
             except Exception:
                 continue
 
+    def _apply_api_call(self, now_dt, clean_endpoint, method, status_code, duration_ms):
+        self.api_stats[clean_endpoint] = self.api_stats.get(clean_endpoint, 0) + 1
+        self.total_api_calls += 1
+        self._record_time_buckets(now_dt)
+        self.api_calls_log.append({
+            "timestamp": now_dt.isoformat(timespec="seconds"),
+            "timestamp_dt": now_dt,
+            "endpoint": clean_endpoint,
+            "method": method,
+            "status_code": status_code,
+            "duration_ms": duration_ms
+        })
+        minute_key = now_dt.replace(second=0, microsecond=0)
+        self._journal_minutes[minute_key] = self._journal_minutes.get(minute_key, 0) + 1
+        self._journal_endpoints[clean_endpoint] = self._journal_endpoints.get(clean_endpoint, 0) + 1
+        self._journal_calls += 1
+
+    def _drain_pending(self):
+        """Apply buffered events to the aggregates. Caller must hold ``self._lock``."""
+        drained_calls = 0
+        pending_calls = self._pending_api_calls
+        while True:
+            try:
+                event = pending_calls.popleft()
+            except IndexError:
+                break
+            self._apply_api_call(*event)
+            drained_calls += 1
+
+        drained_errors = 0
+        pending_errors = self._pending_errors
+        while True:
+            try:
+                error_entry = pending_errors.popleft()
+            except IndexError:
+                break
+            self.error_logs.append(error_entry)
+            self._journal_errors.append(error_entry)
+            drained_errors += 1
+
+        if not (drained_calls or drained_errors):
+            return
+        now = time.time()
+        now_dt = datetime.now()
+        # Periodically prune api_stats to prevent unbounded growth
+        if (now - self._last_stats_prune) > self.STATS_PRUNE_INTERVAL:
+            if len(self.api_stats) > self.MAX_ENDPOINT_STATS:
+                # Keep only top N by call count
+                sorted_stats = sorted(self.api_stats.items(), key=lambda x: x[1], reverse=True)
+                self.api_stats = dict(sorted_stats[:self.MAX_ENDPOINT_STATS])
+            self._last_stats_prune = now
+        # The call log is a bounded deque ordered by time; only expired heads are dropped.
+        if drained_errors or (now - self._last_log_prune) > self.LOG_PRUNE_INTERVAL_SECONDS:
+            cutoff_dt = now_dt - timedelta(hours=self.API_CALL_LOG_RETENTION_HOURS)
+            while self.api_calls_log:
+                ts = self._entry_datetime(self.api_calls_log[0])
+                if ts and ts >= cutoff_dt:
+                    break
+                self.api_calls_log.popleft()
+            self._last_log_prune = now
+            self._prune_error_logs(now_dt)
+
     def log_api_call(self, endpoint, method=None, status_code=None, duration_ms=None):
         """Records an API call with timestamp, endpoint path, and optional timing metadata."""
-        observer_entry = None
-        with self._lock:
-            clean_endpoint = endpoint.split('?')[0] # Remove query params
-            # Normalize UUIDs in path to prevent unbounded key growth
-            # e.g., /api/v2/routing/queues/abc-123/users -> /api/v2/routing/queues/{id}/users
-            import re
-            clean_endpoint = re.sub(
-                r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
-                '{id}', clean_endpoint
-            )
-            self.api_stats[clean_endpoint] = self.api_stats.get(clean_endpoint, 0) + 1
-            self.total_api_calls += 1
-            
-            # Periodically prune api_stats to prevent unbounded growth
-            now = time.time()
-            if (now - self._last_stats_prune) > self.STATS_PRUNE_INTERVAL:
-                if len(self.api_stats) > self.MAX_ENDPOINT_STATS:
-                    # Keep only top N by call count
-                    sorted_stats = sorted(self.api_stats.items(), key=lambda x: x[1], reverse=True)
-                    self.api_stats = dict(sorted_stats[:self.MAX_ENDPOINT_STATS])
-                self._last_stats_prune = now
-            
-            now_dt = datetime.now()
-            self._record_time_buckets(now_dt)
-            entry = {
+        clean_endpoint = str(endpoint or "").split('?')[0] # Remove query params
+        # Normalize UUIDs in path to prevent unbounded key growth
+        # e.g., /api/v2/routing/queues/abc-123/users -> /api/v2/routing/queues/{id}/users
+        clean_endpoint = _UUID_PATTERN.sub('{id}', clean_endpoint)
+        now_dt = datetime.now()
+        pending = self._pending_api_calls
+        pending_count = len(pending)
+        if pending_count >= pending.maxlen:
+            self.dropped_api_calls += 1
+        pending.append((now_dt, clean_endpoint, method, status_code, duration_ms))
+        self._ensure_writer()
+        if pending_count >= (pending.maxlen // 4):
+            self._writer_wake.set()
+        if self._api_call_observers:
+            self._notify_api_call_observers({
                 "timestamp": now_dt.isoformat(timespec="seconds"),
-                "timestamp_dt": now_dt,
-                "endpoint": clean_endpoint,
-                "method": method,
-                "status_code": status_code,
-                "duration_ms": duration_ms
-            }
-            observer_entry = {
-                "timestamp": entry["timestamp"],
                 "endpoint": clean_endpoint,
                 "method": method,
                 "status_code": status_code,
                 "duration_ms": duration_ms,
-            }
-            self.api_calls_log.append(entry)
-            
-            # Keep enough history for charts while preventing unbounded growth.
-            needs_prune = (
-                (now - self._last_log_prune) > self.LOG_PRUNE_INTERVAL_SECONDS
-                or len(self.api_calls_log) > self.MAX_API_CALL_LOG_ENTRIES
-            )
-            if needs_prune:
-                cutoff_dt = now_dt - timedelta(hours=self.API_CALL_LOG_RETENTION_HOURS)
-                pruned = []
-                for log_entry in self.api_calls_log:
-                    ts = self._entry_datetime(log_entry)
-                    if ts and ts >= cutoff_dt:
-                        pruned.append(log_entry)
-                if len(pruned) > self.MAX_API_CALL_LOG_ENTRIES:
-                    pruned = pruned[-self.MAX_API_CALL_LOG_ENTRIES:]
-                self.api_calls_log = pruned
-                self._last_log_prune = now
-                self._prune_error_logs(now_dt)
-            self._persist_state()
-        if observer_entry:
-            self._notify_api_call_observers(observer_entry)
+            })
 
     def log_error(self, module, message, details=None):
         """Records an application error."""
-        with self._lock:
-            error_entry = {
-                "timestamp": datetime.now(),
-                "module": module,
-                "message": message,
-                "details": str(details) if details else ""
-            }
-            self.error_logs.append(error_entry)
-
-            # Keep logs bounded by retention window and max entry count.
-            self._prune_error_logs(datetime.now())
-            # Persist immediately so critical errors survive process restarts.
-            self._persist_state(force=True)
+        pending = self._pending_errors
+        pending_count = len(pending)
+        pending.append({
+            "timestamp": datetime.now(),
+            "module": module,
+            "message": message,
+            "details": str(details) if details else ""
+        })
+        self._ensure_writer()
+        if pending_count >= (pending.maxlen // 4):
+            self._writer_wake.set()
 
     def get_stats(self):
         """Returns current API statistics."""
         with self._lock:
+            self._drain_pending()
             return {
                 "total_calls": self.total_api_calls,
                 "endpoint_stats": self.api_stats.copy(),
@@ -453,6 +643,7 @@ class AppMonitor:
     def get_daily_stats(self, reference_dt=None):
         """Returns API/error totals since local midnight."""
         with self._lock:
+            self._drain_pending()
             now_dt = reference_dt if isinstance(reference_dt, datetime) else datetime.now()
             day_start = now_dt.replace(hour=0, minute=0, second=0, microsecond=0)
 
@@ -493,6 +684,7 @@ class AppMonitor:
         if minutes <= 0:
             return 0
         with self._lock:
+            self._drain_pending()
             now_minute = datetime.now().replace(second=0, microsecond=0)
             start_minute = now_minute - timedelta(minutes=minutes - 1)
             count = 0
@@ -515,6 +707,7 @@ class AppMonitor:
     def get_avg_rate_per_minute(self):
         """Returns average API calls per minute since app start."""
         with self._lock:
+            self._drain_pending()
             uptime_minutes = (datetime.now() - self.start_time).total_seconds() / 60
             if uptime_minutes <= 0:
                 return 0
@@ -524,6 +717,7 @@ class AppMonitor:
     def get_hourly_stats(self):
         """Returns API calls grouped by hour for the last 24h."""
         with self._lock:
+            self._drain_pending()
             now_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
             start_hour = now_hour - timedelta(hours=23)
 
@@ -552,6 +746,7 @@ class AppMonitor:
         if minutes <= 0:
             return {}
         with self._lock:
+            self._drain_pending()
             now_minute = datetime.now().replace(second=0, microsecond=0)
             start_minute = now_minute - timedelta(minutes=minutes - 1)
 
@@ -578,6 +773,7 @@ class AppMonitor:
     def get_errors(self, limit=50):
         """Returns recent error logs."""
         with self._lock:
+            self._drain_pending()
             return sorted(self.error_logs, key=lambda x: x['timestamp'], reverse=True)[:limit]
 
 # Global instance for easy access
@@ -8,6 +8,8 @@ from datetime import datetime, timezone
 import websocket
 
 from src.api import GenesysAPI
+from src.org_maps import id_to_name
+from src.org_state import _env_int
 
 
 # Global weak reference set for tracking active WebSocket connections
@@ -22,211 +24,288 @@ def _cleanup_dead_websockets():
         pass
 
 
-class NotificationManager:
-    """Manages a single Genesys Notifications channel and caches waiting calls."""
+class NotificationHub:
+    """
+    One pool of notification channels per org, shared by every notification manager.
+
+    Managers register a named subscription (topics + handler). The hub shards the
+    union of all topics over the channel pool and keeps each topic on the channel
+    it was first placed on: when targets change only the added topics are POSTed
+    to a channel with spare room and only channels that lost topics are re-PUT,
+    so unchanged channels and their websockets are never touched. Each websocket
+    message is parsed once and routed through a topic -> handlers dispatch table.
+    """
     MAX_TOPICS_PER_CHANNEL = 1000
-    MAX_CHANNELS = 5   # Reduced from 10 to limit memory usage
-    WAITING_CALL_TTL_SECONDS = 180  # Reduced from 300
-    CLEANUP_INTERVAL_SECONDS = 30   # Reduced from 45
-    MAX_WAITING_CALLS = 300  # Reduced from 500
+    # Genesys Cloud allows 20 channels per user/client.
+    MAX_CHANNELS = _env_int("GENESYS_NOTIFICATION_MAX_CHANNELS", 20, minimum=1)
+    RESUBSCRIBE_CHECK_SECONDS = 120
+    CHANNEL_MAX_AGE_SECONDS = 22 * 3600
 
-    def __init__(self):
+    def __init__(self, key):
+        self.key = key
         self.api = None
-        self.queues_map = {}
-        self.queue_id_to_name = {}
-        self.channel_id = None
-        self.connect_uri = None
-        self.subscribed_topics = []
         self.channels = []
-        self._ws = None
-        self._thread = None
-        self._resub_thread = None
-        self._lock = threading.Lock()
+        self._subscribers = {}
+        # topic -> tuple(handlers); replaced wholesale so the ws threads read it without locks.
+        self._dispatch = {}
+        self._lock = threading.RLock()
         self._stop_event = threading.Event()
-        self.connected = False
-        self.last_event_ts = 0
-        self.last_message_ts = 0
-        self.last_topic = ""
-        self.last_event_preview = ""
-        self.channel_created_ts = 0
-        self.last_subscribe_error = ""
+        self._maint_thread = None
         self.topics_truncated = False
+        self.uncovered_topics = set()
+        self._sync_failed = False
+        self.last_subscribe_error = ""
+        self.last_message_ts = 0
         self._next_retry_ts = 0
         self._backoff_seconds = 0
-        self._last_cleanup_ts = 0
-        # key: (conversation_id, queue_id)
-        self.waiting_calls = {}
-
-    def update_client(self, api_client, queues_map):
-        self.api = GenesysAPI(api_client) if api_client else None
-        self.queues_map = queues_map or {}
-        self.queue_id_to_name = {v: k for k, v in self.queues_map.items()}
-
-    def is_running(self):
-        return any(ch.get("thread") and ch["thread"].is_alive() for ch in self.channels)
-
-    def _update_connected(self):
-        self.connected = any(ch.get("connected") for ch in self.channels)
-
-    def _reset_backoff(self):
-        self._backoff_seconds = 0
-        self._next_retry_ts = 0
-
-    def _apply_backoff(self, base_seconds=60, max_seconds=900):
-        if self._backoff_seconds <= 0:
-            self._backoff_seconds = base_seconds
-        else:
-            self._backoff_seconds = min(self._backoff_seconds * 2, max_seconds)
-        self._next_retry_ts = time.time() + self._backoff_seconds
+        self.stats = {
+            "topics_added": 0,
+            "topics_removed": 0,
+            "channels_created": 0,
+            "channels_closed": 0,
+            "subscription_calls": 0,
+        }
 
-    def start(self, queue_ids):
-        if not self.api:
-            return False
-        topics = [f"v2.routing.queues.{qid}.conversations" for qid in queue_ids if qid]
-        topics = sorted(set(topics))
+    def set_api(self, api):
+        if api is not None:
+            self.api = api
 
-        if not topics:
-            with self._lock:
-                self.subscribed_topics = []
-                self.topics_truncated = False
-                self.last_subscribe_error = ""
-            self._reset_backoff()
-            self.stop()
-            return True
+    # ---- subscriptions -------------------------------------------------
 
-        now = time.time()
+    def subscribe(self, name, topics, handler):
+        """Register or replace the topics of subscriber ``name``; returns True if channels are up."""
+        topics = sorted(set(t for t in (topics or []) if t))
         with self._lock:
-            same_topics = self.subscribed_topics == topics
+            current = self._subscribers.get(name)
+            if current and current["topics"] == topics and current["handler"] == handler and self._healthy():
+                return True
+            if current and current["topics"] == topics and time.time() < self._next_retry_ts:
+                return False
+            self._subscribers[name] = {"topics": topics, "handler": handler}
+            return self._sync_channels()
 
-        if same_topics and self.is_running():
+    def unsubscribe(self, name):
+        with self._lock:
+            if self._subscribers.pop(name, None) is None:
+                return
+            if self._subscribers:
+                self._sync_channels()
+            else:
+                self._stop_all()
+
+    def _rebuild_dispatch(self):
+        dispatch = {}
+        for sub in self._subscribers.values():
+            for topic in sub["topics"]:
+                dispatch.setdefault(topic, []).append(sub["handler"])
+        self._dispatch = {topic: tuple(handlers) for topic, handlers in dispatch.items()}
+
+    def _healthy(self):
+        if self._sync_failed or not self.channels:
+            return False
+        return all(ch.get("thread") and ch["thread"].is_alive() for ch in self.channels)
+
+    def _put_topics(self, ch, topics):
+        self.stats["subscription_calls"] += 1
+        self.api.subscribe_notification_channel(ch["channel_id"], [{"id": t} for t in sorted(topics)])
+
+    def _sync_channels(self):
+        """Apply the difference between the wanted topic union and the channel pool."""
+        self._rebuild_dispatch()
+        wanted = set(self._dispatch)
+        if not wanted:
+            self._stop_all()
             return True
-
-        if same_topics and now < self._next_retry_ts and not self.is_running():
+        if self.api is None:
             return False
+        self._stop_event.clear()
+        ok = True
+
+        # Dead channels cannot be reused; their topics are placed again below.
+        for ch in [c for c in self.channels if not (c.get("thread") and c["thread"].is_alive())]:
+            self._close_channel(ch)
+            self.channels.remove(ch)
+            self.stats["channels_closed"] += 1
+
+        # Removals: only channels that lost topics are re-PUT; emptied channels are closed.
+        for ch in list(self.channels):
+            removed = ch["topics"] - wanted
+            if not removed:
+                continue
+            remaining = ch["topics"] - removed
+            if not remaining:
+                self._close_channel(ch)
+                self.channels.remove(ch)
+                self.stats["channels_closed"] += 1
+                self.stats["topics_removed"] += len(removed)
+                continue
+            try:
+                self._put_topics(ch, remaining)
+                ch["topics"] = remaining
+                self.stats["topics_removed"] += len(removed)
+            except Exception as e:
+                self.last_subscribe_error = f"{type(e).__name__}: {e}"
+                ok = False
+
+        if not self._compact_channels():
+            ok = False
+
+        # Additions: fill spare room on existing channels first, then open new ones.
+        assigned = set()
+        for ch in self.channels:
+            assigned |= ch["topics"]
+        pending = sorted(wanted - assigned)
+        max_topics = self.MAX_TOPICS_PER_CHANNEL
+        for ch in self.channels:
+            if not pending:
+                break
+            room = max_topics - len(ch["topics"])
+            if room <= 0:
+                continue
+            batch, pending = pending[:room], pending[room:]
+            try:
+                self.stats["subscription_calls"] += 1
+                self.api.add_notification_subscriptions(ch["channel_id"], [{"id": t} for t in batch])
+                ch["topics"] = ch["topics"] | set(batch)
+                self.stats["topics_added"] += len(batch)
+            except Exception as e:
+                self.last_subscribe_error = f"{type(e).__name__}: {e}"
+                ok = False
+        while pending and len(self.channels) < self.MAX_CHANNELS:
+            batch = pending[:max_topics]
+            ch = self._create_channel(batch)
+            if not ch:
+                ok = False
+                break
+            pending = pending[max_topics:]
+            self.channels.append(ch)
+            self.stats["topics_added"] += len(batch)
+            self._start_ws(ch)
+
+        assigned = set()
+        for ch in self.channels:
+            assigned |= ch["topics"]
+        self.uncovered_topics = wanted - assigned
+        self.topics_truncated = bool(pending) and len(self.channels) >= self.MAX_CHANNELS
+        self._sync_failed = not ok
+
+        if not self._maint_thread or not self._maint_thread.is_alive():
+            self._maint_thread = threading.Thread(target=self._maintenance_loop, name=f"NotificationHub-{self.key}", daemon=True)
+            self._maint_thread.start()
+        if ok:
+            self._reset_backoff()
+        elif self._next_retry_ts <= time.time():
+            self._apply_backoff()
+        return bool(self.channels)
 
-        if not same_topics or not self.is_running():
-            self._stop_channels()
-            if not same_topics:
-                self._reset_backoff()
-                self.last_subscribe_error = ""
-
-        if self._stop_event.is_set():
-            self._stop_event.clear()
+    def _compact_channels(self):
+        """Fold nearly empty channels into the spare room of others after big removals."""
+        small_limit = self.MAX_TOPICS_PER_CHANNEL // 4
+        for ch in sorted(self.channels, key=lambda c: len(c["topics"])):
+            if len(self.channels) <= 1 or len(ch["topics"]) > small_limit:
+                break
+            others = [c for c in self.channels if c is not ch]
+            if sum(self.MAX_TOPICS_PER_CHANNEL - len(c["topics"]) for c in others) < len(ch["topics"]):
+                continue
+            pending = sorted(ch["topics"])
+            try:
+                # Topics are added elsewhere before the old channel goes away, so no events are missed.
+                for target in others:
+                    room = self.MAX_TOPICS_PER_CHANNEL - len(target["topics"])
+                    if room <= 0 or not pending:
+                        continue
+                    batch, pending = pending[:room], pending[room:]
+                    self.stats["subscription_calls"] += 1
+                    self.api.add_notification_subscriptions(target["channel_id"], [{"id": t} for t in batch])
+                    target["topics"] = target["topics"] | set(batch)
+                    ch["topics"] = ch["topics"] - set(batch)
+            except Exception as e:
+                self.last_subscribe_error = f"{type(e).__name__}: {e}"
+                return False
+            self._close_channel(ch)
+            self.channels.remove(ch)
+            self.stats["channels_closed"] += 1
+        return True
 
+    def topic_budget(self, name=None):
+        """Topics still available to ``name`` once the other subscribers' topics are placed."""
         with self._lock:
-            self.subscribed_topics = topics
-            self.topics_truncated = False
-
-        max_topics = self.MAX_TOPICS_PER_CHANNEL
-        chunks = [topics[i:i + max_topics] for i in range(0, len(topics), max_topics)]
-        if len(chunks) > self.MAX_CHANNELS:
-            chunks = chunks[:self.MAX_CHANNELS]
-            self.topics_truncated = True
-
-        new_channels = []
-        for chunk in chunks:
-            ch = self._create_channel(chunk)
-            if ch:
-                new_channels.append(ch)
-                self._start_ws(ch)
-
+            others = set()
+            for sub_name, sub in self._subscribers.items():
+                if sub_name != name:
+                    others.update(sub["topics"])
+        return max(0, self.MAX_TOPICS_PER_CHANNEL * self.MAX_CHANNELS - len(others))
+
+    def coverage(self, name=None):
+        """Requested / subscribed / connected topic counts for the pool or one subscriber."""
         with self._lock:
-            self.channels = new_channels
-        self._update_connected()
-
-        if not self.channels:
-            return False
+            channels = list(self.channels)
+            if name is None:
+                requested = set(self._dispatch)
+            else:
+                sub = self._subscribers.get(name)
+                requested = set(sub["topics"]) if sub else set()
+            subscribed = set()
+            connected = set()
+            for ch in channels:
+                subscribed |= ch["topics"]
+                if ch.get("connected"):
+                    connected |= ch["topics"]
+            subscribed &= requested
+            connected &= requested
+            return {
+                "topics_requested": len(requested),
+                "topics_subscribed": len(subscribed),
+                "topics_connected": len(connected),
+                "topics_uncovered": len(requested - subscribed),
+                "coverage_ratio": (len(connected) / len(requested)) if requested else 1.0,
+                "channels": len(channels),
+                "channels_connected": sum(1 for ch in channels if ch.get("connected")),
+                "max_channels": self.MAX_CHANNELS,
+                "topic_capacity": self.MAX_TOPICS_PER_CHANNEL * self.MAX_CHANNELS,
+                "truncated": self.topics_truncated,
+                **self.stats,
+            }
 
-        if not self._resub_thread or not self._resub_thread.is_alive():
-            self._resub_thread = threading.Thread(target=self._resubscribe_loop, daemon=True)
-            self._resub_thread.start()
+    # ---- status --------------------------------------------------------
 
-        return True
+    def is_running(self, name=None):
+        if name is not None and name not in self._subscribers:
+            return False
+        return any(ch.get("thread") and ch["thread"].is_alive() for ch in list(self.channels))
+
+    def connected_topics(self):
+        topics = set()
+        for ch in list(self.channels):
+            if ch.get("connected"):
+                topics.update(ch.get("topics") or [])
+        return topics
+
+    def is_connected(self, name=None):
+        channels = list(self.channels)
+        if name is None:
+            return any(ch.get("connected") for ch in channels)
+        sub = self._subscribers.get(name)
+        if not sub:
+            return False
+        wanted = set(sub["topics"])
+        return any(ch.get("connected") and wanted.intersection(ch.get("topics") or []) for ch in channels)
 
-    def stop(self):
-        self._stop_event.set()
-        self._stop_channels()
-        with self._lock:
-            self.connected = False
-            self.subscribed_topics = []
-            self.waiting_calls = {}
-            self.last_event_preview = ""
-            self.last_topic = ""
-        # Force cleanup
-        _cleanup_dead_websockets()
+    def channel_created_ts(self):
+        return min((ch.get("created_ts", 0) for ch in list(self.channels)), default=0)
 
-    def _stop_channels(self):
-        channels_to_stop = list(self.channels)
-        self.channels = []
-        for ch in channels_to_stop:
-            try:
-                if ch.get("stop_event"):
-                    ch["stop_event"].set()
-                ws = ch.get("ws")
-                if ws:
-                    try:
-                        ws.close()
-                    except Exception:
-                        pass
-                    ch["ws"] = None
-                # Join thread to prevent accumulation
-                t = ch.get("thread")
-                if t and t.is_alive():
-                    try:
-                        t.join(timeout=2)
-                    except Exception:
-                        pass
-                ch["thread"] = None
-            except Exception:
-                pass
-        self._update_connected()
-        _cleanup_dead_websockets()
+    # ---- channel lifecycle ----------------------------------------------
 
-    def get_waiting_calls(self, max_age_seconds=600):
-        now = time.time()
-        with self._lock:
-            # Prune stale entries
-            stale_keys = [k for k, v in self.waiting_calls.items() if (now - v.get("last_update", 0)) > max_age_seconds]
-            for k in stale_keys:
-                self.waiting_calls.pop(k, None)
-            return list(self.waiting_calls.values())
-
-    def _prune_waiting_calls(self, max_age_seconds=None):
-        now = time.time()
-        if (now - self._last_cleanup_ts) < self.CLEANUP_INTERVAL_SECONDS:
-            return
-        ttl = max_age_seconds or self.WAITING_CALL_TTL_SECONDS
-        with self._lock:
-            # Remove stale entries
-            stale_keys = [k for k, v in self.waiting_calls.items() if (now - v.get("last_update", 0)) > ttl]
-            for k in stale_keys:
-                self.waiting_calls.pop(k, None)
-            # Enforce max cache size - remove oldest entries
-            if len(self.waiting_calls) > self.MAX_WAITING_CALLS:
-                sorted_items = sorted(self.waiting_calls.items(), key=lambda x: x[1].get("last_update", 0))
-                excess = len(self.waiting_calls) - self.MAX_WAITING_CALLS
-                for k, _ in sorted_items[:excess]:
-                    self.waiting_calls.pop(k, None)
-            self._last_cleanup_ts = now
+    def _reset_backoff(self):
+        self._backoff_seconds = 0
+        self._next_retry_ts = 0
 
-    def upsert_waiting_calls(self, calls):
-        """Adds or updates waiting calls cache. Expects list of dicts with conversation_id and queue_id."""
-        now = time.time()
-        with self._lock:
-            for c in calls:
-                conv_id = c.get("conversation_id")
-                queue_id = c.get("queue_id")
-                if not conv_id or not queue_id:
-                    continue
-                key = (conv_id, queue_id)
-                self.waiting_calls[key] = {
-                    "conversation_id": conv_id,
-                    "queue_id": queue_id,
-                    "queue_name": c.get("queue_name") or self.queue_id_to_name.get(queue_id, queue_id),
-                    "wait_seconds": c.get("wait_seconds"),
-                    "phone": c.get("phone"),
-                    "last_update": now,
-                }
+    def _apply_backoff(self, base_seconds=60, max_seconds=900):
+        if self._backoff_seconds <= 0:
+            self._backoff_seconds = base_seconds
+        else:
+            self._backoff_seconds = min(self._backoff_seconds * 2, max_seconds)
+        self._next_retry_ts = time.time() + self._backoff_seconds
 
     def _create_channel(self, topics):
         try:
@@ -237,12 +316,13 @@ class NotificationManager:
                 self.last_subscribe_error = "Missing channel id/connectUri"
                 self._apply_backoff()
                 return None
-            self.api.subscribe_notification_channel(channel_id, [{"id": t} for t in topics])
-            self._reset_backoff()
+            self.api.subscribe_notification_channel(channel_id, [{"id": t} for t in sorted(topics)])
+            self.stats["channels_created"] += 1
+            self.stats["subscription_calls"] += 1
             return {
                 "channel_id": channel_id,
                 "connect_uri": connect_uri,
-                "topics": topics,
+                "topics": set(topics),
                 "created_ts": time.time(),
                 "ws": None,
                 "thread": None,
@@ -254,41 +334,80 @@ class NotificationManager:
             self._apply_backoff()
             return None
 
+    def _close_channel(self, ch, join=True):
+        try:
+            if ch.get("stop_event"):
+                ch["stop_event"].set()
+            ws = ch.get("ws")
+            if ws:
+                try:
+                    ws.close()
+                except Exception:
+                    pass
+                ch["ws"] = None
+            # Join thread to prevent accumulation
+            t = ch.get("thread")
+            if join and t and t.is_alive() and t is not threading.current_thread():
+                try:
+                    t.join(timeout=2)
+                except Exception:
+                    pass
+            ch["thread"] = None
+            ch["connected"] = False
+        except Exception:
+            pass
+
+    def _stop_all(self):
+        self._stop_event.set()
+        channels = list(self.channels)
+        self.channels = []
+        self._dispatch = {}
+        self.uncovered_topics = set()
+        self.topics_truncated = False
+        self._sync_failed = False
+        for ch in channels:
+            self._close_channel(ch)
+        self.stats["channels_closed"] += len(channels)
+        _cleanup_dead_websockets()
+
+    def stop(self):
+        with self._lock:
+            self._subscribers = {}
+            self._stop_all()
+
+    def _on_message(self, message):
+        try:
+            payload = json.loads(message)
+        except Exception:
+            return
+        self.last_message_ts = time.time()
+        topic = payload.get("topicName") if isinstance(payload, dict) else None
+        handlers = self._dispatch.get(topic) if topic else None
+        if not handlers:
+            return
+        event = payload.get("eventBody") or {}
+        for handler in handlers:
+            try:
+                handler(topic, event)
+            except Exception:
+                pass
+
     def _start_ws(self, ch):
         if self._stop_event.is_set() or ch.get("stop_event").is_set():
             return
 
         def on_open(ws):
             ch["connected"] = True
-            self._update_connected()
 
         def on_close(ws, status_code, msg):
             ch["connected"] = False
-            self._update_connected()
             # Reconnection handled by run() loop - no need for recursive call
 
         def on_error(ws, error):
             ch["connected"] = False
-            self._update_connected()
 
         def on_message(ws, message):
-            try:
-                payload = json.loads(message)
-            except Exception:
-                return
-            self.last_message_ts = time.time()
-            self._prune_waiting_calls()
-            # Heartbeat or non-topic messages
-            topic = payload.get("topicName")
-            self.last_topic = topic or ""
-            if not topic or not topic.startswith("v2.routing.queues."):
-                return
-            event = payload.get("eventBody") or {}
-            try:
-                self.last_event_preview = json.dumps(event)[:1000]
-            except Exception:
-                self.last_event_preview = ""
-            self._handle_conversation_event(topic, event)
+            self._on_message(message)
 
         ws = websocket.WebSocketApp(
             ch["connect_uri"],
@@ -301,19 +420,18 @@ class NotificationManager:
         _active_ws_connections.add(ws)
 
         def run():
-            # Keep trying until stop requested
             ch_stop = ch.get("stop_event")
             max_retries = 10  # Prevent lingering threads
             retry_count = 0
             while not self._stop_event.is_set() and not ch_stop.is_set() and retry_count < max_retries:
                 try:
-                    ws.run_forever(ping_interval=30, ping_timeout=10)
+                    ws.run_forever(ping_interval=45, ping_timeout=15)
                 except Exception:
                     pass
                 if self._stop_event.is_set() or ch_stop.is_set():
                     break
                 retry_count += 1
-                time.sleep(2)
+                time.sleep(3)
             # Cleanup after exit
             try:
                 ch["ws"] = None
@@ -321,48 +439,218 @@ class NotificationManager:
             except Exception:
                 pass
 
-        ch["thread"] = threading.Thread(target=run, daemon=True)
-        ch["thread"].start()
+        ch["thread"] = threading.Thread(target=run, name=f"NotificationWS-{ch['channel_id'][:8]}", daemon=True)
+        ch["thread"].start()
+
+    def _maintenance_loop(self):
+        # Re-create channels before the 24h expiry and revive channels whose thread gave up.
+        while not self._stop_event.wait(self.RESUBSCRIBE_CHECK_SECONDS):
+            with self._lock:
+                if not self._subscribers:
+                    break
+                for idx, ch in enumerate(list(self.channels)):
+                    if self._stop_event.is_set():
+                        break
+                    expired = (time.time() - ch.get("created_ts", 0)) >= self.CHANNEL_MAX_AGE_SECONDS
+                    dead = not (ch.get("thread") and ch["thread"].is_alive())
+                    if not (expired or dead) or time.time() < self._next_retry_ts:
+                        continue
+                    new_ch = self._create_channel(ch.get("topics") or set())
+                    if not new_ch:
+                        continue
+                    self._close_channel(ch, join=False)
+                    self.stats["channels_closed"] += 1
+                    self.channels[idx] = new_ch
+                    self._start_ws(new_ch)
+                    _cleanup_dead_websockets()
+
+
+_hubs = {}
+_hubs_lock = threading.Lock()
+
+
+def get_notification_hub(api):
+    """Return the process-wide notification hub for the org of ``api``."""
+    key = getattr(api, "org_code", None) or getattr(getattr(api, "_rate_limiter", None), "key", None) or "default"
+    with _hubs_lock:
+        hub = _hubs.get(key)
+        if hub is None:
+            hub = NotificationHub(key)
+            _hubs[key] = hub
+    hub.set_api(api)
+    return hub
+
+
+class _HubSubscriber:
+    """Channel-facing state of a manager, delegated to the org NotificationHub."""
+    HUB_PREFIX = "notifications"
+
+    def _init_hub(self):
+        self.hub = None
+        self._hub_name = f"{self.HUB_PREFIX}-{id(self)}"
+        self._last_event = None
+
+    def _attach_hub(self):
+        self.hub = get_notification_hub(self.api) if self.api else None
+
+    def _record_event(self, topic, event):
+        self.last_topic = topic or ""
+        # Preview is rendered only when someone looks at it.
+        self._last_event = event
+
+    @property
+    def last_event_preview(self):
+        event = self._last_event
+        if event is None:
+            return ""
+        try:
+            return json.dumps(event)[:1000]
+        except Exception:
+            return ""
+
+    @property
+    def last_message_ts(self):
+        return self.hub.last_message_ts if self.hub else 0
+
+    @property
+    def connected(self):
+        return bool(self.hub and self.hub.is_connected(self._hub_name))
+
+    @property
+    def channels(self):
+        return list(self.hub.channels) if self.hub else []
+
+    @property
+    def last_subscribe_error(self):
+        return self.hub.last_subscribe_error if self.hub else ""
+
+    @property
+    def topics_truncated(self):
+        return bool(self.hub and self.hub.topics_truncated)
+
+    @property
+    def channel_created_ts(self):
+        return self.hub.channel_created_ts() if self.hub else 0
+
+    def coverage(self):
+        return self.hub.coverage(self._hub_name) if self.hub else {}
+
+    def topic_budget(self):
+        if not self.hub:
+            return NotificationHub.MAX_TOPICS_PER_CHANNEL * NotificationHub.MAX_CHANNELS
+        return self.hub.topic_budget(self._hub_name)
+
+    def is_running(self):
+        return bool(self.hub and self.hub.is_running(self._hub_name))
+
+    def _hub_subscribe(self, topics, handler):
+        if not self.hub:
+            return False
+        return self.hub.subscribe(self._hub_name, topics, handler)
+
+    def _hub_unsubscribe(self):
+        if self.hub:
+            self.hub.unsubscribe(self._hub_name)
+
+
+class NotificationManager(_HubSubscriber):
+    """Subscribes queue conversation topics on the org hub and caches waiting calls."""
+    WAITING_CALL_TTL_SECONDS = 180  # Reduced from 300
+    CLEANUP_INTERVAL_SECONDS = 30   # Reduced from 45
+    MAX_WAITING_CALLS = 300  # Reduced from 500
+    HUB_PREFIX = "queue-calls"
+
+    def __init__(self):
+        self.api = None
+        self.queues_map = {}
+        self.queue_id_to_name = {}
+        self.subscribed_topics = []
+        self._lock = threading.Lock()
+        self._init_hub()
+        self.last_event_ts = 0
+        self.last_topic = ""
+        self._last_cleanup_ts = 0
+        # key: (conversation_id, queue_id)
+        self.waiting_calls = {}
+
+    def update_client(self, api_client, queues_map):
+        self.api = GenesysAPI(api_client, priority=GenesysAPI.PRIORITY_LIVE) if api_client else None
+        self.queues_map = queues_map or {}
+        self.queue_id_to_name = id_to_name(self.queues_map)
+        self._attach_hub()
+
+    def start(self, queue_ids):
+        if not self.api:
+            return False
+        topics = [f"v2.routing.queues.{qid}.conversations" for qid in queue_ids if qid]
+        topics = sorted(set(topics))
+
+        if not topics:
+            self.stop()
+            return True
+
+        with self._lock:
+            self.subscribed_topics = topics
+        return self._hub_subscribe(topics, self._on_topic_event)
+
+    def stop(self):
+        self._hub_unsubscribe()
+        with self._lock:
+            self.subscribed_topics = []
+            self.waiting_calls = {}
+            self._last_event = None
+            self.last_topic = ""
+
+    def get_waiting_calls(self, max_age_seconds=600):
+        now = time.time()
+        with self._lock:
+            # Prune stale entries
+            stale_keys = [k for k, v in self.waiting_calls.items() if (now - v.get("last_update", 0)) > max_age_seconds]
+            for k in stale_keys:
+                self.waiting_calls.pop(k, None)
+            return list(self.waiting_calls.values())
+
+    def _prune_waiting_calls(self, max_age_seconds=None):
+        now = time.time()
+        if (now - self._last_cleanup_ts) < self.CLEANUP_INTERVAL_SECONDS:
+            return
+        ttl = max_age_seconds or self.WAITING_CALL_TTL_SECONDS
+        with self._lock:
+            # Remove stale entries
+            stale_keys = [k for k, v in self.waiting_calls.items() if (now - v.get("last_update", 0)) > ttl]
+            for k in stale_keys:
+                self.waiting_calls.pop(k, None)
+            # Enforce max cache size - remove oldest entries
+            if len(self.waiting_calls) > self.MAX_WAITING_CALLS:
+                sorted_items = sorted(self.waiting_calls.items(), key=lambda x: x[1].get("last_update", 0))
+                excess = len(self.waiting_calls) - self.MAX_WAITING_CALLS
+                for k, _ in sorted_items[:excess]:
+                    self.waiting_calls.pop(k, None)
+            self._last_cleanup_ts = now
 
-    def _resubscribe_loop(self):
-        # Re-subscribe before 24h to avoid expiry
-        while not self._stop_event.is_set():
-            time.sleep(120)
-            if self._stop_event.is_set():
-                break
-            with self._lock:
-                channels = list(self.channels)
-            for ch in channels:
-                if self._stop_event.is_set():
-                    break
-                created = ch.get("created_ts", 0)
-                topics = ch.get("topics", [])
-                if not topics or not created:
+    def upsert_waiting_calls(self, calls):
+        """Adds or updates waiting calls cache. Expects list of dicts with conversation_id and queue_id."""
+        now = time.time()
+        with self._lock:
+            for c in calls:
+                conv_id = c.get("conversation_id")
+                queue_id = c.get("queue_id")
+                if not conv_id or not queue_id:
                     continue
-                if time.time() - created >= 22 * 3600:
-                    try:
-                        new_ch = self._create_channel(topics)
-                        if new_ch:
-                            # Stop old channel properly
-                            try:
-                                if ch.get("stop_event"):
-                                    ch["stop_event"].set()
-                                ws = ch.get("ws")
-                                if ws:
-                                    ws.close()
-                                    ch["ws"] = None
-                                ch["thread"] = None
-                            except Exception:
-                                pass
-                            with self._lock:
-                                if ch in self.channels:
-                                    self.channels.remove(ch)
-                                self.channels.append(new_ch)
-                            self._start_ws(new_ch)
-                            # Cleanup old references
-                            _cleanup_dead_websockets()
-                    except Exception:
-                        pass
+                key = (conv_id, queue_id)
+                self.waiting_calls[key] = {
+                    "conversation_id": conv_id,
+                    "queue_id": queue_id,
+                    "queue_name": c.get("queue_name") or self.queue_id_to_name.get(queue_id, queue_id),
+                    "wait_seconds": c.get("wait_seconds"),
+                    "phone": c.get("phone"),
+                    "last_update": now,
+                }
+
+    def _on_topic_event(self, topic, event):
+        self._prune_waiting_calls()
+        self._record_event(topic, event)
+        self._handle_conversation_event(topic, event)
 
     def _handle_conversation_event(self, topic, event):
         conversation_id = event.get("id") or event.get("conversationId")
@@ -419,10 +707,8 @@ class NotificationManager:
                     self.waiting_calls.pop(key, None)
 
 
-class AgentNotificationManager:
+class AgentNotificationManager(_HubSubscriber):
     """Manages user presence/routing notifications and queue membership cache."""
-    MAX_TOPICS_PER_CHANNEL = 1000
-    MAX_CHANNELS = 5   # Reduced from 10
     USER_CACHE_TTL_SECONDS = 900   # Reduced from 1800 (15 min vs 30 min)
     ACTIVE_CALL_TTL_SECONDS = 180  # Reduced from 300
     CLEANUP_INTERVAL_SECONDS = 30  # Reduced from 90
@@ -430,6 +716,7 @@ class AgentNotificationManager:
     MAX_USER_ROUTING_CACHE = 2000
     MAX_ACTIVE_CALLS_CACHE = 300   # Reduced from 500
     MAX_QUEUE_MEMBERS_CACHE = 50   # Reduced from 100
+    HUB_PREFIX = "agent-status"
 
     def __init__(self):
         self.api = None
@@ -445,33 +732,23 @@ class AgentNotificationManager:
         self._user_routing_ts = {}
         self.active_calls = {}
         self.subscribed_topics = []
-        self.channels = []
         self._lock = threading.Lock()
-        self._stop_event = threading.Event()
-        self._resub_thread = None
-        self.last_message_ts = 0
+        self._init_hub()
         self.last_event_ts = 0
         self.last_topic = ""
-        self.last_event_preview = ""
         self._last_cleanup_ts = 0
+        self._event_listeners = []
 
     def update_client(self, api_client, queues_map, users_info=None, presence_map=None):
-        self.api = GenesysAPI(api_client) if api_client else None
+        self.api = GenesysAPI(api_client, priority=GenesysAPI.PRIORITY_LIVE) if api_client else None
         self.queues_map = queues_map or {}
-        self.queue_id_to_name = {v: k for k, v in self.queues_map.items()}
+        self.queue_id_to_name = id_to_name(self.queues_map)
         self.users_info = users_info or {}
         self.presence_map = presence_map or {}
-
-    def is_running(self):
-        return any(ch.get("thread") and ch["thread"].is_alive() for ch in self.channels)
-
-    @property
-    def connected(self):
-        return any(ch.get("connected") for ch in self.channels)
+        self._attach_hub()
 
     def stop(self):
-        self._stop_event.set()
-        self._stop_channels()
+        self._hub_unsubscribe()
         with self._lock:
             self.subscribed_topics = []
             self.queue_members_cache = {}
@@ -481,36 +758,8 @@ class AgentNotificationManager:
             self._user_presence_ts = {}
             self._user_routing_ts = {}
             self.active_calls = {}
-            self.last_event_preview = ""
+            self._last_event = None
             self.last_topic = ""
-        # Force cleanup
-        _cleanup_dead_websockets()
-
-    def _stop_channels(self):
-        channels_to_stop = list(self.channels)
-        self.channels = []
-        for ch in channels_to_stop:
-            try:
-                if ch.get("stop_event"):
-                    ch["stop_event"].set()
-                ws = ch.get("ws")
-                if ws:
-                    try:
-                        ws.close()
-                    except Exception:
-                        pass
-                    ch["ws"] = None
-                # Join thread to prevent accumulation
-                t = ch.get("thread")
-                if t and t.is_alive():
-                    try:
-                        t.join(timeout=2)
-                    except Exception:
-                        pass
-                ch["thread"] = None
-            except Exception:
-                pass
-        _cleanup_dead_websockets()
 
     def ensure_members(self, queue_ids):
         """Refreshes queue membership cache (low frequency)."""
@@ -558,32 +807,31 @@ class AgentNotificationManager:
         topics = sorted(set(topics))
 
         with self._lock:
-            if self.subscribed_topics == topics and self.is_running():
-                return True
             self.subscribed_topics = topics
-
-        self._stop_channels()
-        if self._stop_event.is_set():
-            self._stop_event.clear()
         if not topics:
+            self._hub_unsubscribe()
             return True
+        return self._hub_subscribe(topics, self._on_topic_event)
 
-        max_topics = self.MAX_TOPICS_PER_CHANNEL
-        chunks = [topics[i:i + max_topics] for i in range(0, len(topics), max_topics)]
-        if len(chunks) > self.MAX_CHANNELS:
-            chunks = chunks[:self.MAX_CHANNELS]
-
-        for chunk in chunks:
-            ch = self._create_channel(chunk)
-            if ch:
-                self.channels.append(ch)
-                self._start_ws(ch)
+    def add_event_listener(self, callback):
+        """Register callback(user_id, kind, event) for presence/routingStatus events."""
+        with self._lock:
+            if callback not in self._event_listeners:
+                self._event_listeners.append(callback)
 
-        if not self._resub_thread or not self._resub_thread.is_alive():
-            self._resub_thread = threading.Thread(target=self._resubscribe_loop, daemon=True)
-            self._resub_thread.start()
+    def remove_event_listener(self, callback):
+        with self._lock:
+            self._event_listeners = [cb for cb in self._event_listeners if cb != callback]
 
-        return bool(self.channels)
+    def covers_users(self, user_ids):
+        """True when presence and routing topics of every user are on a connected channel."""
+        topics = self.hub.connected_topics() if self.hub else set()
+        if not topics:
+            return False
+        for uid in user_ids:
+            if f"v2.users.{uid}.presence" not in topics or f"v2.users.{uid}.routingStatus" not in topics:
+                return False
+        return True
 
     def get_user_presence(self, user_id):
         if not user_id:
@@ -688,123 +936,10 @@ class AgentNotificationManager:
                         self.user_routing[uid] = rout
                         self._user_routing_ts[uid] = time.time()
 
-    def _create_channel(self, topics):
-        try:
-            channel = self.api.create_notification_channel()
-            channel_id = channel.get("id")
-            connect_uri = channel.get("connectUri") or channel.get("connectUriSecured")
-            if not channel_id or not connect_uri:
-                return None
-            self.api.subscribe_notification_channel(channel_id, [{"id": t} for t in topics])
-            return {
-                "channel_id": channel_id,
-                "connect_uri": connect_uri,
-                "topics": topics,
-                "created_ts": time.time(),
-                "ws": None,
-                "thread": None,
-                "connected": False,
-                "stop_event": threading.Event(),
-            }
-        except Exception:
-            return None
-
-    def _start_ws(self, ch):
-        def on_open(ws):
-            ch["connected"] = True
-
-        def on_close(ws, status_code, msg):
-            ch["connected"] = False
-            # Reconnection handled by run() loop - no need for recursive call
-
-        def on_error(ws, error):
-            ch["connected"] = False
-
-        def on_message(ws, message):
-            try:
-                payload = json.loads(message)
-            except Exception:
-                return
-            self.last_message_ts = time.time()
-            self._prune_user_caches()
-            topic = payload.get("topicName")
-            self.last_topic = topic or ""
-            event = payload.get("eventBody") or {}
-            try:
-                self.last_event_preview = json.dumps(event)[:1000]
-            except Exception:
-                self.last_event_preview = ""
-            if not topic or not topic.startswith("v2.users."):
-                return
-            self._handle_user_event(topic, event)
-
-        ws = websocket.WebSocketApp(
-            ch["connect_uri"],
-            on_open=on_open,
-            on_close=on_close,
-            on_error=on_error,
-            on_message=on_message,
-        )
-        ch["ws"] = ws
-        _active_ws_connections.add(ws)
-
-        def run():
-            ch_stop = ch.get("stop_event")
-            max_retries = 10  # Prevent lingering threads
-            retry_count = 0
-            while not self._stop_event.is_set() and not ch_stop.is_set() and retry_count < max_retries:
-                try:
-                    ws.run_forever(ping_interval=45, ping_timeout=15)
-                except Exception:
-                    pass
-                if self._stop_event.is_set() or ch_stop.is_set():
-                    break
-                retry_count += 1
-                time.sleep(3)
-            # Cleanup after exit
-            try:
-                ch["ws"] = None
-                ch["connected"] = False
-            except Exception:
-                pass
-
-        ch["thread"] = threading.Thread(target=run, daemon=True)
-        ch["thread"].start()
-
-    def _resubscribe_loop(self):
-        while not self._stop_event.is_set():
-            time.sleep(120)
-            if self._stop_event.is_set():
-                break
-            for ch in list(self.channels):
-                if self._stop_event.is_set():
-                    break
-                created = ch.get("created_ts", 0)
-                topics = ch.get("topics", [])
-                if not topics or not created:
-                    continue
-                if time.time() - created >= 22 * 3600:
-                    try:
-                        new_ch = self._create_channel(topics)
-                        if new_ch:
-                            # Stop old channel properly
-                            try:
-                                if ch.get("stop_event"):
-                                    ch["stop_event"].set()
-                                ws = ch.get("ws")
-                                if ws:
-                                    ws.close()
-                                    ch["ws"] = None
-                                ch["thread"] = None
-                            except Exception:
-                                pass
-                            self.channels.remove(ch)
-                            self.channels.append(new_ch)
-                            self._start_ws(new_ch)
-                            # Cleanup old references
-                            _cleanup_dead_websockets()
-                    except Exception:
-                        pass
+    def _on_topic_event(self, topic, event):
+        self._prune_user_caches()
+        self._record_event(topic, event)
+        self._handle_user_event(topic, event)
 
     def _handle_user_event(self, topic, event):
         parts = topic.split(".")
@@ -815,15 +950,27 @@ class AgentNotificationManager:
         self.last_event_ts = event_ts
 
         if topic.endswith(".presence"):
+            kind = "presence"
             with self._lock:
                 self.user_presence[user_id] = event or {}
                 self._user_presence_ts[user_id] = event_ts
+                listeners = list(self._event_listeners)
         elif topic.endswith(".routingStatus"):
+            kind = "routingStatus"
             with self._lock:
                 self.user_routing[user_id] = event or {}
                 self._user_routing_ts[user_id] = event_ts
+                listeners = list(self._event_listeners)
         elif ".conversations" in topic:
             self._handle_call_event(event)
+            return
+        else:
+            return
+        for callback in listeners:
+            try:
+                callback(user_id, kind, event or {})
+            except Exception:
+                pass
 
     def _handle_call_event(self, event):
         if not isinstance(event, dict):
@@ -935,34 +1082,23 @@ class AgentNotificationManager:
             }
 
 
-class GlobalConversationNotificationManager:
+class GlobalConversationNotificationManager(_HubSubscriber):
     """Notifications for org-wide conversations (calls/chats/messages/etc)."""
     ACTIVE_CALL_TTL_SECONDS = 3600  # Keep active conversations longer to avoid transient drops.
     CLEANUP_INTERVAL_SECONDS = 30  # Reduced from 45
     MAX_ACTIVE_CONVERSATIONS = 800 # Increased from 300 to support orgs with 300+ concurrent conversations
+    HUB_PREFIX = "global-conversations"
 
     def __init__(self):
         self.api = None
         self.queues_map = {}
         self.queue_id_to_name = {}
-        self.channel_id = None
-        self.connect_uri = None
         self.subscribed_topics = []
-        self._ws = None
-        self._thread = None
-        self._resub_thread = None
         self._lock = threading.Lock()
-        self._stop_event = threading.Event()
-        self.connected = False
+        self._init_hub()
         self.last_event_ts = 0
-        self.last_message_ts = 0
         self.last_topic = ""
-        self.last_event_preview = ""
-        self.channel_created_ts = 0
         self.active_conversations = {}
-        self.last_subscribe_error = ""
-        self._next_retry_ts = 0
-        self._backoff_seconds = 0
         self._last_cleanup_ts = 0
         self._diag = {
             "events_total": 0,
@@ -973,86 +1109,29 @@ class GlobalConversationNotificationManager:
         }
 
     def update_client(self, api_client, queues_map):
-        self.api = GenesysAPI(api_client) if api_client else None
+        self.api = GenesysAPI(api_client, priority=GenesysAPI.PRIORITY_LIVE) if api_client else None
         self.queues_map = queues_map or {}
-        self.queue_id_to_name = {v: k for k, v in self.queues_map.items()}
-
-    def is_running(self):
-        return self._thread and self._thread.is_alive()
+        self.queue_id_to_name = id_to_name(self.queues_map)
+        self._attach_hub()
 
     def start(self, topics):
         if not self.api:
             return False
         topics = sorted(set(topics or []))
         if not topics:
-            with self._lock:
-                self.subscribed_topics = []
-                self.last_subscribe_error = ""
-            self._reset_backoff()
             self.stop()
             return True
-
-        now = time.time()
-        with self._lock:
-            same_topics = self.subscribed_topics == topics
-
-        if same_topics and self.is_running():
-            return True
-
-        if same_topics and now < self._next_retry_ts and not self.is_running():
-            return False
-
-        if not same_topics or not self.is_running():
-            self.stop()
-            if not same_topics:
-                self._reset_backoff()
-                self.last_subscribe_error = ""
-
-        self._stop_event.clear()
         with self._lock:
             self.subscribed_topics = topics
-
-        if not self._ensure_channel_and_subscribe(topics):
-            return False
-        self._start_ws()
-        return True
+        return self._hub_subscribe(topics, self._on_topic_event)
 
     def stop(self):
-        self._stop_event.set()
-        try:
-            ws = self._ws
-            if ws:
-                ws.close()
-                self._ws = None
-        except Exception:
-            pass
-        # Join thread to prevent accumulation
-        t = self._thread
-        if t and t.is_alive():
-            try:
-                t.join(timeout=2)
-            except Exception:
-                pass
+        self._hub_unsubscribe()
         with self._lock:
-            self._thread = None
-            self.connected = False
             self.subscribed_topics = []
             self.active_conversations = {}
-            self.last_event_preview = ""
+            self._last_event = None
             self.last_topic = ""
-        # Force cleanup
-        _cleanup_dead_websockets()
-
-    def _reset_backoff(self):
-        self._backoff_seconds = 0
-        self._next_retry_ts = 0
-
-    def _apply_backoff(self, base_seconds=60, max_seconds=900):
-        if self._backoff_seconds <= 0:
-            self._backoff_seconds = base_seconds
-        else:
-            self._backoff_seconds = min(self._backoff_seconds * 2, max_seconds)
-        self._next_retry_ts = time.time() + self._backoff_seconds
 
     def get_active_conversations(self, max_age_seconds=600):
         now = time.time()
@@ -1155,122 +1234,13 @@ class GlobalConversationNotificationManager:
                     self.active_conversations.pop(k, None)
             self._last_cleanup_ts = now
 
-    def _ensure_channel_and_subscribe(self, topics):
-        try:
-            channel = self.api.create_notification_channel()
-            self.channel_id = channel.get("id")
-            self.connect_uri = channel.get("connectUri") or channel.get("connectUriSecured")
-            if not self.channel_id or not self.connect_uri:
-                self.last_subscribe_error = "Missing channel id/connectUri"
-                self._apply_backoff()
-                return False
-            self.api.subscribe_notification_channel(self.channel_id, [{"id": t} for t in topics])
-            with self._lock:
-                self.channel_created_ts = time.time()
-            self._reset_backoff()
-            return True
-        except Exception as e:
-            self.last_subscribe_error = f"{type(e).__name__}: {e}"
-            self._apply_backoff()
-            return False
-
-    def _start_ws(self):
-        if self.is_running():
+    def _on_topic_event(self, topic, event):
+        self._prune_active_conversations()
+        self._record_event(topic, event)
+        # Accept both queue-based and direct conversation topics
+        if not (topic.startswith("v2.routing.queues.") or topic.startswith("v2.conversations.")):
             return
-
-        def on_open(ws):
-            self.connected = True
-
-        def on_close(ws, status_code, msg):
-            self.connected = False
-            # Reconnection handled by run() loop - no need for recursive call
-
-        def on_error(ws, error):
-            self.connected = False
-
-        def on_message(ws, message):
-            try:
-                payload = json.loads(message)
-            except Exception:
-                return
-            self.last_message_ts = time.time()
-            self._prune_active_conversations()
-            topic = payload.get("topicName")
-            self.last_topic = topic or ""
-            event = payload.get("eventBody") or {}
-            try:
-                self.last_event_preview = json.dumps(event)[:1000]
-            except Exception:
-                self.last_event_preview = ""
-            # Accept both queue-based and direct conversation topics
-            if not topic:
-                return
-            if not (topic.startswith("v2.routing.queues.") or topic.startswith("v2.conversations.")):
-                return
-            self._handle_conversation_event(event, topic)
-
-        self._ws = websocket.WebSocketApp(
-            self.connect_uri,
-            on_open=on_open,
-            on_close=on_close,
-            on_error=on_error,
-            on_message=on_message,
-        )
-        _active_ws_connections.add(self._ws)
-
-        def run():
-            max_retries = 10  # Prevent lingering threads
-            retry_count = 0
-            while not self._stop_event.is_set() and retry_count < max_retries:
-                try:
-                    self._ws.run_forever(ping_interval=45, ping_timeout=15)
-                except Exception:
-                    pass
-                if self._stop_event.is_set():
-                    break
-                retry_count += 1
-                time.sleep(3)
-            # Cleanup after exit
-            try:
-                self._ws = None
-                self.connected = False
-            except Exception:
-                pass
-
-        self._thread = threading.Thread(target=run, daemon=True)
-        self._thread.start()
-
-        if not self._resub_thread or not self._resub_thread.is_alive():
-            self._resub_thread = threading.Thread(target=self._resubscribe_loop, daemon=True)
-            self._resub_thread.start()
-
-    def _resubscribe_loop(self):
-        while not self._stop_event.is_set():
-            time.sleep(120)
-            if self._stop_event.is_set():
-                break
-            with self._lock:
-                created = getattr(self, "channel_created_ts", 0)
-                topics = list(self.subscribed_topics)
-            if not topics or not created:
-                continue
-            if time.time() - created >= 22 * 3600:
-                try:
-                    self._ensure_channel_and_subscribe(topics)
-                    # Stop old websocket properly
-                    try:
-                        ws = self._ws
-                        if ws:
-                            ws.close()
-                            self._ws = None
-                        self._thread = None
-                    except Exception:
-                        pass
-                    self._start_ws()
-                    # Cleanup old references
-                    _cleanup_dead_websockets()
-                except Exception:
-                    pass
+        self._handle_conversation_event(event, topic)
 
     def _handle_conversation_event(self, event, topic=None):
         if not isinstance(event, dict):
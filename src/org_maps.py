@@ -0,0 +1,398 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from src.monitor import monitor
+from src.org_state import _env_int, OrgRegistry
+
+
+def _decorate_name(raw_name, entity_id, state):
+    base = str(raw_name or entity_id or "").strip() or str(entity_id or "")
+    state_norm = str(state or "").strip().lower()
+    if state_norm and state_norm not in {"active", "enabled"}:
+        return f"{base} ({entity_id})"
+    return base
+
+
+def _safe_insert_label(label_map, label, entity_id):
+    normalized_id = str(entity_id or "").strip()
+    if not normalized_id:
+        return
+    candidate = str(label or normalized_id).strip() or normalized_id
+    if label_map.get(candidate) == normalized_id:
+        return
+    if candidate not in label_map:
+        label_map[candidate] = normalized_id
+        return
+    suffix = 2
+    while True:
+        alternative = f"{candidate} ({suffix})"
+        if alternative not in label_map:
+            label_map[alternative] = normalized_id
+            return
+        if label_map.get(alternative) == normalized_id:
+            return
+        suffix += 1
+
+
+def _intern(value):
+    return sys.intern(str(value)) if value else ""
+
+
+class UserRecord(Mapping):
+    """Read-only user entry; reads like the ``{"name", "username", "email", "state"}`` dict it replaces."""
+
+    __slots__ = ("name", "username", "email", "state")
+    FIELDS = ("name", "username", "email", "state")
+
+    def __init__(self, name, username, email, state):
+        self.name = _intern(name)
+        self.username = _intern(username)
+        self.email = _intern(email)
+        self.state = _intern(state)
+
+    def __getitem__(self, key):
+        if key in UserRecord.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in UserRecord.FIELDS:
+            return getattr(self, key)
+        return default
+
+    def __iter__(self):
+        return iter(UserRecord.FIELDS)
+
+    def __len__(self):
+        return len(UserRecord.FIELDS)
+
+    def __repr__(self):
+        return f"UserRecord({dict(self)!r})"
+
+
+class NameIndex(Mapping):
+    """Immutable label -> id map that also answers id -> label in O(1)."""
+
+    __slots__ = ("_ids", "_labels")
+
+    def __init__(self, ids_by_label):
+        self._ids = ids_by_label
+        self._labels = {entity_id: label for label, entity_id in ids_by_label.items()}
+
+    def __getitem__(self, label):
+        return self._ids[label]
+
+    def get(self, label, default=None):
+        return self._ids.get(label, default)
+
+    def __contains__(self, label):
+        return label in self._ids
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def keys(self):
+        return self._ids.keys()
+
+    def values(self):
+        return self._ids.values()
+
+    def items(self):
+        return self._ids.items()
+
+    def label_of(self, entity_id, default=None):
+        return self._labels.get(entity_id, default)
+
+    @property
+    def by_id(self):
+        return MappingProxyType(self._labels)
+
+
+def id_to_name(name_map):
+    """id -> label view of a label -> id map; free for ``NameIndex``, built once for plain dicts."""
+    if isinstance(name_map, NameIndex):
+        return name_map.by_id
+    return {v: k for k, v in (name_map or {}).items()}
+
+
+class OrgDirectory:
+    """
+    Immutable user/queue directory of one org, shared by reference.
+
+    Every session, notification manager and cache of the org points at the same
+    instance instead of holding its own copy of the lookup dicts. Users are
+    ``__slots__`` records and all ids/labels are interned, so the strings are
+    stored once per process.
+    """
+
+    __slots__ = ("users_info", "users_map", "queues_map")
+
+    def __init__(self, users, queues):
+        users_map = {}
+        users_info = {}
+        for u in users:
+            uid = u.get('id')
+            if not uid:
+                continue
+            uid = _intern(uid)
+            decorated_name = _intern(_decorate_name(u.get('name', ''), uid, u.get('state', '')))
+            _safe_insert_label(users_map, decorated_name, uid)
+            users_info[uid] = UserRecord(decorated_name, u.get('username', ''), u.get('email', ''), u.get('state', ''))
+
+        queues_map = {}
+        for q in queues:
+            qid = q.get('id')
+            if not qid:
+                continue
+            decorated_name = _intern(_decorate_name(q.get('name', ''), qid, q.get('state', '')))
+            _safe_insert_label(queues_map, decorated_name, _intern(qid))
+
+        self.users_info = MappingProxyType(users_info)
+        self.users_map = NameIndex(users_map)
+        self.queues_map = NameIndex(queues_map)
+
+    def user_name(self, user_id, default=None):
+        record = self.users_info.get(user_id)
+        return record.name if record is not None else default
+
+    def user_id(self, label, default=None):
+        return self.users_map.get(label, default)
+
+    def queue_name(self, queue_id, default=None):
+        return self.queues_map.label_of(queue_id, default)
+
+    def queue_id(self, label, default=None):
+        return self.queues_map.get(label, default)
+
+
+def build_org_maps(users, queues, wrapup, presence):
+    """Lookup maps used by the UI; the user/queue maps are views of one shared ``OrgDirectory``."""
+    directory = OrgDirectory(users, queues)
+    return {
+        "wrapup": wrapup,
+        "presence": presence,
+        "directory": directory,
+        "users_map": directory.users_map,
+        "users_info": directory.users_info,
+        "queues_map": directory.queues_map,
+    }
+
+
+class OrgMapsSnapshot:
+    """
+    On-disk, versioned snapshot of an org's users, queues, wrap-up codes and presences.
+
+    The snapshot is loaded from ``orgs/<org>/org_maps.json`` without any API call,
+    so a restart or new login paints immediately. Refreshes are shared by every
+    session of the org: queues and wrap-up codes are pulled incrementally
+    (``dateModified`` descending, stopping at the stored watermark), presence
+    definitions are one page, and users are re-scanned on their own slower
+    interval because ``/api/v2/users`` has no modification date. A full rescan
+    every ``FULL_REFRESH_SECONDS`` picks up deletions. ``version`` changes only
+    when the maps content changes.
+    """
+
+    FILENAME = "org_maps.json"
+    SCHEMA_VERSION = 1
+    USERS_REFRESH_SECONDS = _env_int("GENESYS_ORG_MAPS_USERS_REFRESH_SECONDS", 900, minimum=60)
+    FULL_REFRESH_SECONDS = _env_int("GENESYS_ORG_MAPS_FULL_REFRESH_SECONDS", 6 * 3600, minimum=600)
+    # Forced refreshes from several sessions within this window share one fetch.
+    MIN_FORCE_INTERVAL_SECONDS = 60
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._state = None
+        self._maps = None
+        self._thread = None
+        self.last_error = ""
+
+    # ---- persistence -----------------------------------------------------
+
+    def _ensure_loaded(self):
+        if self._maps is None:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception:
+            return
+        if not isinstance(state, dict) or state.get("schema") != self.SCHEMA_VERSION:
+            return
+        self._set_state(state)
+
+    def _save(self, state):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            try:
+                os.remove(tmp_path)
+            except Exception:
+                pass
+
+    def _set_state(self, state):
+        users = sorted(state.get("users", {}).values(), key=lambda u: (str(u.get("name") or "").lower(), u.get("id") or ""))
+        queues = sorted(state.get("queues", {}).values(), key=lambda q: (str(q.get("name") or "").lower(), q.get("id") or ""))
+        wrapup = {cid: str(item.get("name") or cid) for cid, item in state.get("wrapup", {}).items()}
+        maps = build_org_maps(users, queues, wrapup, state.get("presence") or {})
+        maps["ts"] = float(state.get("refreshed_at") or 0)
+        maps["version"] = int(state.get("version") or 0)
+        with self._lock:
+            self._state = state
+            self._maps = maps
+
+    # ---- reads -----------------------------------------------------------
+
+    def has_data(self):
+        self._ensure_loaded()
+        return self._maps is not None
+
+    def maps(self):
+        self._ensure_loaded()
+        return self._maps
+
+    @property
+    def version(self):
+        maps = self.maps()
+        return maps.get("version", 0) if maps else 0
+
+    def age_seconds(self):
+        self._ensure_loaded()
+        state = self._state
+        if not state:
+            return float("inf")
+        return max(0.0, time.time() - float(state.get("refreshed_at") or 0))
+
+    # ---- refresh ---------------------------------------------------------
+
+    def refresh(self, api, force=False):
+        """Bring the snapshot up to date; concurrent callers wait for one shared fetch."""
+        requested_at = time.time()
+        with self._refresh_lock:
+            self._ensure_loaded()
+            state = self._state
+            if state and float(state.get("refreshed_at") or 0) >= requested_at - (self.MIN_FORCE_INTERVAL_SECONDS if force else 0):
+                return self._maps
+            try:
+                self._refresh_locked(api, force=force)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                monitor.log_error("ORG_MAPS", "Org maps refresh failed", str(e))
+        return self._maps
+
+    def refresh_async(self, api):
+        """Start a background refresh unless one is already running."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self.refresh, args=(api,), name="OrgMapsRefresh", daemon=True)
+            self._thread.start()
+        return True
+
+    def unload(self):
+        """Drop the in-memory copy; the next read reloads it from disk."""
+        with self._lock:
+            self._state = None
+            self._maps = None
+
+    def _refresh_locked(self, api, force=False):
+        now = time.time()
+        old = self._state or {}
+        full = (not old) or (now - float(old.get("full_refreshed_at") or 0)) >= self.FULL_REFRESH_SECONDS
+        users_due = full or force or (now - float(old.get("users_refreshed_at") or 0)) >= self.USERS_REFRESH_SECONDS
+        state = {
+            "schema": self.SCHEMA_VERSION,
+            "version": int(old.get("version") or 0),
+            "users": dict(old.get("users") or {}),
+            "queues": dict(old.get("queues") or {}),
+            "wrapup": dict(old.get("wrapup") or {}),
+            "presence": dict(old.get("presence") or {}),
+            "watermarks": dict(old.get("watermarks") or {}),
+            "full_refreshed_at": float(old.get("full_refreshed_at") or 0),
+            "users_refreshed_at": float(old.get("users_refreshed_at") or 0),
+        }
+
+        if users_due:
+            users = api.get_users()
+            if users or not state["users"]:
+                state["users"] = {
+                    u["id"]: {k: u.get(k, "") for k in ("id", "name", "username", "email", "state")}
+                    for u in users if u.get("id")
+                }
+                state["users_refreshed_at"] = now
+
+        state["queues"] = self._sync_entities(
+            api, "/api/v2/routing/queues", state["queues"], state["watermarks"], "queues", full,
+            full_fetch=api.get_queues, fields=("id", "name", "state", "dateModified"),
+        )
+        state["wrapup"] = self._sync_entities(
+            api, "/api/v2/routing/wrapupcodes", state["wrapup"], state["watermarks"], "wrapup", full,
+            full_fetch=lambda: api.get_wrapup_codes_listing(page_size=100, max_pages=50),
+            fields=("id", "name", "dateModified"),
+        )
+        presence = api.get_presence_definitions()
+        if presence:
+            state["presence"] = presence
+        if full:
+            state["full_refreshed_at"] = now
+
+        content_keys = ("users", "queues", "wrapup", "presence")
+        if any(state[k] != old.get(k) for k in content_keys):
+            state["version"] += 1
+        state["refreshed_at"] = now
+        self._set_state(state)
+        self._save(state)
+
+    @staticmethod
+    def _sync_entities(api, path, current, watermarks, name, full, full_fetch, fields):
+        def _slim(entity):
+            return {k: entity.get(k, "") for k in fields}
+
+        if not full and current and watermarks.get(name):
+            try:
+                changed, complete = api.get_entities_modified_since(path, watermarks[name])
+            except Exception:
+                changed, complete = [], False
+            if complete:
+                merged = dict(current)
+                for entity in changed:
+                    if entity.get("id"):
+                        merged[entity["id"]] = _slim(entity)
+                if changed:
+                    watermarks[name] = max(str(e.get("dateModified") or "") for e in changed)
+                return merged
+
+        entities = full_fetch() or []
+        if not entities and current:
+            # Keep the last snapshot when the API returned nothing (errors are logged by the API layer).
+            return current
+        out = {e["id"]: _slim(e) for e in entities if e.get("id")}
+        modified = [str(e.get("dateModified") or "") for e in entities if e.get("dateModified")]
+        if modified:
+            watermarks[name] = max(modified)
+        return out
+
+
+# Process-wide org maps snapshot of an org, or None if it has no state dir.
+get_org_maps_snapshot = OrgRegistry(OrgMapsSnapshot.FILENAME, OrgMapsSnapshot)
+
+
+def unload_org_maps_snapshots():
+    """Release the in-memory maps of every org; snapshots stay on disk."""
+    for snapshot in get_org_maps_snapshot.values():
+        snapshot.unload()
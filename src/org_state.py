@@ -0,0 +1,49 @@
+import os
+import threading
+
+
+def _env_int(name, default, minimum=0):
+    try:
+        value = int(os.environ.get(name, str(default)))
+    except Exception:
+        value = int(default)
+    return max(int(minimum), value)
+
+
+def org_state_path(org_code, name):
+    """Path of ``name`` inside the org's state dir, or None if the org has none."""
+    if not org_code:
+        return None
+    try:
+        from src.auth import _safe_org_dir
+        org_dir = _safe_org_dir(org_code, create=True)
+    except Exception:
+        return None
+    if not org_dir:
+        return None
+    return os.path.join(org_dir, name)
+
+
+class OrgRegistry:
+    """Process-wide ``factory(path)`` instances, one per org state file or dir."""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._items = {}
+
+    def __call__(self, org_code):
+        path = org_state_path(org_code, self.name)
+        if path is None:
+            return None
+        with self._lock:
+            item = self._items.get(path)
+            if item is None:
+                item = self.factory(path)
+                self._items[path] = item
+            return item
+
+    def values(self):
+        with self._lock:
+            return list(self._items.values())
@@ -1,6 +1,11 @@
 import pandas as pd
+import numpy as np
+from array import array
+from collections.abc import Mapping
 from datetime import datetime, timedelta
 import math
+import threading
+from src.org_maps import id_to_name
 def format_report_username(raw_username=None, fallback=None):
     if raw_username:
         local = str(raw_username).split("@")[0].strip()
@@ -322,46 +327,57 @@ def format_seconds_to_hms(val):
     h, m = divmod(m, 60)
     return f"{h:02d}:{m:02d}:{s:02d}"
 
+def is_duration_column(col):
+    col = str(col)
+    return col.startswith('t') or col.startswith('Avg') or col in ('col_staffed_time', 'col_duration') or col in DETAIL_DURATION_COLUMNS
+
 def apply_duration_formatting(df):
     # Work on a copy to avoid chained-assignment warnings when callers pass slices.
     df = df.copy()
-    target_cols = [c for c in df.columns if (c.startswith('t') or c.startswith('Avg') or c in ['col_staffed_time', 'Duration', 'col_duration']) and pd.api.types.is_numeric_dtype(df[c])]
+    target_cols = [c for c in df.columns if is_duration_column(c) and pd.api.types.is_numeric_dtype(df[c])]
     for col in target_cols:
         # Replace the full column so pandas can safely switch dtype from numeric to string.
         df[col] = df[col].apply(format_seconds_to_hms).astype("object")
     return df
 
+INTERVAL_GRANULARITY_DELTAS = {
+    "PT15M": timedelta(minutes=15),
+    "PT30M": timedelta(minutes=30),
+    "PT1H": timedelta(hours=1),
+    "P1D": timedelta(days=1),
+}
+
 def fill_interval_gaps(df, start_dt_local, end_dt_local, granularity):
+    """Adds zero rows for every (group, interval) pair missing from the report.
+
+    Expected rows are the cartesian product of the distinct group keys and the
+    interval grid; one anti-join against the existing rows yields the gaps.
+    """
     if df.empty or "Interval" not in df.columns: return df
-    delta = timedelta(days=1)
-    if granularity == "PT30M": delta = timedelta(minutes=30)
-    elif granularity == "PT1H": delta = timedelta(hours=1)
-    
-    expected_intervals = []
-    curr = start_dt_local
-    while curr < end_dt_local:
-        expected_intervals.append(curr.strftime("%Y-%m-%d %H:%M"))
-        curr += delta
-    
-    group_cols = [c for c in df.columns if c not in df.select_dtypes(include=['number']).columns and c != "Interval"]
-    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-    zero_template = {c: 0 for c in numeric_cols}
+    delta = INTERVAL_GRANULARITY_DELTAS.get(granularity, timedelta(days=1))
+    if start_dt_local >= end_dt_local: return df
 
-    unique_groups = df[group_cols].drop_duplicates()
-    new_rows = []
-    
-    for _, group_row in unique_groups.iterrows():
-        existing_intervals = set(df.merge(group_row.to_frame().T)["Interval"].tolist())
-        for interval in expected_intervals:
-            if interval not in existing_intervals:
-                new_row = group_row.to_dict()
-                new_row["Interval"] = interval
-                new_row.update(zero_template)
-                new_rows.append(new_row)
-    
-    if new_rows:
-        df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
-        df = df.sort_values(by=["Interval"] + group_cols).reset_index(drop=True)
+    expected = pd.date_range(start=start_dt_local, end=end_dt_local, freq=delta, inclusive="left")
+    if len(expected) == 0: return df
+    intervals = pd.DataFrame({"Interval": expected.strftime("%Y-%m-%d %H:%M")})
+
+    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+    group_cols = [c for c in df.columns if c not in numeric_cols and c != "Interval"]
+
+    if group_cols:
+        grid = df[group_cols].drop_duplicates().merge(intervals, how="cross")
+    else:
+        grid = intervals
+    key_cols = group_cols + ["Interval"]
+    existing = df[key_cols].drop_duplicates()
+    grid = grid.merge(existing, on=key_cols, how="left", indicator=True)
+    missing = grid.loc[grid["_merge"] == "left_only", key_cols].reset_index(drop=True)
+    if missing.empty: return df
+
+    for c in numeric_cols:
+        missing[c] = 0
+    df = pd.concat([df, missing[df.columns]], ignore_index=True)
+    df = df.sort_values(by=["Interval"] + group_cols).reset_index(drop=True)
     return df
 
 def process_observations(resp, id_map, presence_map=None):
@@ -473,9 +489,13 @@ def process_observations(resp, id_map, presence_map=None):
 
     return list(data_map.values())
 
-def process_user_aggregates(resp, presence_map=None):
-    """Processes user status aggregates into a dictionary of metric durations."""
-    results = {}
+def process_user_aggregates(resp, presence_map=None, into=None):
+    """Processes user status aggregates into a dictionary of metric durations.
+
+    Pass the dict returned by a previous call as ``into`` to accumulate streamed
+    partial responses (several interval chunks of the same user are summed).
+    """
+    results = into if into is not None else {}
     if not resp or 'results' not in resp:
         return results
 
@@ -555,6 +575,10 @@ def process_user_aggregates(resp, presence_map=None):
 
             # StaffedTime = On Queue + Off Queue
         user_data["StaffedTime"] = user_data["tOnQueue"] + user_data["tOffQueue"]
+        previous = results.get(user_id)
+        if previous:
+            for key, value in user_data.items():
+                user_data[key] = previous.get(key, 0) + value
         results[user_id] = user_data
     return results
 
@@ -625,78 +649,175 @@ def process_user_details(resp, utc_offset=3):
 
     return results
 
-def process_conversation_details(response, user_map=None, queue_map=None, wrapup_map=None, include_attributes=False, utc_offset=3, skill_map=None, language_map=None):
-    """Flattens conversation detail JSON into a DataFrame."""
-    rows = []
-    if not response or 'conversations' not in response:
-        return pd.DataFrame()
+DETAIL_WANTED_ATTRIBUTES = (
+    "Guest", "callbackNumber", "queueId", "agentId", "isChat", "ptype", "pid",
+    "callbackNote", "Screen Pop URL", "sid", "customerPhone", "callbackTime",
+    "customerEmail", "triggerSource", "chatType", "callbackCustomerName", "pname",
+    "pdatein", "padult", "pchild", "customerName", "scriptId", "commercialConsent",
+    "sbj", "pageUrl", "pdateout",
+)
+_WANTED_ATTRIBUTES_BY_LOWER = {wa.lower(): wa for wa in DETAIL_WANTED_ATTRIBUTES}
+
+# Detail duration columns stay numeric (seconds); apply_duration_formatting renders them.
+DETAIL_DURATION_COLUMNS = ("Duration", "Talk", "Hold", "Acw", "Wait", "Alert")
+_DETAIL_FLOAT_COLUMNS = ("Talk", "Hold", "Acw", "Wait", "Alert")
+_DETAIL_INT_COLUMNS = ("Duration", "HoldCount")
+# Low-cardinality text columns are stored as categoricals to keep large reports small.
+_DETAIL_CATEGORY_COLUMNS = (
+    "Direction", "Queue", "Agent", "Username", "Skill", "Language", "Wrapup",
+    "DisconnectType", "MediaType", "ConnectionStatus",
+    "InternalDisconnectReason", "ExternalDisconnectReason",
+)
+
+_DISCONNECT_TYPE_LABELS = {
+    "client": "Müşteri",
+    "system": "Sistem",
+    "transfer": "Transfer",
+    "endpoint": "Uç Nokta/Agent",
+    "peer": "Agent",
+    "error": "Hata",
+    "timeout": "Zaman Aşımı",
+    "spam": "Spam",
+    "uncallable": "Aranamaz",
+}
+
+_DISCONNECT_REASON_LABELS = {
+    "timeout": "Conversation Inactivity",
+    "conversationinactivity": "Conversation Inactivity",
+    "conversation_inactivity": "Conversation Inactivity",
+    "peer": "Peer",
+    "client": "Client",
+    "endpoint": "Endpoint",
+    "system": "System",
+    "transfer": "Transfer",
+    "error": "Error",
+}
+
+
+def _normalize_disconnect_reason(raw_reason):
+    if raw_reason is None:
+        return ""
+    raw = str(raw_reason).strip()
+    if not raw:
+        return ""
+    return _DISCONNECT_REASON_LABELS.get(raw.lower(), raw)
+
+
+def _first_disconnect_reason(participant):
+    direct_reason = participant.get("disconnectReason") or participant.get("disconnectType")
+    if direct_reason:
+        return direct_reason
+    for session in participant.get("sessions", []):
+        session_reason = session.get("disconnectReason") or session.get("disconnectType")
+        if session_reason:
+            return session_reason
+        for segment in session.get("segments", []):
+            segment_reason = segment.get("disconnectReason") or segment.get("disconnectType")
+            if segment_reason:
+                return segment_reason
+    return ""
 
-    def fmt_time(iso_str):
+
+def _append_unique(target, value):
+    if value and value not in target:
+        target.append(value)
+
+
+class ConversationDetailsBuilder:
+    """Streams conversation detail pages into typed column buffers.
+
+    Pages are flattened one at a time into per-column buffers (``array`` for
+    numeric columns, lists for text) and ``to_frame`` builds a single DataFrame
+    at the end, so callers never hold per-page frames or run ``pd.concat``.
+    Duration columns stay numeric seconds until display formatting.
+    """
+
+    def __init__(self, user_map=None, queue_map=None, wrapup_map=None, include_attributes=False, utc_offset=3, skill_map=None, language_map=None):
+        self.user_map = user_map or {}
+        self.wrapup_map = wrapup_map or {}
+        self.include_attributes = include_attributes
+        self.skill_map = skill_map or {}
+        self.language_map = language_map or {}
+        self._utc_delta = timedelta(hours=utc_offset)
+        self._queue_names = id_to_name(queue_map)
+        self._columns = {}
+        self._rows = 0
+
+    def __len__(self):
+        return self._rows
+
+    def _new_buffer(self, name):
+        if name in _DETAIL_FLOAT_COLUMNS:
+            return array("d", bytes(8 * self._rows))
+        if name in _DETAIL_INT_COLUMNS:
+            return array("q", bytes(8 * self._rows))
+        return [""] * self._rows
+
+    def add_page(self, conversations, max_rows=None):
+        """Append one page of conversations; returns the number of rows added."""
+        added = 0
+        for conv in conversations or []:
+            if max_rows is not None and added >= max_rows:
+                break
+            row = self._build_row(conv)
+            columns = self._columns
+            for name in row:
+                if name not in columns:
+                    columns[name] = self._new_buffer(name)
+            for name, buf in columns.items():
+                value = row.get(name, "")
+                if isinstance(buf, array):
+                    try:
+                        buf.append(value or 0)
+                    except (TypeError, OverflowError):
+                        buf.append(0)
+                else:
+                    buf.append(value)
+            self._rows += 1
+            added += 1
+        return added
+
+    def to_frame(self):
+        """Build the final DataFrame and release the column buffers."""
+        if not self._rows:
+            self._columns = {}
+            return pd.DataFrame()
+        data = {}
+        for name, buf in self._columns.items():
+            if isinstance(buf, array):
+                data[name] = np.frombuffer(buf, dtype="float64" if buf.typecode == "d" else "int64").copy()
+            elif name in _DETAIL_CATEGORY_COLUMNS:
+                data[name] = pd.Categorical(["" if v is None else v for v in buf])
+            else:
+                data[name] = buf
+        self._columns = {}
+        self._rows = 0
+        return pd.DataFrame(data)
+
+    def _fmt_time(self, iso_str):
         if not iso_str: return ""
         try:
             dt = datetime.fromisoformat(iso_str.replace('Z', '+00:00'))
-            return (dt + timedelta(hours=utc_offset)).strftime("%Y-%m-%d %H:%M:%S")
+            return (dt + self._utc_delta).strftime("%Y-%m-%d %H:%M:%S")
         except: return iso_str
 
-    def sec_to_hms(seconds):
-        if not seconds: return "00:00:00"
-        m, s = divmod(int(seconds), 60)
-        h, m = divmod(m, 60)
-        return f"{h:02d}:{m:02d}:{s:02d}"
-
-    def map_skill_value(raw_value):
+    def _map_skill_value(self, raw_value):
         if raw_value is None or raw_value == "":
             return ""
         if isinstance(raw_value, list):
             names = []
             for item in raw_value:
                 key = str(item)
-                names.append(skill_map.get(key, key) if skill_map else key)
+                names.append(self.skill_map.get(key, key))
             return ", ".join([n for n in names if n])
         key = str(raw_value)
-        return skill_map.get(key, key) if skill_map else key
-
-    def normalize_disconnect_reason(raw_reason):
-        if raw_reason is None:
-            return ""
-        raw = str(raw_reason).strip()
-        if not raw:
-            return ""
-        reason_map = {
-            "timeout": "Conversation Inactivity",
-            "conversationinactivity": "Conversation Inactivity",
-            "conversation_inactivity": "Conversation Inactivity",
-            "peer": "Peer",
-            "client": "Client",
-            "endpoint": "Endpoint",
-            "system": "System",
-            "transfer": "Transfer",
-            "error": "Error",
-        }
-        lowered = raw.lower()
-        if lowered in reason_map:
-            return reason_map[lowered]
-        return raw
-
-    def first_disconnect_reason(participant):
-        direct_reason = participant.get("disconnectReason") or participant.get("disconnectType")
-        if direct_reason:
-            return direct_reason
-        for session in participant.get("sessions", []):
-            session_reason = session.get("disconnectReason") or session.get("disconnectType")
-            if session_reason:
-                return session_reason
-            for segment in session.get("segments", []):
-                segment_reason = segment.get("disconnectReason") or segment.get("disconnectType")
-                if segment_reason:
-                    return segment_reason
-        return ""
+        return self.skill_map.get(key, key)
 
-    def participant_display_name(participant):
+    def _participant_display_name(self, participant):
         uid = participant.get("userId")
-        if uid and user_map and uid in user_map:
-            u_obj = user_map[uid]
-            if isinstance(u_obj, dict):
+        if uid and uid in self.user_map:
+            u_obj = self.user_map[uid]
+            if isinstance(u_obj, Mapping):
                 display_name = str(u_obj.get("name") or u_obj.get("username") or uid).strip()
                 if display_name:
                     return display_name
@@ -712,15 +833,11 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                     return clean_value
         return ""
 
-    def append_unique(target, value):
-        if value and value not in target:
-            target.append(value)
-
-    for conv in response['conversations']:
+    def _build_row(self, conv):
         row = {
             "Id": conv.get("conversationId"),
-            "Start": fmt_time(conv.get("conversationStart")),
-            "End": fmt_time(conv.get("conversationEnd")),
+            "Start": self._fmt_time(conv.get("conversationStart")),
+            "End": self._fmt_time(conv.get("conversationEnd")),
             "Direction": conv.get("originatingDirection", "N/A"),
             "Ani": "",
             "Dnis": "",
@@ -751,16 +868,9 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
         external_participants = []
         external_disconnect_reasons = []
         
-        if include_attributes:
+        if self.include_attributes:
             # Explicitly initialize requested attributes so they appear as columns
-            wanted_attrs = [
-                "Guest", "callbackNumber", "queueId", "agentId", "isChat", "ptype", "pid", 
-                "callbackNote", "Screen Pop URL", "sid", "customerPhone", "callbackTime", 
-                "customerEmail", "triggerSource", "chatType", "callbackCustomerName", "pname", 
-                "pdatein", "padult", "pchild", "customerName", "scriptId", "commercialConsent", 
-                "sbj", "pageUrl", "pdateout"
-            ]
-            for wa in wanted_attrs:
+            for wa in DETAIL_WANTED_ATTRIBUTES:
                 row[wa] = ""
 
         # Determine metrics from participants
@@ -770,14 +880,14 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
             if purpose in ["agent", "user"]:
                 has_agent_participant = True
 
-            participant_name = participant_display_name(p)
-            participant_reason = normalize_disconnect_reason(first_disconnect_reason(p))
+            participant_name = self._participant_display_name(p)
+            participant_reason = _normalize_disconnect_reason(_first_disconnect_reason(p))
             if purpose_norm in ["agent", "user"]:
-                append_unique(internal_participants, participant_name)
-                append_unique(internal_disconnect_reasons, participant_reason)
+                _append_unique(internal_participants, participant_name)
+                _append_unique(internal_disconnect_reasons, participant_reason)
             elif purpose_norm in ["external", "customer", "outbound", "guest"]:
-                append_unique(external_participants, participant_name)
-                append_unique(external_disconnect_reasons, participant_reason)
+                _append_unique(external_participants, participant_name)
+                _append_unique(external_disconnect_reasons, participant_reason)
 
             # Track interact segments to improve connection detection for chat/message.
             for s in p.get("sessions", []):
@@ -787,15 +897,15 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                         has_agent_interact_segment = True
             
             # Extract Attributes (Participant Data) if requested
-            if include_attributes and p.get("attributes"):
+            if self.include_attributes and p.get("attributes"):
                 for k, v in p.get("attributes").items():
                     # Update row with attribute value
                     row[k] = v
                     
-                    # Also try to match with wanted_attrs case-insensitively to fill the specific columns
-                    for wa in wanted_attrs:
-                        if k.lower() == wa.lower():
-                             row[wa] = v
+                    # Also match wanted attributes case-insensitively to fill the specific columns
+                    wa = _WANTED_ATTRIBUTES_BY_LOWER.get(str(k).lower())
+                    if wa:
+                        row[wa] = v
             # Also check if participantName holds queue name for purpose=acd
 
             # Media Type (take first non-empty)
@@ -816,7 +926,7 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                             s.get("skillId")
                         ]
                         for candidate in skill_candidates:
-                            mapped = map_skill_value(candidate)
+                            mapped = self._map_skill_value(candidate)
                             if mapped:
                                 row["Skill"] = mapped
                                 break
@@ -829,14 +939,14 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                                 segment.get("skillId")
                             ]
                             for candidate in skill_candidates:
-                                mapped = map_skill_value(candidate)
+                                mapped = self._map_skill_value(candidate)
                                 if mapped:
                                     row["Skill"] = mapped
                                     break
                         if not row["Language"]:
                             lang_id = segment.get("requestedLanguageId")
                             if lang_id:
-                                row["Language"] = language_map.get(lang_id, lang_id) if language_map else lang_id
+                                row["Language"] = self.language_map.get(lang_id, lang_id) if self.language_map else lang_id
                         if row["Skill"] and row["Language"]:
                             break
                     if row["Skill"] and row["Language"]:
@@ -852,7 +962,7 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                     or attrs.get("skillId")
                     or attrs.get("skill")
                 )
-                mapped = map_skill_value(attr_skill)
+                mapped = self._map_skill_value(attr_skill)
                 if mapped:
                     row["Skill"] = mapped
             
@@ -866,17 +976,6 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                              row["DisconnectType"] = raw_disc
                              break
                          row["DisconnectType"] = raw_disc
-            
-             # Disconnect Type (from peer/agent/external usually)
-            if not row["DisconnectType"]:
-                for s in p.get("sessions", []):
-                    if s.get("disconnectType"):
-                         raw_disc = s.get("disconnectType")
-                         # Prefer specific ones
-                         if raw_disc in ["client", "system", "transfer", "endpoint"]:
-                             row["DisconnectType"] = raw_disc
-                             break
-                         row["DisconnectType"] = raw_disc
             if purpose in ["external", "customer", "outbound"]: # outbound sometimes used for external
                 # Try standard fields first
                 if not row["Ani"] and p.get("ani"): row["Ani"] = p.get("ani")
@@ -901,9 +1000,7 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                 if not row["Queue"] and p.get("participantName"): row["Queue"] = p.get("participantName")
                 if not row["Queue"]:
                     q_id = p.get("participantId") 
-                    if queue_map:
-                         qs_rev = {v: k for k, v in queue_map.items()}
-                         if q_id in qs_rev: row["Queue"] = qs_rev[q_id]
+                    if q_id in self._queue_names: row["Queue"] = self._queue_names[q_id]
             
             # Agent Info - Check for Outbound Queue here too
             if purpose == "agent" or purpose == "user":
@@ -913,9 +1010,9 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                 # Try to get better name + username
                 if p.get("userId"):
                     uid = p.get("userId")
-                    if user_map and uid in user_map:
-                         u_obj = user_map[uid]
-                         if isinstance(u_obj, dict):
+                    if self.user_map and uid in self.user_map:
+                         u_obj = self.user_map[uid]
+                         if isinstance(u_obj, Mapping):
                              row["Agent"] = u_obj.get("name", row["Agent"] or uid)
                              if u_obj.get("username"):
                                  row["Username"] = format_report_username(u_obj.get("username"), uid)
@@ -931,9 +1028,7 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                     for segment in s.get("segments", []):
                         if not row["Queue"] and segment.get("queueId"):
                             q_id = segment.get("queueId")
-                            if queue_map:
-                                qs_rev = {v: k for k, v in queue_map.items()} 
-                                if q_id in qs_rev: row["Queue"] = qs_rev[q_id]
+                            if q_id in self._queue_names: row["Queue"] = self._queue_names[q_id]
                                 
                         if segment.get("disconnectType") and not row["DisconnectType"]:
                              row["DisconnectType"] = segment.get("disconnectType")
@@ -953,8 +1048,8 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                                 row["Acw"] += dur
                                 w_code = segment.get("wrapUpCode")
                                 if w_code:
-                                    if wrapup_map and w_code in wrapup_map:
-                                        row["Wrapup"] = wrapup_map[w_code]
+                                    if self.wrapup_map and w_code in self.wrapup_map:
+                                        row["Wrapup"] = self.wrapup_map[w_code]
                                     else:
                                         row["Wrapup"] = w_code
 
@@ -993,24 +1088,10 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
              row["ConnectionStatus"] = "Bağlandı" if is_connected else "Bağlanamadı"
 
         # Final Disconnect Reason Mapping
-        disc_map = {
-            "client": "Müşteri",
-            "system": "Sistem",
-            "transfer": "Transfer",
-            "endpoint": "Uç Nokta/Agent",
-            "peer": "Agent",
-            "error": "Hata",
-            "timeout": "Zaman Aşımı",
-            "spam": "Spam",
-            "uncallable": "Aranamaz"
-        }
         raw_disc_lower = str(row["DisconnectType"]).lower()
-        if raw_disc_lower in disc_map:
-            row["DisconnectType"] = disc_map[raw_disc_lower]
+        if raw_disc_lower in _DISCONNECT_TYPE_LABELS:
+            row["DisconnectType"] = _DISCONNECT_TYPE_LABELS[raw_disc_lower]
         
-        # Clean up ANI/DNIS prefixes
-        if row["Ani"]: row["Ani"] = row["Ani"].replace("tel:", "").replace("sip:", "")
-
         # Clean up ANI/DNIS prefixes
         if row["Ani"]: row["Ani"] = row["Ani"].replace("tel:", "").replace("sip:", "")
         if row["Dnis"]: row["Dnis"] = row["Dnis"].replace("tel:", "").replace("sip:", "")
@@ -1022,18 +1103,99 @@ def process_conversation_details(response, user_map=None, queue_map=None, wrapup
                 e = datetime.fromisoformat(conv["conversationEnd"].replace('Z', '+00:00'))
                 row["Duration"] = int((e - s).total_seconds())
             except: pass
-            
-        # Format durations to HH:MM:SS
-        row["Talk"] = sec_to_hms(row["Talk"])
-        row["Hold"] = sec_to_hms(row["Hold"])
-        row["Acw"] = sec_to_hms(row["Acw"])
-        row["Wait"] = sec_to_hms(row["Wait"])
-        row["Alert"] = sec_to_hms(row["Alert"])
-        row["Duration"] = sec_to_hms(row["Duration"])
+
+        return row
         
-        rows.append(row)
 
-    return pd.DataFrame(rows)
+def process_conversation_details(response, user_map=None, queue_map=None, wrapup_map=None, include_attributes=False, utc_offset=3, skill_map=None, language_map=None):
+    """Flattens conversation detail JSON into a DataFrame."""
+    if not response or 'conversations' not in response:
+        return pd.DataFrame()
+    builder = ConversationDetailsBuilder(
+        user_map=user_map,
+        queue_map=queue_map,
+        wrapup_map=wrapup_map,
+        include_attributes=include_attributes,
+        utc_offset=utc_offset,
+        skill_map=skill_map,
+        language_map=language_map,
+    )
+    builder.add_page(response['conversations'])
+    return builder.to_frame()
+
+# Rows per chunk for file exports; memory stays bounded by one chunk regardless of report size.
+EXPORT_CHUNK_ROWS = 20000
+
+def _iter_frame_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    chunk_rows = max(1, int(chunk_rows or EXPORT_CHUNK_ROWS))
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+def _excel_cell_value(value, illegal_chars_re):
+    if value is None:
+        return None
+    if isinstance(value, (list, dict, tuple, set)):
+        return str(value)
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        return str(value)
+    if isinstance(value, str):
+        return illegal_chars_re.sub("", value)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+def write_excel(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Streams ``df`` into an xlsx file with openpyxl write-only mode."""
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Report")
+    ws.append([str(c) for c in df.columns])
+    for chunk in _iter_frame_chunks(df, chunk_rows):
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append([_excel_cell_value(v, ILLEGAL_CHARACTERS_RE) for v in row])
+    wb.save(path)
+    return path
+
+def write_csv(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Writes ``df`` to a CSV file chunk by chunk."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if df.empty:
+            df.to_csv(f, index=False)
+            return path
+        for idx, chunk in enumerate(_iter_frame_chunks(df, chunk_rows)):
+            chunk.to_csv(f, index=False, header=(idx == 0))
+    return path
+
+def _parquet_safe_frame(df):
+    safe_df = df.copy()
+    for col in safe_df.select_dtypes(include=["object"]).columns:
+        non_null = safe_df[col].dropna()
+        has_non_text = non_null.map(lambda v: not isinstance(v, (str, bytes))).any() if not non_null.empty else False
+        if has_non_text:
+            safe_df[col] = safe_df[col].map(lambda v: None if pd.isna(v) else str(v))
+    return safe_df
+
+def _write_parquet_row_groups(df, path, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        if df.empty:
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+        for chunk in _iter_frame_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+def write_parquet(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Writes ``df`` to a Parquet file, one row group per chunk."""
+    try:
+        _write_parquet_row_groups(df, path, chunk_rows)
+    except Exception:
+        _write_parquet_row_groups(_parquet_safe_frame(df), path, chunk_rows)
+    return path
 
 def to_excel(df):
     from io import BytesIO
@@ -1054,59 +1216,162 @@ def to_parquet(df):
     try:
         df.to_parquet(output, index=False)
     except Exception:
-        safe_df = df.copy()
-        for col in safe_df.select_dtypes(include=["object"]).columns:
-            non_null = safe_df[col].dropna()
-            has_non_text = non_null.map(lambda v: not isinstance(v, (str, bytes))).any() if not non_null.empty else False
-            if has_non_text:
-                safe_df[col] = safe_df[col].map(lambda v: None if pd.isna(v) else str(v))
         output = BytesIO()
-        safe_df.to_parquet(output, index=False)
+        _parquet_safe_frame(df).to_parquet(output, index=False)
     return output.getvalue()
 
-def to_pdf(df, title="Report"):
-    from io import BytesIO
-    from reportlab.lib.pagesizes import letter, landscape
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    import os
-
-    # Try to load a font that supports Turkish characters
-    font_name = "Helvetica"
-    font_paths = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-        "C:\\\\Windows\\\\Fonts\\\\arial.ttf",
-        "C:\\\\Windows\\\\Fonts\\\\segoeui.ttf",
-    ]
-    for fp in font_paths:
-        if os.path.exists(fp):
-            try:
-                pdfmetrics.registerFont(TTFont("UnicodeFont", fp))
-                font_name = "UnicodeFont"
-                break
-            except Exception:
-                pass
+# PDF exports beyond this many rows get a summary page instead of the remaining rows.
+PDF_MAX_ROWS = 10000
+PDF_FONT_SIZE = 8
+PDF_MARGIN = 36
+
+_pdf_font_lock = threading.Lock()
+_pdf_font_name_cache = None
+
+def _pdf_font_name():
+    """Registers a font with Turkish glyphs once per process."""
+    global _pdf_font_name_cache
+    if _pdf_font_name_cache:
+        return _pdf_font_name_cache
+    with _pdf_font_lock:
+        if _pdf_font_name_cache:
+            return _pdf_font_name_cache
+        import os
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        font_name = "Helvetica"
+        font_paths = [
+            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+            "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+            "C:\\\\Windows\\\\Fonts\\\\arial.ttf",
+            "C:\\\\Windows\\\\Fonts\\\\segoeui.ttf",
+        ]
+        if "UnicodeFont" in pdfmetrics.getRegisteredFontNames():
+            font_name = "UnicodeFont"
+        else:
+            for fp in font_paths:
+                if os.path.exists(fp):
+                    try:
+                        pdfmetrics.registerFont(TTFont("UnicodeFont", fp))
+                        font_name = "UnicodeFont"
+                        break
+                    except Exception:
+                        pass
+        _pdf_font_name_cache = font_name
+        return font_name
 
-    output = BytesIO()
-    doc = SimpleDocTemplate(output, pagesize=landscape(letter))
-    styles = getSampleStyleSheet()
-    styles["Heading2"].fontName = font_name
-    elements = [Paragraph(title, styles['Heading2']), Spacer(1, 12)]
-
-    data = [list(df.columns)] + df.values.tolist()
-    table = Table(data, repeatRows=1)
-    table.setStyle(TableStyle([
+def _pdf_cell_text(value, max_chars):
+    if value is None:
+        return ""
+    try:
+        if pd.isna(value):
+            return ""
+    except (TypeError, ValueError):
+        pass
+    text = str(value).replace("\n", " ")
+    if len(text) > max_chars:
+        text = text[:max(1, max_chars - 1)] + "…"
+    return text
+
+def write_pdf(df, output, title="Report", max_rows=None):
+    """
+    Renders ``df`` page by page onto ``output`` (path or binary file object).
+
+    Each page gets its own fixed-width table that is laid out, drawn and dropped,
+    so layout cost grows linearly and only one page of rows is held at a time.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.pdfgen import canvas
+    from reportlab.platypus import Table, TableStyle
+
+    font_name = _pdf_font_name()
+    page_w, page_h = landscape(letter)
+    margin = PDF_MARGIN
+    avail_w = page_w - 2 * margin
+    columns = [str(c) for c in df.columns] or [""]
+    col_w = avail_w / len(columns)
+    # Cells are kept on one line so every row has the same height.
+    max_chars = max(4, int(col_w / (PDF_FONT_SIZE * 0.55)))
+    row_h = PDF_FONT_SIZE * 1.2 + 6
+    title_h = 30
+    footer_h = 14
+    first_page_rows = max(1, int((page_h - 2 * margin - title_h - footer_h) // row_h) - 1)
+    page_rows = max(1, int((page_h - 2 * margin - footer_h) // row_h) - 1)
+
+    total_rows = len(df)
+    render_rows = total_rows if not max_rows else min(total_rows, int(max_rows))
+    header = [_pdf_cell_text(c, max_chars) for c in columns]
+    style = TableStyle([
         ("FONTNAME", (0, 0), (-1, -1), font_name),
         ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f1f5f9")),
         ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#0f172a")),
         ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#e2e8f0")),
-        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("FONTSIZE", (0, 0), (-1, -1), PDF_FONT_SIZE),
+        ("LEADING", (0, 0), (-1, -1), PDF_FONT_SIZE * 1.2),
         ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f8fafc")]),
-    ]))
-    elements.append(table)
-    doc.build(elements)
+    ])
+
+    c = canvas.Canvas(output, pagesize=(page_w, page_h))
+    c.setTitle(str(title))
+    page_no = 0
+
+    def _footer():
+        c.setFont(font_name, 7)
+        c.setFillColor(colors.HexColor("#64748b"))
+        c.drawRightString(page_w - margin, margin / 2, f"Sayfa {page_no}")
+
+    def _title():
+        c.setFont(font_name, 14)
+        c.setFillColor(colors.HexColor("#0f172a"))
+        c.drawString(margin, page_h - margin - 14, str(title))
+
+    start = 0
+    while start < render_rows or page_no == 0:
+        page_no += 1
+        top = page_h - margin
+        if page_no == 1:
+            _title()
+            top -= title_h
+            limit = first_page_rows
+        else:
+            limit = page_rows
+        chunk = df.iloc[start:min(start + limit, render_rows)]
+        data = [header]
+        for row in chunk.itertuples(index=False, name=None):
+            data.append([_pdf_cell_text(v, max_chars) for v in row] or [""])
+        table = Table(data, colWidths=[col_w] * len(columns), rowHeights=row_h)
+        table.setStyle(style)
+        _, table_h = table.wrapOn(c, avail_w, top - margin)
+        table.drawOn(c, margin, top - table_h)
+        _footer()
+        c.showPage()
+        start += limit
+
+    if render_rows < total_rows:
+        page_no += 1
+        _title()
+        lines = [
+            "Özet",
+            f"Toplam satır: {total_rows:,}",
+            f"PDF'e yazılan satır: {render_rows:,}",
+            f"Yazılmayan satır: {total_rows - render_rows:,}",
+            f"Sütun sayısı: {len(df.columns)}",
+            "Tüm satırlar için CSV, Excel veya Parquet formatını kullanın.",
+        ]
+        y = page_h - margin - title_h - 10
+        c.setFillColor(colors.HexColor("#0f172a"))
+        for idx, line in enumerate(lines):
+            c.setFont(font_name, 12 if idx == 0 else 10)
+            c.drawString(margin, y, line)
+            y -= 18
+        _footer()
+        c.showPage()
+    c.save()
+    return output
+
+def to_pdf(df, title="Report", max_rows=None):
+    from io import BytesIO
+    output = BytesIO()
+    write_pdf(df, output, title=title, max_rows=max_rows)
     return output.getvalue()
@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+
+
+PRIORITY_LIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+
+def _env_float(name, default, minimum=0.0):
+    try:
+        value = float(os.environ.get(name, str(default)))
+    except Exception:
+        value = float(default)
+    return max(float(minimum), value)
+
+
+class OrgRateLimiter:
+    """
+    Token-bucket limiter shared by every GenesysAPI instance of one org.
+
+    Genesys Cloud enforces the request budget per OAuth client, so DataManager,
+    notification managers and report/admin pages all draw from the same bucket.
+    The budget is learned from ``inin-ratelimit-*`` / ``X-RateLimit-*`` headers
+    and ``Retry-After`` on 429. Waiting callers are served by priority lane:
+    live dashboard polls first, bulk admin jobs last (and only while a reserve
+    of tokens is left for live traffic).
+    """
+
+    DEFAULT_REQUESTS_PER_MINUTE = _env_float("GENESYS_RATE_LIMIT_PER_MINUTE", 300, minimum=1)
+    BURST_SECONDS = _env_float("GENESYS_RATE_LIMIT_BURST_SECONDS", 2, minimum=0.2)
+    BULK_RESERVE_RATIO = 0.25
+    MIN_RATE_PER_SECOND = 0.2
+    BACKOFF_FACTOR = 0.5
+    RECOVERY_STEP_RATIO = 0.05
+    MAX_BLOCK_SECONDS = 120
+    MAX_ACQUIRE_WAIT_SECONDS = _env_float("GENESYS_RATE_LIMIT_MAX_WAIT_SECONDS", 60, minimum=1)
+
+    def __init__(self, key, requests_per_minute=None):
+        self.key = key
+        self._cond = threading.Condition()
+        per_minute = float(requests_per_minute or self.DEFAULT_REQUESTS_PER_MINUTE)
+        self._allowed_per_minute = per_minute
+        self._rate = per_minute / 60.0
+        self._capacity = max(1.0, self._rate * self.BURST_SECONDS)
+        self._tokens = self._capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = [0, 0, 0]
+        self.total_acquired = 0
+        self.total_wait_seconds = 0.0
+        self.total_throttled = 0
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + (elapsed * self._rate))
+            self._last_refill = now
+
+    def _wait_needed(self, lane, now):
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if any(self._waiting[:lane]):
+            # A more urgent lane is queued; it gets the next token.
+            return max(0.05, 1.0 / self._rate)
+        need = 1.0
+        if lane >= PRIORITY_BULK:
+            need += self._capacity * self.BULK_RESERVE_RATIO
+        if self._tokens >= need:
+            return 0.0
+        return (need - self._tokens) / self._rate
+
+    def acquire(self, priority=PRIORITY_NORMAL):
+        """Block until a request token is available for the given lane."""
+        try:
+            lane = min(PRIORITY_BULK, max(PRIORITY_LIVE, int(priority)))
+        except Exception:
+            lane = PRIORITY_NORMAL
+        start = time.monotonic()
+        deadline = start + self.MAX_ACQUIRE_WAIT_SECONDS
+        with self._cond:
+            self._waiting[lane] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait_s = self._wait_needed(lane, now)
+                    # Never starve a caller forever; overdrawn tokens are paid back by refill.
+                    # A Retry-After block is bounded by MAX_BLOCK_SECONDS and always honoured.
+                    if wait_s <= 0 or (now >= deadline and now >= self._blocked_until):
+                        self._tokens -= 1.0
+                        waited = now - start
+                        self.total_acquired += 1
+                        self.total_wait_seconds += waited
+                        return waited
+                    timeout = min(wait_s, 1.0)
+                    if now < deadline:
+                        timeout = min(timeout, deadline - now)
+                    self._cond.wait(max(0.01, timeout))
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+
+    def blocked_seconds(self):
+        """Seconds every caller of this org is still held back by a 429 / reset block."""
+        with self._cond:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    @staticmethod
+    def _header_float(headers, *names):
+        for name in names:
+            try:
+                raw = headers.get(name)
+            except Exception:
+                raw = None
+            if raw is None:
+                continue
+            try:
+                return float(str(raw).strip())
+            except Exception:
+                continue
+        return None
+
+    def observe(self, response):
+        """Learn the org budget from response headers and 429 responses."""
+        if response is None:
+            return
+        headers = getattr(response, "headers", None) or {}
+        status_code = getattr(response, "status_code", None)
+        allowed = self._header_float(headers, "inin-ratelimit-allowed", "X-RateLimit-Limit")
+        count = self._header_float(headers, "inin-ratelimit-count")
+        remaining = self._header_float(headers, "X-RateLimit-Remaining")
+        if remaining is None and allowed is not None and count is not None:
+            remaining = allowed - count
+        reset_s = self._header_float(headers, "inin-ratelimit-reset", "X-RateLimit-Reset")
+        if reset_s is not None and not (0 < reset_s <= self.MAX_BLOCK_SECONDS):
+            reset_s = None
+        retry_after = self._header_float(headers, "Retry-After")
+
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if allowed is not None and allowed > 0:
+                self._allowed_per_minute = allowed
+            ceiling = max(self.MIN_RATE_PER_SECOND, self._allowed_per_minute / 60.0)
+            if status_code == 429:
+                self.total_throttled += 1
+                block_s = retry_after or reset_s or 1.0
+                block_s = min(max(0.0, block_s), self.MAX_BLOCK_SECONDS)
+                self._blocked_until = max(self._blocked_until, now + block_s)
+                self._rate = max(self.MIN_RATE_PER_SECOND, min(ceiling, self._rate * self.BACKOFF_FACTOR))
+                self._tokens = min(self._tokens, 0.0)
+            else:
+                self._rate = min(ceiling, self._rate + (ceiling * self.RECOVERY_STEP_RATIO))
+                if remaining is not None:
+                    self._tokens = min(self._tokens, max(0.0, remaining))
+                    if remaining <= 0 and reset_s:
+                        self._blocked_until = max(self._blocked_until, now + reset_s)
+            self._capacity = max(1.0, self._rate * self.BURST_SECONDS)
+            self._tokens = min(self._tokens, self._capacity)
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "key": self.key,
+                "rate_per_minute": round(self._rate * 60.0, 1),
+                "allowed_per_minute": self._allowed_per_minute,
+                "tokens": round(self._tokens, 2),
+                "blocked_seconds": round(max(0.0, self._blocked_until - now), 2),
+                "waiting": list(self._waiting),
+                "total_acquired": self.total_acquired,
+                "total_wait_seconds": round(self.total_wait_seconds, 2),
+                "total_throttled": self.total_throttled,
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key):
+    """Return the process-wide limiter for an org key, creating it on first use."""
+    key = str(key or "default")
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = OrgRateLimiter(key)
+            _limiters[key] = limiter
+        return limiter
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.org_state import _env_int
+
+
+def _frame_bytes(df):
+    try:
+        return int(df.memory_usage(index=True, deep=True).sum())
+    except Exception:
+        return 0
+
+
+class ReportResultCache:
+    """
+    In-memory report results shared by every session of the process.
+
+    Entries are keyed by org and the normalized report request, so two
+    supervisors of an org running the same report share one DataFrame and the
+    second run makes no API calls. One LRU byte budget covers every org. Results whose period reaches today expire after
+    ``OPEN_TTL_SECONDS``; closed periods no longer change and live for
+    ``CLOSED_TTL_SECONDS``. Least recently used frames are dropped once the
+    total frame size passes ``MAX_BYTES``. Cached frames are shared by
+    reference and must be treated as read-only.
+    """
+
+    MAX_BYTES = _env_int("GENESYS_REPORT_CACHE_MAX_MB", 256, minimum=8) * 1024 * 1024
+    OPEN_TTL_SECONDS = _env_int("GENESYS_REPORT_CACHE_OPEN_TTL_SECONDS", 120, minimum=0)
+    CLOSED_TTL_SECONDS = _env_int("GENESYS_REPORT_CACHE_CLOSED_TTL_SECONDS", 6 * 3600, minimum=0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def request_key(org_code, **parts):
+        """Stable key of an org's report request; list parts are order-insensitive."""
+        normalized = {"org_code": str(org_code or "").strip().lower()}
+        for name, value in parts.items():
+            if isinstance(value, (list, tuple, set)):
+                value = sorted(str(v) for v in value)
+            elif hasattr(value, "isoformat"):
+                value = value.isoformat()
+            normalized[name] = value
+        raw = json.dumps(normalized, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry["expires_at"] <= now:
+                self._drop(key)
+                self.misses += 1
+                return None
+            entry["last_used_at"] = now
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry)
+
+    def put(self, key, df, base_name=None, open_period=False, extras=None):
+        """Share ``df`` under ``key``; returns False if it is empty or too large to keep."""
+        if df is None or not isinstance(df, pd.DataFrame) or df.empty:
+            return False
+        ttl = self.OPEN_TTL_SECONDS if open_period else self.CLOSED_TTL_SECONDS
+        size = _frame_bytes(df)
+        if ttl <= 0 or size > self.MAX_BYTES:
+            return False
+        now = time.time()
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = {
+                "df": df,
+                "base_name": base_name,
+                "rows": int(len(df)),
+                "size": size,
+                "extras": extras or {},
+                "updated_at": now,
+                "last_used_at": now,
+                "expires_at": now + ttl,
+            }
+            self.total_bytes += size
+            self._evict(now)
+        return True
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry["size"]
+
+    def _evict(self, now):
+        for key in [k for k, e in self._entries.items() if e["expires_at"] <= now]:
+            self._drop(key)
+        while self.total_bytes > self.MAX_BYTES and self._entries:
+            key = next(iter(self._entries))
+            self._drop(key)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.MAX_BYTES,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache = ReportResultCache()
+
+
+def get_report_cache():
+    """Return the process-wide report result cache."""
+    return _cache
+
+
+def clear_report_caches():
+    """Drop every cached report frame (memory pressure)."""
+    _cache.clear()
@@ -0,0 +1,355 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from src.org_state import _env_int
+
+
+class UserActionLog:
+    """
+    Queue-backed, SQLite-indexed user action audit log.
+
+    Callers only enqueue; a daemon thread batches events and inserts each batch
+    in one transaction. A batch is flushed when it reaches ``FLUSH_BATCH_SIZE``
+    events or ``FLUSH_INTERVAL_SECONDS`` after its first event. Rows are indexed
+    by time, org, user and action so the admin audit tab filters, pages and
+    counts in SQL. Queued items are event dicts or zero-argument callables that
+    build one, so hot paths can defer formatting to the writer thread.
+    """
+
+    FILENAME = "user_actions.sqlite"
+    LEGACY_FILENAME = "user_actions.jsonl"
+    LEGACY_DAY_PREFIX = "user_actions-"
+    QUEUE_MAX = _env_int("GENESYS_USER_ACTION_QUEUE_MAX", 50000, minimum=1000)
+    FLUSH_BATCH_SIZE = _env_int("GENESYS_USER_ACTION_FLUSH_BATCH", 500, minimum=1)
+    FLUSH_INTERVAL_SECONDS = 2.0
+    FLUSH_WAIT_SECONDS = 5.0
+    COLUMNS = ("ts", "action", "status", "source", "username", "org_code", "role", "page", "detail", "metadata")
+
+    def __init__(self, directory, retention_days=3, prune_interval_seconds=900, max_entries=None):
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILENAME)
+        self.retention_days = max(1, int(retention_days or 1))
+        self.prune_interval_seconds = max(30, int(prune_interval_seconds or 900))
+        self.max_entries = max(0, int(max_entries or 0))
+        self._queue = queue.Queue(maxsize=self.QUEUE_MAX)
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self._last_prune_ts = 0.0
+        self.written = 0
+        self.dropped = 0
+        self.last_error = ""
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS user_actions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ts TEXT NOT NULL,
+                    action TEXT NOT NULL DEFAULT '',
+                    status TEXT NOT NULL DEFAULT '',
+                    source TEXT NOT NULL DEFAULT '',
+                    username TEXT NOT NULL DEFAULT '',
+                    org_code TEXT NOT NULL DEFAULT '',
+                    role TEXT NOT NULL DEFAULT '',
+                    page TEXT NOT NULL DEFAULT '',
+                    detail TEXT NOT NULL DEFAULT '',
+                    metadata TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_user_actions_ts ON user_actions(ts);
+                CREATE INDEX IF NOT EXISTS idx_user_actions_org ON user_actions(org_code COLLATE NOCASE, ts);
+                CREATE INDEX IF NOT EXISTS idx_user_actions_user ON user_actions(username COLLATE NOCASE, ts);
+                CREATE INDEX IF NOT EXISTS idx_user_actions_action ON user_actions(action, ts);
+                CREATE TABLE IF NOT EXISTS legacy_imports (
+                    name TEXT PRIMARY KEY,
+                    rows INTEGER NOT NULL DEFAULT 0,
+                    imported_at REAL NOT NULL
+                );
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # ---- producer side ---------------------------------------------------
+
+    def enqueue(self, item):
+        """Queue an event dict or a callable returning one; never blocks."""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout=None):
+        """Block until everything queued before this call is on disk."""
+        if not self._ensure_thread():
+            return False
+        marker = threading.Event()
+        wait_s = self.FLUSH_WAIT_SECONDS if timeout is None else timeout
+        try:
+            self._queue.put(marker, timeout=wait_s)
+        except queue.Full:
+            return False
+        return marker.wait(wait_s)
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return True
+        with self._thread_lock:
+            if self._thread and self._thread.is_alive():
+                return True
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                return False
+            self._thread = threading.Thread(target=self._run, name="UserActionLogWriter", daemon=True)
+            self._thread.start()
+        return True
+
+    # ---- writer thread ---------------------------------------------------
+
+    def _run(self):
+        self._migrate_legacy_files()
+        batch = []
+        markers = []
+        deadline = 0.0
+        while True:
+            timeout = self.FLUSH_INTERVAL_SECONDS if not batch else max(0.0, deadline - time.time())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, threading.Event):
+                markers.append(item)
+            elif item is not None:
+                if not batch:
+                    deadline = time.time() + self.FLUSH_INTERVAL_SECONDS
+                batch.append(item)
+            if batch and (markers or len(batch) >= self.FLUSH_BATCH_SIZE or time.time() >= deadline):
+                self._write_batch(batch)
+                batch = []
+            for marker in markers:
+                marker.set()
+            markers = []
+            if (time.time() - self._last_prune_ts) >= self.prune_interval_seconds:
+                self.prune()
+
+    @staticmethod
+    def _normalize_ts(raw):
+        text = str(raw or "").strip().replace("T", " ")[:19]
+        if len(text) == 19 and text[4] == "-" and text[7] == "-" and text[13] == ":":
+            return text
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def _row(self, event):
+        metadata = event.get("metadata")
+        return (
+            self._normalize_ts(event.get("timestamp")),
+            str(event.get("action") or ""),
+            str(event.get("status") or ""),
+            str(event.get("source") or ""),
+            str(event.get("username") or ""),
+            str(event.get("org_code") or ""),
+            str(event.get("role") or ""),
+            str(event.get("page") or ""),
+            str(event.get("detail") or ""),
+            None if metadata is None else json.dumps(metadata, ensure_ascii=False, default=str),
+        )
+
+    def _rows(self, batch):
+        rows = []
+        for item in batch:
+            try:
+                event = item() if callable(item) else item
+                if isinstance(event, dict):
+                    rows.append(self._row(event))
+            except Exception:
+                continue
+        return rows
+
+    def _insert_rows(self, conn, rows):
+        conn.executemany(
+            f"INSERT INTO user_actions ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+            rows,
+        )
+
+    def _write_batch(self, batch):
+        rows = self._rows(batch)
+        if not rows:
+            return
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                self._insert_rows(conn, rows)
+                conn.commit()
+            self.written += len(rows)
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+
+    def _migrate_legacy_files(self):
+        # One-time import of the old JSONL logs (single file and day files). Each file is
+        # imported in one transaction together with its legacy_imports marker and removed
+        # only after that commit; a file whose marker exists was imported before a crash.
+        try:
+            names = os.listdir(self.directory)
+        except Exception:
+            return
+        for name in sorted(names):
+            if name != self.LEGACY_FILENAME and not (name.startswith(self.LEGACY_DAY_PREFIX) and name.endswith(".jsonl")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with self._db_lock:
+                    conn = self._connect()
+                    imported = conn.execute("SELECT 1 FROM legacy_imports WHERE name = ?", (name,)).fetchone()
+                    if not imported:
+                        count = 0
+                        try:
+                            batch = []
+                            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                                for line in f:
+                                    line = line.strip()
+                                    if not line:
+                                        continue
+                                    try:
+                                        item = json.loads(line)
+                                    except Exception:
+                                        continue
+                                    if isinstance(item, dict):
+                                        batch.append(item)
+                                    if len(batch) >= 5000:
+                                        rows = self._rows(batch)
+                                        self._insert_rows(conn, rows)
+                                        count += len(rows)
+                                        batch = []
+                            rows = self._rows(batch)
+                            self._insert_rows(conn, rows)
+                            count += len(rows)
+                            conn.execute(
+                                "INSERT INTO legacy_imports (name, rows, imported_at) VALUES (?, ?, ?)",
+                                (name, count, time.time()),
+                            )
+                            conn.commit()
+                        except Exception:
+                            conn.rollback()
+                            raise
+                        self.written += count
+                os.remove(path)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    # ---- retention / queries ---------------------------------------------
+
+    def prune(self):
+        """Delete rows older than the retention window and beyond ``max_entries``."""
+        self._last_prune_ts = time.time()
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM user_actions WHERE ts < ?", (cutoff,))
+                if self.max_entries:
+                    conn.execute(
+                        "DELETE FROM user_actions WHERE id <= (SELECT MAX(id) FROM user_actions) - ?",
+                        (self.max_entries,),
+                    )
+                conn.commit()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+
+    @staticmethod
+    def _like(value):
+        text = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"%{text}%"
+
+    def _where(self, org_code=None, username=None, action=None, status=None, source=None, since=None, exclude_actions=None, search=None):
+        clauses = []
+        params = []
+        if org_code:
+            clauses.append("org_code = ? COLLATE NOCASE")
+            params.append(str(org_code).strip())
+        if username:
+            clauses.append("username LIKE ? ESCAPE '\\'")
+            params.append(self._like(str(username).strip()))
+        if action:
+            clauses.append("action LIKE ? ESCAPE '\\'")
+            params.append(self._like(str(action).strip()))
+        if status:
+            clauses.append("status = ? COLLATE NOCASE")
+            params.append(str(status).strip())
+        if source:
+            clauses.append("source LIKE ? ESCAPE '\\'")
+            params.append(self._like(str(source).strip()))
+        if since:
+            clauses.append("ts >= ?")
+            params.append(since.strftime("%Y-%m-%d %H:%M:%S") if isinstance(since, datetime) else str(since))
+        excluded = [a for a in (exclude_actions or []) if a]
+        if excluded:
+            clauses.append(f"action NOT IN ({', '.join('?' * len(excluded))})")
+            params.extend(excluded)
+        if search:
+            pattern = self._like(str(search).strip())
+            fields = ("detail", "action", "username", "org_code", "source", "metadata")
+            clauses.append("(" + " OR ".join(f"{f} LIKE ? ESCAPE '\\'" for f in fields) + ")")
+            params.extend([pattern] * len(fields))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit=500, offset=0, **filters):
+        """Matching events, newest first."""
+        where, params = self._where(**filters)
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM user_actions{where} ORDER BY ts DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [max(1, int(limit)), max(0, int(offset or 0))]
+        with self._db_lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        events = []
+        for row in rows:
+            item = dict(zip(self.COLUMNS, row))
+            item["timestamp"] = item.pop("ts")
+            try:
+                item["metadata"] = json.loads(item["metadata"]) if item["metadata"] else None
+            except Exception:
+                pass
+            events.append(item)
+        return events
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._db_lock:
+            row = self._connect().execute(f"SELECT COUNT(*) FROM user_actions{where}", params).fetchone()
+        return int(row[0] or 0) if row else 0
+
+    def distinct_values(self, column, **filters):
+        if column not in self.COLUMNS or column == "metadata":
+            return []
+        where, params = self._where(**filters)
+        with self._db_lock:
+            rows = self._connect().execute(
+                f"SELECT DISTINCT {column} FROM user_actions{where} ORDER BY {column}", params
+            ).fetchall()
+        return [r[0] for r in rows if r[0]]
+
+    def status(self):
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "last_error": self.last_error,
+            "running": bool(self._thread and self._thread.is_alive()),
+        }